@@ -0,0 +1,160 @@
+"""
+    Per-request allocations benchmark (tracemalloc), app is called in-process.
+
+    Run: python benchmarks/allocations.py (from any directory, `smile` is imported from this repository)
+    Compare with other revision: python benchmarks/allocations.py --baseline <git revision>
+"""
+import os
+import io
+import sys
+import json
+import shutil
+import asyncio
+import argparse
+import tarfile
+import tempfile
+import subprocess
+import tracemalloc
+from statistics import median
+from typing import Dict, Optional
+
+# Run as script, so repository root is added for `smile` import without install or PYTHONPATH.
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_ROOT)
+
+from smile import Smile, Request
+
+app = Smile()
+
+
+@app.route("/plain")
+async def plain():
+    return "Hello world!"
+
+
+@app.route("/args")
+async def args(number: int, string: str = ""):
+    return {"number": number, "string": string}
+
+
+@app.route("/request")
+async def request_arg(request: Request, number: int = 0):
+    return {
+        "path": request.url.path,
+        "query_args": request.url.query_args,
+        "number": number,
+    }
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+def _build_scope(path: str, query_string: bytes) -> dict:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "root_path": "",
+        "query_string": query_string,
+        "headers": [(b"host", b"localhost"), (b"user-agent", b"bench")],
+    }
+
+
+CASES = (
+    ("/plain", b""),
+    ("/args", b"number=1&string=abc"),
+    ("/request", b"number=1"),
+)
+
+
+async def measure(path: str, query_string: bytes, number: int) -> float:
+    """
+    Returns median peak allocated per request in bytes.
+    """
+    # Warmup (lazy caches, interned strings).
+    for _ in range(100):
+        await app(_build_scope(path, query_string), _receive, _send)
+
+    peaks = []
+    tracemalloc.start()
+    for _ in range(number):
+        scope = _build_scope(path, query_string)
+        tracemalloc.reset_peak()
+        current_before, _ = tracemalloc.get_traced_memory()
+        await app(scope, _receive, _send)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - current_before)
+    tracemalloc.stop()
+    return median(peaks)
+
+
+async def measure_all(number: int) -> Dict[str, float]:
+    return {
+        path: await measure(path, query_string, number)
+        for path, query_string in CASES
+    }
+
+
+def measure_baseline(revision: str, number: int) -> Dict[str, float]:
+    """
+    Measures `smile` of given git revision live (same script, same machine) in subprocess.
+    """
+    archive = subprocess.run(
+        ["git", "-C", REPOSITORY_ROOT, "archive", revision, "smile"],
+        check=True,
+        capture_output=True,
+    ).stdout
+    with tempfile.TemporaryDirectory() as baseline_root:
+        with tarfile.open(fileobj=io.BytesIO(archive)) as baseline_archive:
+            baseline_archive.extractall(baseline_root)
+        # Script copy imports `smile` of revision (repository root is its parent directory).
+        script_path = os.path.join(baseline_root, "benchmarks", "allocations.py")
+        os.mkdir(os.path.dirname(script_path))
+        shutil.copy(os.path.abspath(__file__), script_path)
+        output = subprocess.run(
+            [sys.executable, script_path, "--number", str(number), "--json"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def print_report(peaks: Dict[str, float], baseline: Optional[Dict[str, float]]) -> None:
+    for path, query_string in CASES:
+        row = (
+            f"{path + '?' + query_string.decode():<28}"
+            f" | peak allocated per request {peaks[path]:8.0f} B"
+        )
+        if baseline is not None:
+            row += f" | baseline {baseline[path]:8.0f} B"
+        print(row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-request allocations benchmark.")
+    parser.add_argument("-n", "--number", type=int, default=10_000)
+    parser.add_argument(
+        "--baseline",
+        metavar="REVISION",
+        help="Git revision measured live for comparison (e.g. `HEAD~1`).",
+    )
+    parser.add_argument("--json", action="store_true", help="Print peaks as JSON.")
+    args = parser.parse_args()
+    peaks = asyncio.run(measure_all(args.number))
+    if args.json:
+        print(json.dumps(peaks))
+        return
+    baseline = (
+        measure_baseline(args.baseline, args.number) if args.baseline else None
+    )
+    print_report(peaks, baseline)
+
+
+if __name__ == "__main__":
+    main()
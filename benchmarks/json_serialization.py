@@ -0,0 +1,71 @@
+"""
+    JSON serialization benchmark: previous `json.dumps(...).encode()` path versus installed backends.
+
+    Run: python benchmarks/json_serialization.py (from any directory, `smile` is imported from this repository)
+"""
+import os
+import sys
+import json
+from timeit import timeit
+from typing import Any, Dict
+
+# Run as script, so repository root is added for `smile` import without install or PYTHONPATH.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smile.serialization import (
+    stdlib_json_serializer,
+    orjson_serializer,
+    msgspec_serializer,
+    orjson_is_installed,
+    msgspec_is_installed,
+)
+
+
+def _previous_serializer(content: Any) -> bytes:
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _build_payload(items_count: int) -> Dict[str, Any]:
+    return {
+        "total": items_count,
+        "items": [
+            {
+                "id": index,
+                "name": f"item-{index}",
+                "price": index * 1.5,
+                "tags": ["a", "b", "c"],
+                "active": bool(index % 2),
+                "owner": {"id": index % 100, "name": "Имя владельца"},
+            }
+            for index in range(items_count)
+        ],
+    }
+
+
+def run(items_count: int, number: int) -> None:
+    payload = _build_payload(items_count)
+    serializers = {
+        "previous": _previous_serializer,
+        "stdlib": stdlib_json_serializer,
+    }
+    if orjson_is_installed:
+        serializers["orjson"] = orjson_serializer
+    if msgspec_is_installed:
+        serializers["msgspec"] = msgspec_serializer
+
+    results = []
+    for name, serializer in serializers.items():
+        total = timeit(lambda: serializer(payload), number=number)
+        results.append(f"{name} {total / number * 1_000:8.3f} ms")
+    print(f"{items_count:>6} items | " + " | ".join(results))
+
+
+if __name__ == "__main__":
+    for count, number in ((10, 10_000), (1_000, 200), (50_000, 5)):
+        run(count, number)
@@ -0,0 +1,68 @@
+"""
+    Query string parsing benchmark: Smile parser versus `urllib.parse.parse_qsl`.
+
+    Run: python benchmarks/query_string.py (from any directory, `smile` is imported from this repository)
+"""
+import os
+import sys
+from timeit import timeit
+from urllib.parse import parse_qsl
+
+# Run as script, so repository root is added for `smile` import without install or PYTHONPATH.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smile.exceptions import HTTPException
+from smile.query import parse_query_string
+
+CASES = {
+    "empty": b"",
+    "realistic": b"page=2&per_page=50&sort=-created_at&status=active&status=pending",
+    "percent-encoded": b"q=hello%20world&name=%D0%98%D0%BC%D1%8F&redirect=%2Fhome%3Fa%3D1",
+    # Adversarial inputs.
+    "many params": b"&".join(b"p%d=%d" % (index, index) for index in range(999)),
+    "many separators": b"&" * 999,
+    "long percent value": b"v=" + b"%41" * 20_000,
+}
+
+# Limits are raised for comparison with parse_qsl, which has no length limit.
+BENCH_MAX_LENGTH = 64 * 1024
+
+
+def run(name: str, query_string: bytes, number: int) -> None:
+    decoded_query_string = query_string.decode("latin-1")
+    smile_time = timeit(
+        lambda: parse_query_string(query_string, max_length=BENCH_MAX_LENGTH),
+        number=number,
+    )
+    parse_qsl_time = timeit(
+        lambda: parse_qsl(decoded_query_string, keep_blank_values=True), number=number
+    )
+
+    def per_call(total: float) -> str:
+        return f"{total / number * 1_000_000:10.2f} us"
+
+    result = (
+        f"{name:<20} | smile {per_call(smile_time)} | parse_qsl {per_call(parse_qsl_time)}"
+    )
+    try:
+        parse_query_string(query_string)
+    except HTTPException:
+        # Rejected by default limits before any parsing.
+        rejected_time = timeit(_rejecting(query_string), number=number)
+        result += f" | smile default limits (rejected) {per_call(rejected_time)}"
+    print(result)
+
+
+def _rejecting(query_string: bytes):
+    def parse() -> None:
+        try:
+            parse_query_string(query_string)
+        except HTTPException:
+            pass
+
+    return parse
+
+
+if __name__ == "__main__":
+    for case_name, case_query_string in CASES.items():
+        run(case_name, case_query_string, number=20_000 if len(case_query_string) < 1_000 else 200)
@@ -0,0 +1,69 @@
+"""
+    Routing benchmark: linear routes scan (old behaviour) versus compiled route tree.
+
+    Run: python benchmarks/routing.py (from any directory, `smile` is imported from this repository)
+"""
+import os
+import sys
+from timeit import timeit
+from typing import Callable, Dict, List, Tuple
+
+# Run as script, so repository root is added for `smile` import without install or PYTHONPATH.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smile.routing import Route, RouteTree
+
+
+def _endpoint():
+    return "Hello world!"
+
+
+def _build_paths(routes_count: int) -> List[str]:
+    paths = []
+    for index in range(routes_count):
+        if index % 2:
+            paths.append(f"/api/v1/resource{index}/{{item_id:int}}")
+        else:
+            paths.append(f"/api/v1/resource{index}/items")
+    return paths
+
+
+def _linear_lookup(
+    routes: Dict[str, Tuple[Callable, List[str]]], path: str, method: str
+) -> bool:
+    for route_path, route_data in routes.items():
+        _, route_http_methods = route_data
+        if route_path == path:
+            return method in route_http_methods
+    return False
+
+
+def run(routes_count: int, number: int = 10_000) -> None:
+    paths = _build_paths(routes_count)
+    linear_routes = {path: (_endpoint, ["GET"]) for path in paths}
+    tree = RouteTree()
+    for path in paths:
+        tree.insert(Route(path=path, endpoint_func=_endpoint, methods=["GET"]))
+
+    last_static_path = paths[-2] if routes_count > 1 else paths[-1]
+    last_param_path = f"/api/v1/resource{routes_count - 1}/42"
+
+    linear_time = timeit(
+        lambda: _linear_lookup(linear_routes, last_static_path, "GET"), number=number
+    )
+    tree_static_time = timeit(lambda: tree.match(last_static_path), number=number)
+    tree_param_time = timeit(lambda: tree.match(last_param_path), number=number)
+
+    def per_call(total: float) -> str:
+        return f"{total / number * 1_000_000:10.3f} us"
+
+    print(
+        f"{routes_count:>6} routes | linear {per_call(linear_time)}"
+        f" | tree static {per_call(tree_static_time)}"
+        f" | tree param {per_call(tree_param_time)}"
+    )
+
+
+if __name__ == "__main__":
+    for count in (10, 1_000, 10_000):
+        run(count, number=1_000 if count == 10_000 else 10_000)
@@ -49,11 +49,6 @@ async def request_arg(request: Request):
     }
 
 
-@app.route("/kwargs")
-async def kwargs_response(**kwargs):
-    return {"kwargs": kwargs}
-
-
 @app.route("/app")
 async def app_param(app: Smile):
     return {"dir": dir(app)}
@@ -10,7 +10,8 @@ async def jinja_template(app: Smile):
 
 
 app.setup_jinja_environment(
-    jinja2.Environment(enable_async=True, loader=jinja2.FileSystemLoader("templates"))
+    jinja2.Environment(enable_async=True, loader=jinja2.FileSystemLoader("templates")),
+    render_cache_size=128,
 )
 
 if __name__ == "__main__":
@@ -4,8 +4,21 @@
 
 from smile.types import Send, Scope, Receive, Message
 from smile.routing import Router
-from smile.responses import PlainResponse, HTMLResponse
-from smile.requests import Request
+from smile.responses import (
+    PlainResponse,
+    HTMLResponse,
+    JSONResponse,
+    StreamingResponse,
+    FileResponse,
+    StaticResponse,
+)
+from smile.requests import Request, FormData, JSONBody
+from smile.websockets import WebSocket
+from smile.background import BackgroundTasks
+from smile.broadcast import Broadcast
+from smile.exceptions import HTTPException, WebSocketDisconnect
+from smile.datastructures import State
+from smile.cache import cached
 from smile.app import Smile
 
 __all__ = [
@@ -15,7 +28,20 @@ __all__ = [
     "Message",
     "Smile",
     "Request",
+    "FormData",
+    "JSONBody",
+    "BackgroundTasks",
+    "WebSocket",
+    "WebSocketDisconnect",
+    "Broadcast",
+    "HTTPException",
+    "State",
+    "cached",
     "PlainResponse",
     "HTMLResponse",
+    "JSONResponse",
+    "StreamingResponse",
+    "FileResponse",
+    "StaticResponse",
     "Router",
 ]
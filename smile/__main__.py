@@ -0,0 +1,9 @@
+"""
+    Pre-fork runner entry point: python -m smile module:app --workers 4
+"""
+import sys
+
+from smile.runner import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,121 @@
-from typing import Union, Tuple, Optional, MutableMapping, Dict, Callable, Any
-from inspect import signature, iscoroutinefunction
-from inspect import Parameter as SignatureParameter
+import os
+import asyncio
+import logging
+from http import HTTPStatus
+from typing import (
+    Union,
+    Tuple,
+    Optional,
+    Mapping,
+    MutableMapping,
+    Dict,
+    Callable,
+    Any,
+    List,
+    Type,
+    Hashable,
+    Awaitable,
+)
+from inspect import isawaitable, iscoroutinefunction, signature
+from traceback import format_exc
 
 from smile.types import Send, Scope, Receive
-from smile.routing import parse_args_from_scope, Router
-from smile.responses import PlainResponse, JSONResponse, HTMLResponse, BaseResponse
-from smile.requests import Request
+from smile.routing import (
+    get_query_args,
+    get_path_param_names,
+    get_typed_path_param_names,
+    get_path_pattern,
+    Router,
+    Route,
+    RouteTree,
+    ANY_METHOD,
+    WEBSOCKET_METHOD,
+)
+from smile.responses import (
+    PlainResponse,
+    JSONResponse,
+    HTMLResponse,
+    StreamingResponse,
+    StaticResponse,
+    BaseResponse,
+    HEAD_WITH_BODY_SCOPE_KEY,
+)
+from smile.templating import Templates, TemplateContent
+from smile.cache import (
+    CacheBackend,
+    MemoryCacheBackend,
+    ResponseCache,
+    get_response_cache,
+)
+from smile.requests import Request, FormData, JSONBody
+from smile.staticfiles import StaticFiles
+from smile.background import BackgroundTasks, BackgroundWorkerPool
+from smile.limits import ConcurrencyLimiter
+from smile.instrumentation import (
+    Instrumentation,
+    InstrumentationHook,
+    MetricsCollector,
+    EVENT_REQUEST_START,
+    EVENT_ROUTE_MATCHED,
+    EVENT_ARGS_BOUND,
+    EVENT_HANDLER_DONE,
+    EVENT_RESPONSE_RENDERED,
+    EVENT_RESPONSE_SENT,
+    ROUTE_SCOPE_KEY,
+    STATUS_CODE_SCOPE_KEY,
+)
+from smile.exceptions import HTTPException, WebSocketDisconnect, ClientDisconnect
+from smile.validation import convert_with_errors
+from smile.websockets import (
+    WebSocket,
+    WEBSOCKET_DISCONNECTED,
+    WEBSOCKET_CLOSE_NORMAL,
+    WEBSOCKET_CLOSE_POLICY_VIOLATION,
+    WEBSOCKET_CLOSE_INTERNAL_ERROR,
+)
+from smile.datastructures import State
+from smile.middleware import ASGIApp
+from smile.concurrency import (
+    ExecutorPool,
+    EXECUTOR_THREAD,
+    EXECUTOR_INLINE,
+    EXECUTOR_PROCESS,
+)
+from smile.query import DEFAULT_MAX_QUERY_PARAMS, DEFAULT_MAX_QUERY_LENGTH
+from smile.serialization import JSONSerializer, default_json_serializer
+from smile.endpoints import (
+    EndpointPlan,
+    compile_endpoint,
+    REQUIRED,
+    SOURCE_ARGS,
+    SOURCE_PATH,
+    SOURCE_REQUEST,
+    SOURCE_APP,
+    SOURCE_STATE,
+    SOURCE_BODY,
+    SOURCE_JSON,
+    SOURCE_FORM,
+    SOURCE_WEBSOCKET,
+    SOURCE_BACKGROUND,
+)
+
+logger = logging.getLogger("smile")
+
+# Scope key for request object shared within request.
+REQUEST_SCOPE_KEY = "smile.request"
+# Scope key for websocket object of websocket connection.
+WEBSOCKET_SCOPE_KEY = "smile.websocket"
+# Scope key for background tasks of request (only if endpoint receives them).
+BACKGROUND_TASKS_SCOPE_KEY = "smile.background_tasks"
+
+# Constant responses, encoded once.
+_NOT_FOUND_RESPONSE = StaticResponse(PlainResponse("Not Found!", status_code=404))
+_INTERNAL_SERVER_ERROR_RESPONSE = StaticResponse(
+    PlainResponse("Internal Server Error!", status_code=500)
+)
+_GATEWAY_TIMEOUT_RESPONSE = StaticResponse(
+    PlainResponse("Gateway Timeout!", status_code=504)
+)
 
 try:
     import jinja2
@@ -20,35 +130,270 @@ class Smile:
     Smile ASGI framework application.
     """
 
-    def __init__(self):
-        self.routes = dict()  # TODO: Rework routes system.
-        self.error_handlers = dict()
+    def __init__(
+        self,
+        max_body_size: Optional[int] = None,
+        json_serializer: Optional[JSONSerializer] = None,
+        max_query_params: int = DEFAULT_MAX_QUERY_PARAMS,
+        max_query_length: int = DEFAULT_MAX_QUERY_LENGTH,
+        thread_pool_size: Optional[int] = None,
+        process_pool_size: Optional[int] = None,
+        cache_backend: Optional[CacheBackend] = None,
+        background_concurrency: int = 64,
+        background_max_pending: int = 1024,
+        background_drain_timeout: Optional[float] = 30.0,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        retry_after: int = 1,
+    ):
+        """
+        :param max_body_size: Max allowed request body size in bytes (None for unlimited).
+        :param json_serializer: JSON serializer (content to bytes), fastest installed by default.
+        :param max_query_params: Max count of query params (400 if exceeded).
+        :param max_query_length: Max length of query string in bytes (414 if exceeded).
+        :param thread_pool_size: Max threads running synchronous endpoints.
+        :param process_pool_size: Max processes running endpoints with `executor="process"`.
+        :param cache_backend: Backend for cached routes, in-process LRU by default.
+        :param background_concurrency: Max count of requests background tasks running at once.
+        :param background_max_pending: Max count of requests background tasks waiting to run.
+        :param background_drain_timeout: Seconds to wait for background tasks at shutdown (None for unlimited).
+        :param max_concurrency: Max count of HTTP requests handled at once (None for unlimited).
+        :param max_queue: Max count of requests waiting for slot (as `max_concurrency` if None), rest are shed with 503.
+        :param retry_after: Seconds sent in `Retry-After` header of shed (503) responses.
+        """
+        self.max_body_size = max_body_size
+        self.max_query_params = max_query_params
+        self.max_query_length = max_query_length
+        self.cache_backend = (
+            cache_backend if cache_backend is not None else MemoryCacheBackend()
+        )
+        self.background = BackgroundWorkerPool(
+            max_concurrency=background_concurrency, max_pending=background_max_pending
+        )
+        self.background_drain_timeout = background_drain_timeout
+        self.retry_after = retry_after
+        self.limiter = (
+            ConcurrencyLimiter(max_concurrency, max_queue, retry_after=retry_after)
+            if max_concurrency is not None
+            else None
+        )
+        # Count of timed out (504) endpoint calls, by route path.
+        self.timed_out: Dict[str, int] = dict()
+        self.executor_pools: Dict[str, ExecutorPool] = {
+            EXECUTOR_THREAD: ExecutorPool(EXECUTOR_THREAD, max_workers=thread_pool_size),
+            EXECUTOR_PROCESS: ExecutorPool(
+                EXECUTOR_PROCESS, max_workers=process_pool_size
+            ),
+        }
+        self.json_serializer = (
+            json_serializer if json_serializer is not None else default_json_serializer
+        )
+        self.routes = dict()
+        self.route_tree = RouteTree()
+        # All registered routes in registration order (with overwritten ones, reported at compile).
+        self._registered_routes: List[Route] = []
+        self.is_compiled = False
+        self.error_handlers: Dict[int, Callable] = dict()
+        self.exception_handlers: Dict[Type[BaseException], Callable] = dict()
+        self._exception_handlers_cache: Dict[
+            Type[BaseException], Optional[Callable]
+        ] = dict()
         self._jinja_env = None
+        self.templates: Optional[Templates] = None
+        self.state = State()
+        self._startup_handlers: List[Callable] = []
+        self._shutdown_handlers: List[Callable] = []
+        self._middlewares: List[Tuple[Callable, Dict[str, Any]]] = []
+        self._function_middlewares: List[Callable] = []
+        self._middleware_stack: Optional[ASGIApp] = None
+        # Function middlewares chain (None if there are no function middlewares).
+        self._http_handler: Optional[Callable] = None
+        self._http_connection_handler: Callable = self._serve_http
+        # HTTP entry point, middleware stack or HTTP handler itself if there are no ASGI middlewares.
+        self._http_app: Optional[ASGIApp] = None
+        self.instrumentation = Instrumentation()
+        self.metrics: Optional[MetricsCollector] = None
+        self.static_files: List[StaticFiles] = []
 
     def _alter_scope_on_call(self, scope: Scope) -> None:
         """
         Alters scope on call with required values.
         """
         scope["app"] = self
-        scope["state"] = dict()
 
     def include_router(self, router: Router) -> None:
         """
         Inclde router with all routes handlers in it.
         """
-        for route_path, route_data in router.routes.items():
-            route_func, methods = route_data
-            self.add_route(route_path, route_func, methods)
+        for route_path, route_func, methods, route_options in router.routes:
+            self.add_route(route_path, route_func, methods, **route_options)
+        for route_path, route_func in router.websocket_routes:
+            self.add_websocket_route(route_path, route_func)
 
     def add_route(
-        self, path: str, endpoint_func: Callable, methods: list[str] | None = None
+        self,
+        path: str,
+        endpoint_func: Callable,
+        methods: list[str] | None = None,
+        executor: str = EXECUTOR_THREAD,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
     ) -> None:
-        # TODO: Rework routes system.
+        """
+        :param executor: Where synchronous endpoint is called, `thread` (bounded thread pool),
+        `inline` (on the event loop, for trivially cheap endpoints) or `process` (process pool).
+        :param max_concurrency: Max count of route requests handled at once, in addition to application limit.
+        :param max_queue: Max count of route requests waiting for slot, rest are shed with 503.
+        :param timeout: Seconds endpoint may run, then it is cancelled and 504 is returned
+        (synchronous endpoint can not be interrupted, its thread keeps running).
+        """
+        self._ensure_not_compiled("add route")
         if methods is None:
             methods = ["GET"]
+        methods = [method.upper() for method in methods]
+        plan = compile_endpoint(
+            endpoint_func,
+            injectables={
+                Request: SOURCE_REQUEST,
+                Smile: SOURCE_APP,
+                State: SOURCE_STATE,
+                bytes: SOURCE_BODY,
+                JSONBody: SOURCE_JSON,
+                FormData: SOURCE_FORM,
+                BackgroundTasks: SOURCE_BACKGROUND,
+            },
+            path_param_names=get_path_param_names(path),
+            executor=executor,
+            typed_path_param_names=get_typed_path_param_names(path),
+        )
         self.routes[path] = endpoint_func, methods
+        self._insert_route(
+            Route(
+                path=path,
+                endpoint_func=endpoint_func,
+                methods=methods,
+                plan=plan,
+                response_cache=get_response_cache(endpoint_func),
+                limiter=(
+                    ConcurrencyLimiter(
+                        max_concurrency, max_queue, retry_after=self.retry_after
+                    )
+                    if max_concurrency is not None
+                    else None
+                ),
+                timeout=timeout,
+            )
+        )
+
+    def _insert_route(self, route: Route) -> None:
+        self._registered_routes.append(route)
+        self.route_tree.insert(route)
+
+    def add_websocket_route(self, path: str, endpoint_func: Callable) -> None:
+        """
+        Registers websocket endpoint (coroutine function), which receives `WebSocket` as param.
+        """
+        self._ensure_not_compiled("add websocket route")
+        if not iscoroutinefunction(endpoint_func):
+            raise TypeError(
+                f"Websocket endpoint {getattr(endpoint_func, '__qualname__', endpoint_func)} should be coroutine function!"
+            )
+        plan = compile_endpoint(
+            endpoint_func,
+            injectables={
+                WebSocket: SOURCE_WEBSOCKET,
+                Smile: SOURCE_APP,
+                State: SOURCE_STATE,
+            },
+            path_param_names=get_path_param_names(path),
+            typed_path_param_names=get_typed_path_param_names(path),
+        )
+        self._insert_route(
+            Route(
+                path=path,
+                endpoint_func=endpoint_func,
+                methods=[WEBSOCKET_METHOD],
+                plan=plan,
+            )
+        )
 
-    def route(self, path: str, methods: list[str] | None = None) -> Callable:
+    def websocket(self, path: str) -> Callable:
+        """
+        Websocket route decorator for endpoint coroutine function.
+
+        Use example:
+        @app.websocket("/echo")
+        async def echo(websocket: WebSocket):
+            await websocket.accept()
+            async for text in websocket.iter_text():
+                await websocket.send_text(text)
+        """
+
+        def wrapper(route_func: Callable) -> Callable:
+            self.add_websocket_route(path=path, endpoint_func=route_func)
+            return route_func
+
+        return wrapper
+
+    def add_static_route(
+        self,
+        path: str,
+        response: BaseResponse,
+        methods: list[str] | None = None,
+    ) -> None:
+        """
+        Registers route that always answers with same constant response, encoded once here.
+
+        Use example:
+        app.add_static_route("/health", JSONResponse({"status": "ok"}))
+        """
+        if not isinstance(response, StaticResponse):
+            response = StaticResponse(response)
+
+        def static_endpoint() -> StaticResponse:
+            return response
+
+        self.add_route(
+            path=path,
+            endpoint_func=static_endpoint,
+            methods=methods,
+            executor=EXECUTOR_INLINE,
+        )
+
+    def mount_static(
+        self, path: str, directory: Union[str, os.PathLike], **options: Any
+    ) -> StaticFiles:
+        """
+        Serves files of directory under path prefix, index of files is built at warmup.
+
+        :param options: Options of `smile.staticfiles.StaticFiles`.
+
+        Use example:
+        app.mount_static("/static", "static", cache_control="public, max-age=3600")
+        """
+        self._ensure_not_compiled("mount static files")
+        static_files = StaticFiles(directory, **options)
+        self.static_files.append(static_files)
+
+        async def static_endpoint(request: Request, path: str) -> BaseResponse:
+            return await static_files.respond(request.scope, path)
+
+        self.add_route(
+            path=f"{path.rstrip('/')}/{{path:path}}",
+            endpoint_func=static_endpoint,
+            methods=["GET", "HEAD"],
+            executor=EXECUTOR_INLINE,
+        )
+        return static_files
+
+    def route(
+        self,
+        path: str,
+        methods: list[str] | None = None,
+        executor: str = EXECUTOR_THREAD,
+        **route_options: Any,
+    ) -> Callable:
         """
         Route decorator for endpoing function.
 
@@ -56,15 +401,142 @@ class Smile:
         @app.route("/path")
         def route():
             return BaseResponse("Hello world!")
+
+        :param route_options: Passed to the `add_route` (`max_concurrency`, `max_queue`, `timeout`).
         """
 
         def wrapper(route_func: Callable) -> Callable:
-            self.add_route(path=path, endpoint_func=route_func, methods=methods)
+            self.add_route(
+                path=path,
+                endpoint_func=route_func,
+                methods=methods,
+                executor=executor,
+                **route_options,
+            )
             return route_func
 
         return wrapper
 
-    def setup_jinja_environment(self, env) -> None:
+    def add_middleware(self, middleware_class: Callable, **options: Any) -> None:
+        """
+        Registers ASGI middleware, constructed as `middleware_class(app, **options)`.
+
+        First registered middleware is outermost.
+        """
+        self._ensure_middleware_stack_is_not_built()
+        self._middlewares.append((middleware_class, options))
+
+    def middleware(self, middleware_func: Callable) -> Callable:
+        """
+        Registers function middleware decorator.
+
+        Use example:
+        @app.middleware
+        async def middleware(request: Request, call_next) -> BaseResponse:
+            response = await call_next(request)
+            return response
+        """
+        self._ensure_middleware_stack_is_not_built()
+        self._function_middlewares.append(middleware_func)
+        return middleware_func
+
+    def _ensure_middleware_stack_is_not_built(self) -> None:
+        if self._middleware_stack is not None:
+            raise RuntimeError(
+                "Can not add middleware after application is started (middlewares are already composed)!"
+            )
+
+    def _ensure_not_compiled(self, action: str) -> None:
+        if self.is_compiled:
+            raise RuntimeError(
+                f"Can not {action} after application is compiled (application is frozen)!"
+            )
+
+    def _get_request(self, scope: Scope, receive: Receive) -> Request:
+        """
+        Returns request object, shared by middlewares and endpoint within request.
+        """
+        request = scope.get(REQUEST_SCOPE_KEY)
+        if request is None:
+            request = scope[REQUEST_SCOPE_KEY] = Request(
+                scope=scope, receive=receive, max_body_size=self.max_body_size
+            )
+        return request
+
+    def add_instrumentation_hook(self, event: str, hook: InstrumentationHook) -> None:
+        """
+        Registers request lifecycle hook, called as `hook(scope, timestamp)`.
+
+        Events are `smile.instrumentation.EVENTS`, there is no overhead if no hooks are registered.
+        """
+        self.instrumentation.add_hook(event, hook)
+
+    def setup_metrics(
+        self,
+        collector: Optional[MetricsCollector] = None,
+        path: Optional[str] = "/metrics",
+    ) -> MetricsCollector:
+        """
+        Installs per-route latency metrics collector.
+
+        :param collector: Collector to install, default collector if not specified.
+        :param path: Route path for metrics in Prometheus text format (None for no route).
+        """
+        self._ensure_not_compiled("install metrics collector")
+        if self.metrics is not None:
+            raise RuntimeError("Metrics collector is already installed!")
+        self.metrics = collector if collector is not None else MetricsCollector()
+        self.metrics.install(self.instrumentation)
+        if path is not None:
+            metrics = self.metrics
+
+            def metrics_endpoint() -> PlainResponse:
+                return PlainResponse(
+                    metrics.render_prometheus(), media_type="text/plain; version=0.0.4"
+                )
+
+            self.add_route(
+                path=path,
+                endpoint_func=metrics_endpoint,
+                methods=["GET"],
+                executor=EXECUTOR_INLINE,
+            )
+        return self.metrics
+
+    def on_startup(self, handler: Callable) -> Callable:
+        """
+        Registers handler (sync or async) called once at lifespan startup.
+
+        Use example:
+        @app.on_startup
+        async def open_pool(app: Smile):
+            app.state.pool = await create_pool()
+        """
+        self._startup_handlers.append(handler)
+        return handler
+
+    def on_shutdown(self, handler: Callable) -> Callable:
+        """
+        Registers handler (sync or async) called once at lifespan shutdown.
+        """
+        self._shutdown_handlers.append(handler)
+        return handler
+
+    def setup_jinja_environment(
+        self,
+        env,
+        render_cache_size: int = 0,
+        render_cache_ttl: Optional[float] = None,
+        stream: bool = False,
+    ) -> None:
+        """
+        Installs Jinja environment, templates are precompiled at lifespan startup.
+
+        :param render_cache_size: Max count of cached rendered templates (0 disables cache).
+        :param render_cache_ttl: Time to live of rendered template in seconds.
+        :param stream: Send rendered templates by chunks as they are produced.
+        """
+        self._ensure_not_compiled("install Jinja environment")
         if not jinja_is_installed:
             raise ImportError("Jinja is installed, install by `pip install jinja2`!")
         if not isinstance(env, jinja2.Environment):
@@ -72,205 +544,839 @@ class Smile:
                 "Expected Jinja enviroment to be Jinja environment, not any other type!"
             )
         self._jinja_env = env
+        self.templates = Templates(
+            env,
+            render_cache_size=render_cache_size,
+            render_cache_ttl=render_cache_ttl,
+            stream=stream,
+        )
 
     async def jinja_template(
         self,
         name: str,
         globals: MutableMapping[str, Any] | None = None,
         parent: str | None = None,
+        cache_key: Hashable | None = None,
         **context,
-    ) -> str:
+    ) -> TemplateContent:
+        """
+        Returns template to be rendered with context (as endpoint response).
+
+        :param cache_key: Render cache key, required to cache template with context that is not
+        made of primitive values (str, int, float, bool, bytes, None), otherwise it is not cached.
+        """
         if self._jinja_env is None:
             raise Exception(
                 "Jinja environment is not installed! Please call `setup_jinja_environment`!"
             )
-        if globals is None:
-            globals = dict()
-        return self._jinja_env.get_template(
-            name=name, parent=parent, globals=globals | context
+        if globals:
+            context = {**globals, **context}
+        return TemplateContent(
+            name=name, parent=parent, context=context, cache_key=cache_key
+        )
+
+    async def _render_template_response(
+        self, template: TemplateContent, status_code: int
+    ) -> BaseResponse:
+        if self.templates.stream:
+            return StreamingResponse(
+                self.templates.generate(template),
+                status_code=status_code,
+                media_type=HTMLResponse.http_media_type,
+            )
+        return HTMLResponse(
+            content=await self.templates.render(template), status_code=status_code
         )
 
     def add_error_handler(self, status_code: int, error_handler: Callable) -> None:
+        self._ensure_not_compiled("add error handler")
         self.error_handlers[status_code] = error_handler
 
+    def add_exception_handler(
+        self, exception_class: Type[BaseException], exception_handler: Callable
+    ) -> None:
+        """
+        Registers handler for exceptions raised while handling request.
+
+        Handler is called with exception and resolved by exception class MRO,
+        so handler for base class also handles subclasses.
+        """
+        self._ensure_not_compiled("add exception handler")
+        self.exception_handlers[exception_class] = exception_handler
+        self._exception_handlers_cache.clear()
+
+    def _resolve_exception_handler(
+        self, exception_class: Type[BaseException]
+    ) -> Optional[Callable]:
+        """
+        Returns exception handler by exception class MRO (cached per exception class).
+        """
+        try:
+            return self._exception_handlers_cache[exception_class]
+        except KeyError:
+            pass
+        exception_handler = None
+        for base_class in exception_class.__mro__:
+            exception_handler = self.exception_handlers.get(base_class)
+            if exception_handler is not None:
+                break
+        self._exception_handlers_cache[exception_class] = exception_handler
+        return exception_handler
+
     async def _wrap_response_in_response_class(
         self, response: Any
     ) -> Optional[BaseResponse]:
         """
         Wraps response any in to the response class or returns None if dissalow type.
+
+        Most common results (response, dict, str) are checked first with builtin types.
         """
+        if isinstance(response, BaseResponse):
+            return response
         status_code = 200
-        if (
-            isinstance(response, jinja2.Template)
-            and self._jinja_env is not None
-            and jinja_is_installed
-        ):
-            return HTMLResponse(
-                content=await response.render_async(), status_code=status_code
-            )
-        if isinstance(response, Tuple) and len(response) >= 2:
+        if isinstance(response, tuple) and len(response) >= 2:
             content, status_code, *_ = response
-            if isinstance(content, (str, Dict)):
-                response = content
-            if (
-                isinstance(content, jinja2.Template)
-                and self._jinja_env is not None
-                and jinja_is_installed
+            if isinstance(content, (str, dict, TemplateContent)) or (
+                jinja_is_installed and isinstance(content, jinja2.Template)
             ):
-                return HTMLResponse(
-                    content=await response.render_async(), status_code=status_code
-                )
+                response = content
+        if isinstance(response, dict):
+            return JSONResponse(
+                content=response,
+                status_code=status_code,
+                serializer=self.json_serializer,
+            )
         if isinstance(response, str):
-            response = PlainResponse(content=response, status_code=status_code)
-        if isinstance(response, Dict):
-            response = JSONResponse(content=response, status_code=status_code)
-        return response if isinstance(response, BaseResponse) else None
+            return PlainResponse(content=response, status_code=status_code)
+        if isinstance(response, TemplateContent):
+            return await self._render_template_response(response, status_code)
+        if jinja_is_installed and isinstance(response, jinja2.Template):
+            return HTMLResponse(
+                content=await response.render_async(), status_code=status_code
+            )
+        return None
 
-    def _build_endpoint_func_args(
-        self, endpoint_func: Callable, parsed_args: Dict[str, Any], scope: Scope
+    async def _build_endpoint_func_args(
+        self,
+        plan: EndpointPlan,
+        path_params: Mapping[str, Any],
+        scope: Scope,
+        receive: Receive,
     ) -> Union[Dict[str, Any], BaseResponse]:
-        endpoint_func_signature = signature(endpoint_func)
+        """
+        Runs endpoint call plan and returns kwargs (or 422 response with all errors if validation failed).
+        """
         endpoint_kwargs = dict()
-
-        for param in endpoint_func_signature.parameters.values():
-            param_type = param.annotation
-            param_kind = param.kind
-            if param_kind == SignatureParameter.POSITIONAL_ONLY:
-                return PlainResponse(
-                    f"Validation error! {param.name} is positional only, which is not supported currently by framework!",
-                    status_code=400,
-                )
-            if param_kind in (
-                SignatureParameter.VAR_POSITIONAL,
-                SignatureParameter.VAR_KEYWORD,
-            ):
-                return PlainResponse(
-                    "Validation error! Has nothing to do with *args or **kwargs params, currently (or forever) is not supported by framework!",
-                    status_code=400,
-                )
-            if param_type == SignatureParameter.empty:
-                return PlainResponse(
-                    f"Validation error! {param.name} has unknown-type to parse!",
-                    status_code=400,
-                )
-            param_is_missing = False
-            param_is_internal = param_type in (Request, Smile)
-            try:
-                parsed_param_value = parsed_args[param.name]
-            except KeyError:
-                param_is_missing = True
-                if param_is_internal:
-                    if param_type == Request:
-                        param_is_missing = False
-                        parsed_param_value = Request(scope=scope)
-                    elif param_type == Smile:
-                        param_is_missing = False
-                        parsed_param_value = self
-                elif param.default == SignatureParameter.empty:
-                    return PlainResponse(
-                        f"Validation error! {param.name} is missing!", status_code=400
-                    )
-            if param_is_missing:
-                param_value = param.default
+        errors = None
+        request = None
+        query_args = get_query_args(scope) if plan.uses_query_args else None
+        for param in plan.params:
+            param_source = param.source
+            if param_source == SOURCE_ARGS:
+                parsed_args = query_args
+            elif param_source == SOURCE_PATH:
+                parsed_args = path_params
+            elif param_source == SOURCE_APP:
+                endpoint_kwargs[param.name] = self
+                continue
+            elif param_source == SOURCE_STATE:
+                endpoint_kwargs[param.name] = self.state
+                continue
+            elif param_source == SOURCE_WEBSOCKET:
+                endpoint_kwargs[param.name] = scope[WEBSOCKET_SCOPE_KEY]
+                continue
+            elif param_source == SOURCE_BACKGROUND:
+                background_tasks = scope.get(BACKGROUND_TASKS_SCOPE_KEY)
+                if background_tasks is None:
+                    background_tasks = scope[BACKGROUND_TASKS_SCOPE_KEY] = BackgroundTasks()
+                endpoint_kwargs[param.name] = background_tasks
+                continue
             else:
-                try:
-                    param_value = (
-                        parsed_param_value
-                        if param_is_internal
-                        else param_type(parsed_param_value)
+                if request is None:
+                    request = self._get_request(scope, receive)
+                if param_source == SOURCE_REQUEST:
+                    endpoint_kwargs[param.name] = request
+                elif param_source == SOURCE_BODY:
+                    endpoint_kwargs[param.name] = await request.body()
+                elif param_source == SOURCE_JSON:
+                    if param.converter is None:
+                        endpoint_kwargs[param.name] = await request.json()
+                        continue
+                    body_value, body_errors = convert_with_errors(
+                        param.converter, await request.json(), ("body",)
                     )
-                except TypeError:
-                    return PlainResponse(
-                        f"Validation error! {param.name} has invalid type (signature)!",
-                        status_code=400,
+                    if body_errors:
+                        errors = (errors or []) + body_errors
+                    else:
+                        endpoint_kwargs[param.name] = body_value
+                elif param_source == SOURCE_FORM:
+                    endpoint_kwargs[param.name] = await request.form()
+                continue
+            if param.is_multi:
+                parsed_param_values = parsed_args.getlist(param.name)
+                if not parsed_param_values:
+                    if param.default is REQUIRED:
+                        errors = _add_validation_error(
+                            errors, param_source, param.name, "Field required", "missing"
+                        )
+                        continue
+                    endpoint_kwargs[param.name] = param.default
+                    continue
+                try:
+                    endpoint_kwargs[param.name] = [
+                        param.converter(value) for value in parsed_param_values
+                    ]
+                except (ValueError, TypeError) as exception:
+                    errors = _add_validation_error(
+                        errors, param_source, param.name, str(exception), "invalid"
                     )
-                except ValueError:
-                    return PlainResponse(
-                        f"Validation error! {param.name} has invalid value!",
-                        status_code=400,
+                continue
+            try:
+                parsed_param_value = parsed_args[param.name]
+            except KeyError:
+                if param.default is REQUIRED:
+                    errors = _add_validation_error(
+                        errors, param_source, param.name, "Field required", "missing"
                     )
-            endpoint_kwargs[param.name] = param_value
-        return endpoint_kwargs
-
-    async def _process_with_error_handlers(self, response: BaseResponse):
-        for target_status_code, error_handler in self.error_handlers.items():
-            if response.http_status_code == target_status_code:
-                error_handler_response = await self._wrap_response_in_response_class(
-                    error_handler()
+                    continue
+                endpoint_kwargs[param.name] = param.default
+                continue
+            try:
+                endpoint_kwargs[param.name] = param.converter(parsed_param_value)
+            except (ValueError, TypeError) as exception:
+                errors = _add_validation_error(
+                    errors, param_source, param.name, str(exception), "invalid"
                 )
-                if not isinstance(error_handler_response, BaseResponse):
-                    return PlainResponse("Internal Server Error!", status_code=500)
+        if errors:
+            return JSONResponse(
+                {"detail": errors}, status_code=422, serializer=self.json_serializer
+            )
+        return endpoint_kwargs
 
-                return error_handler_response
-        return response
+    async def _process_with_error_handlers(
+        self, response: BaseResponse
+    ) -> BaseResponse:
+        error_handler = self.error_handlers.get(response.http_status_code)
+        if error_handler is None:
+            return response
+        return await self._call_error_handler(error_handler)
 
-    async def _handle_request_to_endpoint(
-        self, scope: Scope, receive: Receive, send: Send
+    async def _call_error_handler(
+        self, error_handler: Callable, *args: Any
     ) -> BaseResponse:
+        error_handler_response = error_handler(*args)
+        if isawaitable(error_handler_response):
+            error_handler_response = await error_handler_response
+        error_handler_response = await self._wrap_response_in_response_class(
+            error_handler_response
+        )
+        if not isinstance(error_handler_response, BaseResponse):
+            return _INTERNAL_SERVER_ERROR_RESPONSE
+        return error_handler_response
+
+    async def _handle_exception(self, exception: Exception) -> BaseResponse:
+        """
+        Converts exception raised while handling request in to the response.
         """
-        Handles request and returns Response.
+        exception_handler = self._resolve_exception_handler(type(exception))
+        if exception_handler is not None:
+            return await self._call_error_handler(exception_handler, exception)
+        if isinstance(exception, HTTPException):
+            response = PlainResponse(
+                content=exception.detail, status_code=exception.status_code
+            )
+        else:
+            logger.error("Exception in endpoint!", exc_info=exception)
+            response = _INTERNAL_SERVER_ERROR_RESPONSE
+        return await self._process_with_error_handlers(response=response)
+
+    def _handle_request_to_endpoint(
+        self, scope: Scope, receive: Receive
+    ) -> Union[BaseResponse, Awaitable[BaseResponse]]:
+        """
+        Handles request and returns Response (not found or not allowed) or endpoint call to await.
+
+        Endpoint call is returned not awaited, so routing keeps no coroutine frame while endpoint runs.
         """
         requested_path = scope.get("path", "/")
         requested_method = scope.get("method", "GET")
-        for route_path, route_data in self.routes.items():
-            route_endpoint_func, route_http_methods = route_data
-            print(route_endpoint_func, route_http_methods)
-            if route_path == requested_path:
-                http_method_is_allowed = any(
-                    route_http_method == "*" or requested_method == route_http_method
-                    for route_http_method in route_http_methods
-                )
-                if not http_method_is_allowed:
-                    return PlainResponse(
-                        f"Method {requested_method} is not allowed for {requested_path}!",
-                        status_code=405,
+        method_table, path_params = self.route_tree.match(requested_path)
+        if method_table is None:
+            return _NOT_FOUND_RESPONSE
+        route = method_table.get(requested_method) or method_table.get(ANY_METHOD)
+        if route is None:
+            return PlainResponse(
+                f"Method {requested_method} is not allowed for {requested_path}!",
+                status_code=405,
+            )
+        scope["path_params"] = path_params
+        if self.instrumentation.enabled:
+            scope[ROUTE_SCOPE_KEY] = route.path
+            self.instrumentation.emit(EVENT_ROUTE_MATCHED, scope)
+        if route.is_limited:
+            return self._call_limited_route(route, path_params, scope, receive)
+        response_cache = route.response_cache
+        if (
+            response_cache is not None
+            and requested_method in response_cache.cacheable_methods
+        ):
+            return self._handle_cached_request(
+                response_cache, route.plan, path_params, scope, receive
+            )
+        return self._call_endpoint(route.plan, path_params, scope, receive)
+
+    async def _call_limited_route(
+        self,
+        route: Route,
+        path_params: Mapping[str, Any],
+        scope: Scope,
+        receive: Receive,
+    ) -> BaseResponse:
+        """
+        Calls route with own concurrency limit or timeout, holding route limiter slot for the call.
+        """
+        limiter = route.limiter
+        if limiter is None:
+            return await self._call_route(route, path_params, scope, receive)
+        if not await limiter.acquire():
+            return limiter.shed_response
+        try:
+            return await self._call_route(route, path_params, scope, receive)
+        finally:
+            limiter.release()
+
+    async def _call_route(
+        self,
+        route: Route,
+        path_params: Mapping[str, Any],
+        scope: Scope,
+        receive: Receive,
+    ) -> BaseResponse:
+        """
+        Calls route endpoint (through response cache if route is cached) within route timeout.
+        """
+        response_cache = route.response_cache
+        if (
+            response_cache is not None
+            and scope.get("method", "GET") in response_cache.cacheable_methods
+        ):
+            handler = self._handle_cached_request(
+                response_cache, route.plan, path_params, scope, receive
+            )
+        else:
+            handler = self._call_endpoint(route.plan, path_params, scope, receive)
+        if route.timeout is None:
+            return await handler
+        try:
+            return await asyncio.wait_for(handler, timeout=route.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out[route.path] = self.timed_out.get(route.path, 0) + 1
+            logger.warning("Endpoint of `%s` is timed out!", route.path)
+            return _GATEWAY_TIMEOUT_RESPONSE
+
+    async def _handle_cached_request(
+        self,
+        response_cache: ResponseCache,
+        plan: EndpointPlan,
+        path_params: Mapping[str, Any],
+        scope: Scope,
+        receive: Receive,
+    ) -> BaseResponse:
+        """
+        Answers from response cache (or 304) without calling endpoint, stores response on miss.
+        """
+        cache_backend = response_cache.backend or self.cache_backend
+        cache_key = response_cache.build_key(
+            scope, get_query_args(scope).multi_items()
+        )
+        cached_response = await cache_backend.get(cache_key)
+        if cached_response is not None:
+            return response_cache.respond(scope, cached_response)
+        response = await self._call_endpoint(plan, path_params, scope, receive)
+        cached_response = response_cache.build_cached_response(response)
+        if cached_response is None:
+            return response
+        await cache_backend.set(cache_key, cached_response, ttl=response_cache.ttl)
+        return response_cache.respond(scope, cached_response)
+
+    async def _call_endpoint(
+        self,
+        plan: EndpointPlan,
+        path_params: Mapping[str, Any],
+        scope: Scope,
+        receive: Receive,
+    ) -> BaseResponse:
+        """
+        Binds endpoint args by call plan, calls endpoint and wraps its response.
+        """
+        endpoint_kwargs = await self._build_endpoint_func_args(
+            plan=plan,
+            path_params=path_params,
+            scope=scope,
+            receive=receive,
+        )
+        if isinstance(endpoint_kwargs, BaseResponse):
+            return endpoint_kwargs
+        instrumentation = self.instrumentation
+        if instrumentation.enabled:
+            instrumentation.emit(EVENT_ARGS_BOUND, scope)
+        if plan.is_coroutine:
+            response = await plan.endpoint_func(**endpoint_kwargs)
+        elif plan.executor == EXECUTOR_INLINE:
+            response = plan.endpoint_func(**endpoint_kwargs)
+        else:
+            response = await self.executor_pools[plan.executor].run(
+                plan.endpoint_func, endpoint_kwargs
+            )
+        if instrumentation.enabled:
+            instrumentation.emit(EVENT_HANDLER_DONE, scope)
+        response = await self._wrap_response_in_response_class(response)
+        if isinstance(response, BaseResponse):
+            return response
+        return _INTERNAL_SERVER_ERROR_RESPONSE
+
+    async def _run_lifespan_handlers(self, handlers: List[Callable]) -> None:
+        for handler in handlers:
+            result = handler(self) if _handler_accepts_app(handler) else handler()
+            if isawaitable(result):
+                await result
+
+    def compile(self) -> None:
+        """
+        Validates routes table and handlers, builds everything derived from them once and freezes application.
+
+        Called at lifespan startup (or on first request if server has no lifespan) and by
+        pre-fork runner before forking, so workers share prepared application and first
+        request has no compilation cost. Routes, middlewares and handlers can not be added after that.
+
+        :raises RuntimeError: When routes table or handlers are invalid (with all found problems).
+        """
+        if self.is_compiled:
+            return
+        problems = self._validate()
+        if problems:
+            raise RuntimeError(
+                "Application can not be compiled:\n"
+                + "\n".join(f"- {problem}" for problem in problems)
+            )
+        self.build_middleware_stack()
+        # Exception handlers are resolved for registered classes, not on first raise.
+        for exception_class in (*self.exception_handlers, HTTPException, Exception):
+            self._resolve_exception_handler(exception_class)
+        self.warmup()
+        self.is_compiled = True
+
+    def _validate(self) -> List[str]:
+        """
+        Returns problems of routes table (conflicting routes, path params not accepted by endpoint) and handlers.
+        """
+        problems = []
+        registered: Dict[Tuple[str, str], Route] = dict()
+        for route in self._registered_routes:
+            path_pattern = get_path_pattern(route.path)
+            for method in route.methods:
+                method_name = "WEBSOCKET" if method == WEBSOCKET_METHOD else method
+                conflicting_route = registered.setdefault((method_name, path_pattern), route)
+                if conflicting_route is not route:
+                    problems.append(
+                        f"{method_name} {route.path} ({_get_name(route.endpoint_func)}) conflicts with"
+                        f" {method_name} {conflicting_route.path} ({_get_name(conflicting_route.endpoint_func)})!"
+                    )
+            accepted_params = {param.name for param in route.plan.params}
+            for param_name in get_path_param_names(route.path):
+                if param_name not in accepted_params:
+                    problems.append(
+                        f"Path param `{param_name}` of {route.path} is not accepted by {_get_name(route.endpoint_func)}!"
                     )
-                endpoint_kwargs = self._build_endpoint_func_args(
-                    endpoint_func=route_endpoint_func,
-                    parsed_args=parse_args_from_scope(scope=scope),
-                    scope=scope,
+        for status_code, error_handler in self.error_handlers.items():
+            if not 100 <= status_code <= 599:
+                problems.append(f"Error handler for invalid status code {status_code}!")
+            if not _handler_accepts_args(error_handler, 0):
+                problems.append(
+                    f"Error handler {_get_name(error_handler)} for {status_code} should accept no params!"
                 )
-                if isinstance(endpoint_kwargs, BaseResponse):
-                    return endpoint_kwargs
-                try:
-                    if iscoroutinefunction(route_endpoint_func):
-                        response = await route_endpoint_func(**endpoint_kwargs)
-                    else:
-                        response = route_endpoint_func(**endpoint_kwargs)
-                    response = await self._wrap_response_in_response_class(response)
+        for exception_class, exception_handler in self.exception_handlers.items():
+            if not _handler_accepts_args(exception_handler, 1):
+                problems.append(
+                    f"Exception handler {_get_name(exception_handler)} for {exception_class.__name__}"
+                    " should accept exception as single param!"
+                )
+        return problems
 
-                except BaseException as _route_handle_exception:
-                    response = await self._process_with_error_handlers(
-                        response=PlainResponse(
-                            content="Internal Server Error!", status_code=500
-                        )
-                    )
-                    await response.__call__(scope, receive, send)
-                    raise _route_handle_exception
-                if isinstance(response, BaseResponse):
-                    return response
-                return PlainResponse(content="Internal Server Error!", status_code=500)
-        return PlainResponse(content="Not Found!", status_code=404)
+    def routes_table(self) -> List[Dict[str, Any]]:
+        """
+        Returns routes table in registration order (JSON serializable, for tooling).
+        """
+        table = []
+        for route in self._registered_routes:
+            plan = route.plan
+            is_websocket = route.methods == [WEBSOCKET_METHOD]
+            table.append(
+                {
+                    "path": route.path,
+                    "methods": ["WEBSOCKET"] if is_websocket else list(route.methods),
+                    "endpoint": _get_name(route.endpoint_func),
+                    "is_coroutine": plan.is_coroutine,
+                    "executor": EXECUTOR_INLINE if plan.is_coroutine else plan.executor,
+                    "params": [
+                        {"name": param.name, "source": param.source}
+                        for param in plan.params
+                    ],
+                    "cache_ttl": (
+                        route.response_cache.ttl
+                        if route.response_cache is not None
+                        else None
+                    ),
+                    "max_concurrency": (
+                        route.limiter.max_concurrency
+                        if route.limiter is not None
+                        else None
+                    ),
+                    "timeout": route.timeout,
+                }
+            )
+        return table
+
+    def warmup(self) -> None:
+        """
+        Warms up caches without running startup handlers (templates compiled, static files indexed).
+        """
+        if self.templates is not None:
+            self.templates.warmup()
+        for static_files in self.static_files:
+            if static_files.index is None:
+                static_files.build_index()
+
+    async def startup(self) -> None:
+        """
+        Compiles application and runs startup handlers.
+        """
+        self.compile()
+        await self._run_lifespan_handlers(self._startup_handlers)
+
+    async def shutdown(self) -> None:
+        """
+        Drains background tasks (before resources are closed) and runs shutdown handlers.
+        """
+        await self.background.drain(timeout=self.background_drain_timeout)
+        await self._run_lifespan_handlers(self._shutdown_handlers)
+        for executor_pool in self.executor_pools.values():
+            executor_pool.shutdown()
+
+    def executors_metrics(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns executors metrics (workers, in flight calls, queue depth) and background pool metrics.
+        """
+        metrics = {
+            executor: executor_pool.metrics()
+            for executor, executor_pool in self.executor_pools.items()
+        }
+        metrics["background"] = self.background.metrics()
+        return metrics
 
-    async def _on_lifespan_event(self) -> None:
+    def limits_metrics(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """
+        Returns concurrency limiters metrics (in flight, queue depth and time, shed and timed out counts).
+
+        Application limiter is under `*` key, routes limiters and timeouts are under route paths.
+        """
+        metrics: Dict[str, Dict[str, Union[int, float]]] = dict()
+        if self.limiter is not None:
+            metrics[ANY_METHOD] = self.limiter.metrics()
+        for route in self.route_tree.routes():
+            if route.limiter is None and route.timeout is None:
+                continue
+            route_metrics = metrics.setdefault(route.path, dict())
+            if route.limiter is not None:
+                route_metrics.update(route.limiter.metrics())
+            if route.timeout is not None:
+                route_metrics["timed_out"] = self.timed_out.get(route.path, 0)
+        return metrics
+
+    async def _on_lifespan_event(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
         """
         Handles ASGI lifespan event.
         """
-        pass
+        while True:
+            message = await receive()
+            message_type = message["type"]
+            if message_type == "lifespan.startup":
+                try:
+                    await self.startup()
+                except BaseException:
+                    await send(
+                        {
+                            "type": "lifespan.startup.failed",
+                            "message": format_exc(),
+                        }
+                    )
+                    raise
+                await send({"type": "lifespan.startup.complete"})
+            elif message_type == "lifespan.shutdown":
+                try:
+                    await self.shutdown()
+                except BaseException:
+                    await send(
+                        {
+                            "type": "lifespan.shutdown.failed",
+                            "message": format_exc(),
+                        }
+                    )
+                    raise
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _dispatch_request(self, scope: Scope, receive: Receive) -> BaseResponse:
+        """
+        Innermost HTTP handler, returns endpoint response processed with error handlers.
+        """
+        raw_response = self._handle_request_to_endpoint(scope, receive)
+        if not isinstance(raw_response, BaseResponse):
+            raw_response = await raw_response
+        return await self._process_with_error_handlers(response=raw_response)
+
+    async def _handle_limited_http(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """
+        HTTP request handler of application with concurrency limit.
+
+        Request holds application limiter slot until its response is sent.
+        """
+        limiter = self.limiter
+        if not await limiter.acquire():
+            # Shed before any work is done for request.
+            self._alter_scope_on_call(scope)
+            response = await self._process_with_error_handlers(limiter.shed_response)
+            if scope["method"] == "HEAD" and HEAD_WITH_BODY_SCOPE_KEY not in scope:
+                await response.send_head(scope, receive, send)
+            else:
+                await response.__call__(scope, receive, send)
+            return
+        try:
+            await self._serve_http(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _serve_http(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        HTTP request handler, wrapped with ASGI middlewares (used directly if there is no concurrency limit).
+        """
+        self._alter_scope_on_call(scope)
+        instrumentation = self.instrumentation
+        if instrumentation.enabled:
+            instrumentation.emit(EVENT_REQUEST_START, scope)
+        http_handler = self._http_handler
+        try:
+            if http_handler is None:
+                # Same as `_dispatch_request`, without extra coroutine per request.
+                response = self._handle_request_to_endpoint(scope, receive)
+                if not isinstance(response, BaseResponse):
+                    response = await response
+                response = await self._process_with_error_handlers(response)
+            else:
+                response = await http_handler(scope, receive)
+        except ClientDisconnect:
+            # Client went away while request body was received, there is no one to respond to.
+            scope.pop(BACKGROUND_TASKS_SCOPE_KEY, None)
+            if instrumentation.enabled:
+                # Request is closed for hooks without status code.
+                instrumentation.emit(EVENT_RESPONSE_SENT, scope)
+            return
+        except Exception as exception:
+            # Background tasks of failed endpoint are dropped.
+            scope.pop(BACKGROUND_TASKS_SCOPE_KEY, None)
+            # Exception is handled here (single response, single log record), not re-raised to server.
+            response = await self._handle_exception(exception)
+        # HEAD request is answered as GET without body.
+        send_response = (
+            response.send_head
+            if scope["method"] == "HEAD" and HEAD_WITH_BODY_SCOPE_KEY not in scope
+            else response.__call__
+        )
+        if instrumentation.enabled:
+            scope[STATUS_CODE_SCOPE_KEY] = response.http_status_code
+            instrumentation.emit(EVENT_RESPONSE_RENDERED, scope)
+            try:
+                await send_response(scope, receive, send)
+            finally:
+                instrumentation.emit(EVENT_RESPONSE_SENT, scope)
+        else:
+            await send_response(scope, receive, send)
+        background_tasks = scope.get(BACKGROUND_TASKS_SCOPE_KEY)
+        if background_tasks:
+            await self.background.submit(background_tasks)
+
+    async def _handle_websocket(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Websocket connection handler, wrapped with ASGI middlewares.
+        """
+        self._alter_scope_on_call(scope)
+        websocket = scope[WEBSOCKET_SCOPE_KEY] = WebSocket(
+            scope, receive, send, json_serializer=self.json_serializer
+        )
+        method_table, path_params = self.route_tree.match(scope.get("path", "/"))
+        route = method_table.get(WEBSOCKET_METHOD) if method_table is not None else None
+        if route is None:
+            # Rejected handshake (403).
+            await websocket.close(WEBSOCKET_CLOSE_NORMAL)
+            return
+        scope["path_params"] = path_params
+        try:
+            endpoint_kwargs = await self._build_endpoint_func_args(
+                plan=route.plan,
+                path_params=path_params,
+                scope=scope,
+                receive=receive,
+            )
+        except HTTPException as exception:
+            endpoint_kwargs = PlainResponse(exception.detail, exception.status_code)
+        if isinstance(endpoint_kwargs, BaseResponse):
+            # Close reason is limited to 123 bytes, so only status phrase is sent.
+            await websocket.close(
+                WEBSOCKET_CLOSE_POLICY_VIOLATION,
+                reason=HTTPStatus(endpoint_kwargs.http_status_code).phrase,
+            )
+            return
+        try:
+            await route.plan.endpoint_func(**endpoint_kwargs)
+        except WebSocketDisconnect:
+            pass
+        except Exception as exception:
+            logger.error("Exception in websocket endpoint!", exc_info=exception)
+            if _websocket_is_open(websocket):
+                await websocket.close(WEBSOCKET_CLOSE_INTERNAL_ERROR)
+            return
+        if _websocket_is_open(websocket):
+            # Endpoint returned without closing connection.
+            await websocket.close(WEBSOCKET_CLOSE_NORMAL)
+
+    async def _handle_connection(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Innermost ASGI app of middleware stack, HTTP requests and websocket connections.
+        """
+        if scope["type"] == "http":
+            await self._http_connection_handler(scope, receive, send)
+        else:
+            await self._handle_websocket(scope, receive, send)
+
+    def _wrap_with_function_middleware(
+        self, middleware: Callable, handler: Callable
+    ) -> Callable:
+        async def call_next(request: Request) -> BaseResponse:
+            return await handler(request.scope, request.receive)
+
+        async def wrapped_handler(scope: Scope, receive: Receive) -> BaseResponse:
+            return await middleware(self._get_request(scope, receive), call_next)
+
+        return wrapped_handler
+
+    def build_middleware_stack(self) -> ASGIApp:
+        """
+        Composes middlewares in to the single call chain (once, not per request).
+        """
+        if self._middleware_stack is not None:
+            return self._middleware_stack
+        if self._function_middlewares:
+            http_handler = self._dispatch_request
+            for middleware in reversed(self._function_middlewares):
+                http_handler = self._wrap_with_function_middleware(
+                    middleware, http_handler
+                )
+            self._http_handler = http_handler
+        # Limiter wrapper is chosen once, so unlimited application serves requests directly.
+        self._http_connection_handler = (
+            self._serve_http if self.limiter is None else self._handle_limited_http
+        )
+
+        middleware_stack = self._handle_connection
+        for middleware_class, options in reversed(self._middlewares):
+            middleware_stack = middleware_class(middleware_stack, **options)
+        self._middleware_stack = middleware_stack
+        # Without ASGI middlewares HTTP requests skip `_handle_connection` dispatch.
+        self._http_app = (
+            middleware_stack if self._middlewares else self._http_connection_handler
+        )
+        return middleware_stack
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         ASGI server request handler.
         """
         event_type = scope["type"]
-        if event_type != "http":
-            # Do not process non-http requests events as endpoint.
-
-            if event_type == "lifespan":
-                await self._on_lifespan_event()
+        if event_type == "http":
+            if not self.is_compiled:
+                self.compile()
+            await self._http_app(scope, receive, send)
+            return
+        if event_type == "websocket":
+            if not self.is_compiled:
+                self.compile()
+            await self._middleware_stack(scope, receive, send)
             return
+        if event_type == "lifespan":
+            await self._on_lifespan_event(scope, receive, send)
 
-        self._alter_scope_on_call(scope)
-        raw_response = await self._handle_request_to_endpoint(scope, receive, send)
-        response = await self._process_with_error_handlers(response=raw_response)
-        await response.__call__(scope, receive, send)
+
+def _handler_accepts_app(handler: Callable) -> bool:
+    """
+    Returns True if lifespan handler accepts application argument.
+    """
+    try:
+        return len(signature(handler).parameters) > 0
+    except (TypeError, ValueError):
+        return False
+
+
+def _handler_accepts_args(handler: Callable, args_count: int) -> bool:
+    """
+    Returns True if handler can be called with that count of positional args (or signature is unknown).
+    """
+    try:
+        handler_signature = signature(handler)
+    except (TypeError, ValueError):
+        return True
+    try:
+        handler_signature.bind(*[None] * args_count)
+    except TypeError:
+        return False
+    return True
+
+
+def _get_name(func: Callable) -> str:
+    qualname = getattr(func, "__qualname__", None)
+    if qualname is None:
+        return repr(func)
+    return f"{func.__module__}.{qualname}"
+
+
+# Error location of params by their source.
+_VALIDATION_ERROR_LOCATIONS = {SOURCE_ARGS: "query", SOURCE_PATH: "path"}
+
+
+def _add_validation_error(
+    errors: Optional[List[Dict[str, Any]]],
+    param_source: str,
+    param_name: str,
+    message: str,
+    error_type: str,
+) -> List[Dict[str, Any]]:
+    if errors is None:
+        errors = []
+    errors.append(
+        {
+            "loc": [_VALIDATION_ERROR_LOCATIONS[param_source], param_name],
+            "msg": message or "Invalid value",
+            "type": error_type,
+        }
+    )
+    return errors
+
+
+def _websocket_is_open(websocket: WebSocket) -> bool:
+    return (
+        websocket.application_state != WEBSOCKET_DISCONNECTED
+        and websocket.client_state != WEBSOCKET_DISCONNECTED
+    )
@@ -0,0 +1,142 @@
+"""
+    Background tasks, run after response is sent.
+"""
+import asyncio
+import logging
+from inspect import iscoroutinefunction
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger("smile")
+
+
+class BackgroundTask:
+    """
+    Function (sync or async) call with its args.
+
+    Synchronous function is called in thread, so it never blocks event loop.
+    """
+
+    __slots__ = ("func", "args", "kwargs", "is_coroutine")
+
+    def __init__(self, func: Callable, *args: Any, **kwargs: Any) -> None:
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.is_coroutine = iscoroutinefunction(func)
+
+    async def __call__(self) -> None:
+        if self.is_coroutine:
+            await self.func(*self.args, **self.kwargs)
+        else:
+            await asyncio.to_thread(self.func, *self.args, **self.kwargs)
+
+
+class BackgroundTasks:
+    """
+    Tasks of single request, endpoint param that is injected like `Request`.
+
+    Tasks are run in order after response is sent (dropped if endpoint raised exception).
+
+    Use example:
+    @app.route("/orders", methods=["POST"])
+    async def create_order(order: Order, background_tasks: BackgroundTasks):
+        background_tasks.add_task(send_webhook, order)
+        return {"status": "created"}
+    """
+
+    __slots__ = ("tasks",)
+
+    def __init__(self) -> None:
+        self.tasks: List[BackgroundTask] = []
+
+    def add_task(self, func: Callable, *args: Any, **kwargs: Any) -> None:
+        self.tasks.append(BackgroundTask(func, *args, **kwargs))
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    async def __call__(self) -> None:
+        for task in self.tasks:
+            await task()
+
+
+class BackgroundWorkerPool:
+    """
+    Application pool running background tasks with bounded concurrency and bounded backlog.
+
+    When backlog is full, tasks are run by submitter (request handler after its response
+    is sent), so load is never queued without bound. Pool is drained at lifespan shutdown.
+    """
+
+    def __init__(self, max_concurrency: int = 64, max_pending: int = 1024) -> None:
+        """
+        :param max_concurrency: Max count of concurrently running request tasks.
+        :param max_pending: Max count of request tasks waiting to run.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.run_by_submitter = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks) - self.running
+
+    async def submit(self, background_tasks: Callable[[], Any]) -> None:
+        """
+        Schedules tasks in the pool, or runs them right here if pool backlog is full.
+        """
+        if len(self._tasks) >= self.max_concurrency + self.max_pending:
+            self.run_by_submitter += 1
+            await self._run(background_tasks)
+            return
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        task = asyncio.get_running_loop().create_task(self._run_limited(background_tasks))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_limited(self, background_tasks: Callable[[], Any]) -> None:
+        async with self._semaphore:
+            self.running += 1
+            try:
+                await self._run(background_tasks)
+            finally:
+                self.running -= 1
+
+    async def _run(self, background_tasks: Callable[[], Any]) -> None:
+        try:
+            await background_tasks()
+        except Exception:
+            self.failed += 1
+            logger.exception("Exception in background task!")
+        else:
+            self.completed += 1
+
+    async def drain(self, timeout: Optional[float] = None) -> int:
+        """
+        Waits for scheduled tasks (at most `timeout` seconds), cancels the rest and returns their count.
+        """
+        if not self._tasks:
+            return 0
+        _, not_done = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in not_done:
+            task.cancel()
+        if not_done:
+            logger.warning("%d background tasks are cancelled at shutdown!", len(not_done))
+            await asyncio.wait(not_done)
+        return len(not_done)
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": self.running,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "run_by_submitter": self.run_by_submitter,
+        }
@@ -0,0 +1,548 @@
+"""
+    In-process benchmark and load harness.
+
+    Application is called directly (`Smile.__call__`) with synthetic scope,
+    receive and send, so results are not noisy from network and server.
+
+    Run: python -m smile.bench [--scenario plain] [--json report.json] [--compare before.json]
+"""
+import sys
+import json
+import asyncio
+import argparse
+import platform
+import tracemalloc
+from time import perf_counter, perf_counter_ns, time
+from statistics import median
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from smile.app import Smile, jinja_is_installed
+from smile.types import Scope, Message
+from smile.exceptions import HTTPException
+from smile.cache import CachedResponse
+from smile.responses import JSONResponse, PlainResponse, StaticResponse
+
+if jinja_is_installed:
+    import jinja2
+
+REPORT_VERSION = 1
+
+
+class Scenario:
+    """
+    Single benchmarked request to application.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        app: Smile,
+        path: str,
+        method: str = "GET",
+        query_string: bytes = b"",
+        headers: Optional[List[Tuple[bytes, bytes]]] = None,
+        body: bytes = b"",
+        expected_status: int = 200,
+    ) -> None:
+        self.name = name
+        self.app = app
+        self.path = path
+        self.method = method
+        self.query_string = query_string
+        self.headers = headers if headers is not None else [(b"host", b"localhost")]
+        self.body = body
+        self.expected_status = expected_status
+
+    def build_scope(self) -> Scope:
+        # New scope per request, as server does (application writes into scope).
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": self.method,
+            "scheme": "http",
+            "path": self.path,
+            "raw_path": self.path.encode("latin-1"),
+            "root_path": "",
+            "query_string": self.query_string,
+            "headers": self.headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("127.0.0.1", 8000),
+        }
+
+    async def request(self) -> int:
+        """
+        Calls application once, returns response status code.
+        """
+        body_message = {"type": "http.request", "body": self.body, "more_body": False}
+        status_code = 0
+
+        async def receive() -> Message:
+            return body_message
+
+        async def send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        await self.app(self.build_scope(), receive, send)
+        return status_code
+
+
+def _build_plain_app() -> Smile:
+    app = Smile()
+
+    @app.route("/plain")
+    async def plain():
+        return "Hello world!"
+
+    return app
+
+
+def _build_json_app() -> Smile:
+    app = Smile()
+    payload = {
+        "items": [
+            {"id": index, "name": f"item-{index}", "price": index * 1.5, "active": True}
+            for index in range(20)
+        ]
+    }
+
+    @app.route("/json")
+    async def json_endpoint():
+        return payload
+
+    return app
+
+
+def _build_small_json_app() -> Smile:
+    app = Smile()
+
+    @app.route("/small-json", executor="inline")
+    def small_json_endpoint():
+        return {"status": "ok", "id": 42}
+
+    app.add_static_route("/static-json", JSONResponse({"status": "ok"}))
+    return app
+
+
+def _build_query_args_app() -> Smile:
+    app = Smile()
+
+    @app.route("/search")
+    async def search(query: str, page: int = 1, limit: int = 20, tags: list[str] = []):
+        return {"query": query, "page": page, "limit": limit, "tags": tags}
+
+    return app
+
+
+def _build_many_routes_app(routes_count: int = 1_000) -> Smile:
+    app = Smile()
+
+    def endpoint(item_id: int):
+        return "item"
+
+    for index in range(routes_count):
+        app.add_route(
+            f"/api/v1/resource{index}/{{item_id:int}}",
+            endpoint,
+            methods=["GET"],
+            executor="inline",
+        )
+    return app
+
+
+def _build_jinja_app() -> Smile:
+    app = Smile()
+    app.setup_jinja_environment(
+        jinja2.Environment(
+            enable_async=True,
+            loader=jinja2.DictLoader(
+                {
+                    "page.jinja": (
+                        "<ul>{% for item in items %}<li>{{ item }}</li>{% endfor %}</ul>"
+                    )
+                }
+            ),
+        )
+    )
+
+    @app.route("/jinja")
+    async def jinja_endpoint(app: Smile):
+        return await app.jinja_template("page.jinja", items=list(range(20))), 200
+
+    return app
+
+
+def _build_error_handlers_app() -> Smile:
+    app = Smile()
+
+    class ItemNotFound(Exception):
+        pass
+
+    @app.route("/http-exception")
+    async def http_exception():
+        raise HTTPException(404)
+
+    @app.route("/exception-handler")
+    async def exception_handler():
+        raise ItemNotFound()
+
+    app.add_error_handler(404, lambda: JSONResponse({"error": "not found"}, 404))
+    app.add_exception_handler(
+        ItemNotFound, lambda exception: JSONResponse({"error": "no item"}, 404)
+    )
+    return app
+
+
+def build_scenarios() -> List[Scenario]:
+    """
+    Returns default scenario set (Jinja scenario only if Jinja is installed).
+    """
+    error_handlers_app = _build_error_handlers_app()
+    small_json_app = _build_small_json_app()
+    scenarios = [
+        Scenario("plain", _build_plain_app(), "/plain"),
+        Scenario("json", _build_json_app(), "/json"),
+        Scenario("small_json", small_json_app, "/small-json"),
+        Scenario("head", small_json_app, "/small-json", method="HEAD"),
+        Scenario("static_json", small_json_app, "/static-json"),
+        Scenario(
+            "query_args",
+            _build_query_args_app(),
+            "/search",
+            query_string=b"query=smile&page=2&limit=50&tags=a&tags=b",
+        ),
+        Scenario("many_routes", _build_many_routes_app(), "/api/v1/resource999/42"),
+        Scenario(
+            "error_handlers",
+            error_handlers_app,
+            "/http-exception",
+            expected_status=404,
+        ),
+        Scenario(
+            "exception_handlers",
+            error_handlers_app,
+            "/exception-handler",
+            expected_status=404,
+        ),
+        Scenario("not_found", _build_plain_app(), "/missing", expected_status=404),
+    ]
+    if jinja_is_installed:
+        scenarios.append(Scenario("jinja", _build_jinja_app(), "/jinja"))
+    return scenarios
+
+
+def _percentile(sorted_values: Sequence[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(len(sorted_values) * percent / 100), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def _measure_allocations(scenario: Scenario, requests: int) -> float:
+    """
+    Returns median peak of allocated bytes per request.
+    """
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(requests):
+            tracemalloc.reset_peak()
+            current_before, _ = tracemalloc.get_traced_memory()
+            await scenario.request()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - current_before)
+    finally:
+        tracemalloc.stop()
+    return median(peaks) if peaks else 0.0
+
+
+async def run_scenario(
+    scenario: Scenario,
+    requests: int = 10_000,
+    concurrency: int = 1,
+    warmup: int = 500,
+    allocation_requests: int = 1_000,
+) -> Dict[str, Any]:
+    """
+    Runs scenario, returns its results (requests/sec, latency percentiles in microseconds, allocations).
+
+    :param requests: Count of measured requests.
+    :param concurrency: Count of concurrently running request loops.
+    :param warmup: Count of requests before measure (lazy caches, executors).
+    :param allocation_requests: Count of requests traced for allocations (0 disables).
+    """
+    for _ in range(warmup):
+        await scenario.request()
+
+    latencies: List[int] = []
+    unexpected_statuses: Dict[int, int] = {}
+
+    async def worker(worker_requests: int) -> None:
+        for _ in range(worker_requests):
+            started_at = perf_counter_ns()
+            status_code = await scenario.request()
+            latencies.append(perf_counter_ns() - started_at)
+            if status_code != scenario.expected_status:
+                unexpected_statuses[status_code] = (
+                    unexpected_statuses.get(status_code, 0) + 1
+                )
+
+    concurrency = max(1, min(concurrency, requests))
+    worker_requests = [
+        requests // concurrency + (1 if index < requests % concurrency else 0)
+        for index in range(concurrency)
+    ]
+    started_at = perf_counter()
+    await asyncio.gather(*(worker(count) for count in worker_requests))
+    elapsed = perf_counter() - started_at
+
+    latencies_us = sorted(latency / 1_000 for latency in latencies)
+    allocated = (
+        await _measure_allocations(scenario, allocation_requests)
+        if allocation_requests > 0
+        else None
+    )
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 6),
+        "requests_per_second": round(requests / elapsed, 2) if elapsed else 0.0,
+        "latency_us": {
+            "p50": round(_percentile(latencies_us, 50), 3),
+            "p90": round(_percentile(latencies_us, 90), 3),
+            "p99": round(_percentile(latencies_us, 99), 3),
+            "max": round(latencies_us[-1], 3) if latencies_us else 0.0,
+        },
+        "allocated_bytes_per_request": allocated,
+        "unexpected_statuses": {
+            str(status_code): count
+            for status_code, count in unexpected_statuses.items()
+        },
+    }
+
+
+async def run(
+    scenario_names: Optional[Sequence[str]] = None,
+    requests: int = 10_000,
+    concurrency: int = 1,
+    warmup: int = 500,
+    allocation_requests: int = 1_000,
+    on_result: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Runs scenarios (all by default), returns JSON serializable report.
+    """
+    scenarios = build_scenarios()
+    if scenario_names:
+        known_names = {scenario.name for scenario in scenarios}
+        unknown_names = set(scenario_names) - known_names
+        if unknown_names:
+            raise ValueError(
+                f"Unknown benchmark scenarios: {', '.join(sorted(unknown_names))}!"
+                f" Known scenarios: {', '.join(sorted(known_names))}."
+            )
+        scenarios = [scenario for scenario in scenarios if scenario.name in scenario_names]
+
+    apps = []
+    for scenario in scenarios:
+        if scenario.app not in apps:
+            apps.append(scenario.app)
+    for app in apps:
+        await app.startup()
+
+    results = {}
+    try:
+        for scenario in scenarios:
+            result = await run_scenario(
+                scenario,
+                requests=requests,
+                concurrency=concurrency,
+                warmup=warmup,
+                allocation_requests=allocation_requests,
+            )
+            results[scenario.name] = result
+            if on_result is not None:
+                on_result(scenario.name, result)
+    finally:
+        for app in apps:
+            await app.shutdown()
+
+    return {
+        "version": REPORT_VERSION,
+        "created_at": time(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "scenarios": results,
+    }
+
+
+async def measure_response_overhead(iterations: int = 100_000) -> Dict[str, float]:
+    """
+    Returns nanoseconds per response (construction and sending to no-op `send`) by response kind.
+
+    Shows constant per-response cost, without routing and endpoint call.
+    """
+    scope = {"type": "http", "method": "GET", "headers": []}
+    head_scope = {**scope, "method": "HEAD"}
+    payload = {"status": "ok", "id": 42}
+    static_response = StaticResponse(JSONResponse(payload))
+    cached_response = CachedResponse(
+        status_code=200,
+        headers=list(static_response.http_headers),
+        body=static_response.http_body,
+    )
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        pass
+
+    kinds: Dict[str, Callable[[], Any]] = {
+        "plain": lambda: PlainResponse("Hello world!")(scope, receive, send),
+        "json": lambda: JSONResponse(payload)(scope, receive, send),
+        "json_head": lambda: JSONResponse(payload).send_head(head_scope, receive, send),
+        "static": lambda: static_response(scope, receive, send),
+        "cached": lambda: cached_response(scope, receive, send),
+    }
+    results = {}
+    for kind, respond in kinds.items():
+        for _ in range(min(iterations, 1_000)):
+            await respond()
+        started_at = perf_counter_ns()
+        for _ in range(iterations):
+            await respond()
+        results[kind] = round((perf_counter_ns() - started_at) / iterations, 1)
+    return results
+
+
+def compare_reports(
+    before: Dict[str, Any], after: Dict[str, Any]
+) -> Dict[str, Dict[str, float]]:
+    """
+    Returns relative change (after / before - 1) of requests/sec, p99 latency and allocations per scenario.
+    """
+
+    def change(before_value: Optional[float], after_value: Optional[float]) -> Optional[float]:
+        if not before_value or after_value is None:
+            return None
+        return round(after_value / before_value - 1, 4)
+
+    changes = {}
+    for name, after_result in after["scenarios"].items():
+        before_result = before["scenarios"].get(name)
+        if before_result is None:
+            continue
+        changes[name] = {
+            "requests_per_second": change(
+                before_result["requests_per_second"], after_result["requests_per_second"]
+            ),
+            "latency_p99": change(
+                before_result["latency_us"]["p99"], after_result["latency_us"]["p99"]
+            ),
+            "allocated_bytes_per_request": change(
+                before_result["allocated_bytes_per_request"],
+                after_result["allocated_bytes_per_request"],
+            ),
+        }
+    return changes
+
+
+def _format_result(name: str, result: Dict[str, Any]) -> str:
+    latency = result["latency_us"]
+    allocated = result["allocated_bytes_per_request"]
+    line = (
+        f"{name:<20} | {result['requests_per_second']:>10.0f} req/s"
+        f" | p50 {latency['p50']:>8.1f} us | p90 {latency['p90']:>8.1f} us"
+        f" | p99 {latency['p99']:>8.1f} us"
+    )
+    if allocated is not None:
+        line += f" | {allocated:>7.0f} B/req"
+    if result["unexpected_statuses"]:
+        line += f" | unexpected statuses {result['unexpected_statuses']}"
+    return line
+
+
+def _format_change(value: Optional[float]) -> str:
+    if value is None:
+        return "     n/a"
+    return f"{value * 100:+7.1f}%"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m smile.bench",
+        description="In-process Smile benchmark.",
+    )
+    parser.add_argument(
+        "-s", "--scenario", action="append", dest="scenarios",
+        help="Scenario to run (may be repeated), all by default.",
+    )
+    parser.add_argument("-n", "--requests", type=int, default=10_000)
+    parser.add_argument("-c", "--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=500)
+    parser.add_argument(
+        "--allocation-requests", type=int, default=1_000,
+        help="Count of requests traced for allocations, 0 disables tracing.",
+    )
+    parser.add_argument("--json", dest="json_path", help="Write JSON report to that path.")
+    parser.add_argument("--compare", dest="compare_path", help="JSON report to compare with.")
+    parser.add_argument("--list", action="store_true", help="List scenarios and exit.")
+    parser.add_argument(
+        "--responses", action="store_true",
+        help="Measure per-response overhead (by response kind) and exit.",
+    )
+    options = parser.parse_args(argv)
+
+    if options.list:
+        for scenario in build_scenarios():
+            print(scenario.name)
+        return 0
+
+    if options.responses:
+        overhead = asyncio.run(measure_response_overhead(options.requests))
+        for kind, nanoseconds in overhead.items():
+            print(f"{kind:<20} | {nanoseconds:>8.1f} ns/response")
+        return 0
+
+    try:
+        report = asyncio.run(
+            run(
+                scenario_names=options.scenarios,
+                requests=options.requests,
+                concurrency=options.concurrency,
+                warmup=options.warmup,
+                allocation_requests=options.allocation_requests,
+                on_result=lambda name, result: print(_format_result(name, result)),
+            )
+        )
+    except ValueError as exception:
+        parser.error(str(exception))
+
+    if options.json_path:
+        with open(options.json_path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+
+    if options.compare_path:
+        with open(options.compare_path, "r", encoding="utf-8") as report_file:
+            before = json.load(report_file)
+        print()
+        print(f"{'change':<20} |      req/s |  p99 latency | allocations")
+        for name, change in compare_reports(before, report).items():
+            print(
+                f"{name:<20} |   {_format_change(change['requests_per_second'])}"
+                f" |     {_format_change(change['latency_p99'])}"
+                f" |    {_format_change(change['allocated_bytes_per_request'])}"
+            )
+
+    has_unexpected_statuses = any(
+        result["unexpected_statuses"] for result in report["scenarios"].values()
+    )
+    return 1 if has_unexpected_statuses else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
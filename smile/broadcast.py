@@ -0,0 +1,169 @@
+"""
+    Broadcast (pub/sub) of messages to websocket connections.
+
+    Message is serialized once in to the single ASGI message, which is put
+    in to bounded queue of each subscriber and sent by subscriber own writer task,
+    so publisher never waits for slow connection.
+"""
+import asyncio
+from typing import Any, Dict, Optional, Set
+
+from smile.types import Message
+from smile.websockets import WebSocket, WEBSOCKET_CLOSE_TRY_AGAIN_LATER
+from smile.serialization import JSONSerializer, default_json_serializer
+
+# What is done with subscriber that has full queue.
+SLOW_CONSUMER_DROP = "drop"  # Message is dropped for that subscriber.
+SLOW_CONSUMER_DISCONNECT = "disconnect"  # Subscriber is unsubscribed and disconnected.
+
+SLOW_CONSUMER_POLICIES = (SLOW_CONSUMER_DROP, SLOW_CONSUMER_DISCONNECT)
+
+
+class Subscriber:
+    """
+    Websocket subscribed to channel, async context manager that unsubscribes on exit.
+    """
+
+    __slots__ = ("broadcast", "websocket", "channel", "queue", "task", "dropped")
+
+    def __init__(
+        self, broadcast: "Broadcast", websocket: WebSocket, channel: str, queue_size: int
+    ) -> None:
+        self.broadcast = broadcast
+        self.websocket = websocket
+        self.channel = channel
+        self.queue: "asyncio.Queue[Message]" = asyncio.Queue(maxsize=queue_size)
+        self.task: Optional["asyncio.Task[None]"] = None
+        # Count of messages dropped because queue was full.
+        self.dropped = 0
+
+    async def _write(self) -> None:
+        queue = self.queue
+        websocket = self.websocket
+        while True:
+            message = await queue.get()
+            try:
+                await websocket.send(message)
+            except Exception:
+                # Connection is closed, nothing to send to anymore.
+                self.broadcast.unsubscribe(self)
+                return
+
+    async def __aenter__(self) -> "Subscriber":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.broadcast.unsubscribe(self)
+
+
+class Broadcast:
+    """
+    In-process channels of websocket subscribers.
+
+    Use example:
+    broadcast = Broadcast()
+
+    @app.websocket("/chat/{room}")
+    async def chat(websocket: WebSocket, room: str):
+        await websocket.accept()
+        async with broadcast.subscribe(websocket, room):
+            async for text in websocket.iter_text():
+                broadcast.publish(room, text)
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 64,
+        slow_consumer: str = SLOW_CONSUMER_DROP,
+        json_serializer: Optional[JSONSerializer] = None,
+    ) -> None:
+        """
+        :param queue_size: Max count of messages waiting to be sent to single subscriber.
+        :param slow_consumer: `drop` messages for subscriber with full queue or `disconnect` it.
+        :param json_serializer: Serializer of published objects, fastest installed by default.
+        """
+        if slow_consumer not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(
+                f"Unknown slow consumer policy `{slow_consumer}`! Expected one of: {', '.join(SLOW_CONSUMER_POLICIES)}."
+            )
+        self.queue_size = queue_size
+        self.slow_consumer = slow_consumer
+        self.json_serializer = (
+            json_serializer if json_serializer is not None else default_json_serializer
+        )
+        self.channels: Dict[str, Set[Subscriber]] = {}
+        # References to running close tasks of disconnected slow subscribers.
+        self._closing_tasks: Set["asyncio.Task[None]"] = set()
+
+    def subscribe(self, websocket: WebSocket, channel: str = "default") -> Subscriber:
+        """
+        Subscribes accepted websocket to channel (starts its writer task).
+        """
+        subscriber = Subscriber(self, websocket, channel, self.queue_size)
+        subscriber.task = asyncio.get_running_loop().create_task(subscriber._write())
+        self.channels.setdefault(channel, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscribers = self.channels.get(subscriber.channel)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.channels[subscriber.channel]
+        task = subscriber.task
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        subscriber.task = None
+
+    def subscribers_count(self, channel: str) -> int:
+        return len(self.channels.get(channel, ()))
+
+    def build_message(self, message: Any) -> Message:
+        """
+        Serializes message once: text (`str`), binary (`bytes`) or JSON text (any other).
+        """
+        if isinstance(message, str):
+            return {"type": "websocket.send", "text": message}
+        if isinstance(message, bytes):
+            return {"type": "websocket.send", "bytes": message}
+        return {"type": "websocket.send", "text": self.json_serializer(message).decode("utf-8")}
+
+    def publish(self, channel: str, message: Any) -> int:
+        """
+        Queues message to all channel subscribers without waiting, returns count of subscribers it is queued for.
+        """
+        subscribers = self.channels.get(channel)
+        if not subscribers:
+            return 0
+        asgi_message = self.build_message(message)
+        queued = 0
+        slow_subscribers = None
+        for subscriber in subscribers:
+            try:
+                subscriber.queue.put_nowait(asgi_message)
+                queued += 1
+            except asyncio.QueueFull:
+                subscriber.dropped += 1
+                if self.slow_consumer == SLOW_CONSUMER_DISCONNECT:
+                    if slow_subscribers is None:
+                        slow_subscribers = []
+                    slow_subscribers.append(subscriber)
+        if slow_subscribers is not None:
+            for subscriber in slow_subscribers:
+                self._disconnect(subscriber)
+        return queued
+
+    def _disconnect(self, subscriber: Subscriber) -> None:
+        self.unsubscribe(subscriber)
+
+        async def close() -> None:
+            try:
+                await subscriber.websocket.close(
+                    code=WEBSOCKET_CLOSE_TRY_AGAIN_LATER, reason="Too slow consumer."
+                )
+            except Exception:
+                pass
+
+        closing_task = asyncio.get_running_loop().create_task(close())
+        self._closing_tasks.add(closing_task)
+        closing_task.add_done_callback(self._closing_tasks.discard)
@@ -0,0 +1,337 @@
+"""
+    Caches (in-process LRU and HTTP response cache).
+"""
+import json
+import hashlib
+from math import ceil
+from time import monotonic
+from collections import OrderedDict
+from urllib.parse import urlencode
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+from smile.types import Scope
+from smile.responses import BaseResponse, StaticResponse
+from smile.datastructures import get_raw_header
+
+
+class LRUCache:
+    """
+    Least recently used cache with optional TTL and size-based eviction.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        ttl: Optional[float] = None,
+        max_size: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ) -> None:
+        """
+        :param max_entries: Max count of entries.
+        :param ttl: Time to live of entry in seconds (None for no expiration).
+        :param max_size: Max total size of values (as returned by `sizeof`), None for unlimited.
+        :param sizeof: Function to measure value size, `len` by default.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_size = max_size
+        self._sizeof = sizeof if sizeof is not None else len
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[float], int, Any]]" = (
+            OrderedDict()
+        )
+        self._total_size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, _, value = entry
+        if expires_at is not None and expires_at <= monotonic():
+            self._remove(key)
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        :param ttl: Overrides cache TTL for that entry.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        size = self._sizeof(value) if self.max_size is not None else 0
+        if self.max_size is not None and size > self.max_size:
+            # Never cache values that will evict whole cache.
+            return
+        if key in self._entries:
+            self._remove(key)
+        expires_at = monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (expires_at, size, value)
+        self._total_size += size
+        while len(self._entries) > self.max_entries or (
+            self.max_size is not None and self._total_size > self.max_size
+        ):
+            self._remove(next(iter(self._entries)))
+
+    def delete(self, key: Hashable) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._total_size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._total_size -= size
+
+
+class CachedResponse(StaticResponse):
+    """
+    Response stored in the response cache (raw status, headers and body).
+
+    Replayed as the same prebuilt ASGI messages on every cache hit.
+    """
+
+    def __init__(
+        self, status_code: int, headers: List[Tuple[bytes, bytes]], body: bytes
+    ) -> None:
+        self.http_status_code = status_code
+        self.http_headers = headers
+        self.http_body = body
+        self._start_message = {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": headers,
+        }
+        self._body_message = {"type": "http.response.body", "body": body}
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes response for external backends.
+        """
+        meta = json.dumps(
+            {
+                "status": self.http_status_code,
+                "headers": [
+                    [header_name.decode("latin-1"), header_value.decode("latin-1")]
+                    for header_name, header_value in self.http_headers
+                ],
+            }
+        ).encode("utf-8")
+        return len(meta).to_bytes(4, "big") + meta + self.http_body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedResponse":
+        meta_length = int.from_bytes(data[:4], "big")
+        meta = json.loads(data[4 : 4 + meta_length])
+        return cls(
+            status_code=meta["status"],
+            headers=[
+                (header_name.encode("latin-1"), header_value.encode("latin-1"))
+                for header_name, header_value in meta["headers"]
+            ],
+            body=data[4 + meta_length :],
+        )
+
+    def size(self) -> int:
+        return len(self.http_body) + sum(
+            len(header_name) + len(header_value)
+            for header_name, header_value in self.http_headers
+        )
+
+
+class CacheBackend:
+    """
+    Async response cache backend interface.
+    """
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        raise NotImplementedError
+
+    async def set(
+        self, key: str, response: CachedResponse, ttl: Optional[float]
+    ) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process LRU backend with TTL and memory bound eviction.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_size: int = 64 * 1024 * 1024):
+        """
+        :param max_entries: Max count of cached responses.
+        :param max_size: Max total size of cached responses in bytes.
+        """
+        self._cache = LRUCache(
+            max_entries=max_entries,
+            max_size=max_size,
+            sizeof=CachedResponse.size,
+        )
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return self._cache.get(key)
+
+    async def set(
+        self, key: str, response: CachedResponse, ttl: Optional[float]
+    ) -> None:
+        self._cache.set(key, response, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend over async Redis-compatible client (`get`, `set` with `px`, `delete`).
+    """
+
+    def __init__(self, client: Any, key_prefix: str = "smile:") -> None:
+        self.client = client
+        self.key_prefix = key_prefix
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        data = await self.client.get(self.key_prefix + key)
+        if data is None:
+            return None
+        return CachedResponse.from_bytes(data)
+
+    async def set(
+        self, key: str, response: CachedResponse, ttl: Optional[float]
+    ) -> None:
+        await self.client.set(
+            self.key_prefix + key,
+            response.to_bytes(),
+            # Milliseconds, as seconds of subsecond TTL are 0 (rejected as invalid expire time).
+            px=max(1, ceil(ttl * 1000)) if ttl is not None else None,
+        )
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.key_prefix + key)
+
+
+class ResponseCache:
+    """
+    Route response cache with strong ETags and conditional GET (`If-None-Match`).
+    """
+
+    # Only safe methods are cached.
+    cacheable_methods = frozenset(("GET", "HEAD"))
+
+    def __init__(
+        self,
+        ttl: Optional[float] = 60,
+        backend: Optional[CacheBackend] = None,
+        cache_control: Optional[str] = None,
+    ) -> None:
+        """
+        :param ttl: Time to live of cached response in seconds (None for no expiration).
+        :param backend: Cache backend, application backend if not specified.
+        :param cache_control: `Cache-Control` header, `max-age=<ttl>` by default.
+        """
+        self.ttl = ttl
+        self.backend = backend
+        if cache_control is None and ttl is not None:
+            cache_control = f"max-age={int(ttl)}"
+        self._cache_control_header = (
+            (b"cache-control", cache_control.encode("latin-1"))
+            if cache_control is not None
+            else None
+        )
+
+    def build_key(self, scope: Scope, query_items: List[Tuple[str, str]]) -> str:
+        """
+        Returns cache key from method, path and normalized (sorted) query args.
+
+        HEAD request has same key as GET, so it is answered from cached GET response.
+        """
+        query_string = urlencode(sorted(query_items))
+        method = scope.get("method", "GET")
+        if method == "HEAD":
+            method = "GET"
+        return f"{method}:{scope.get('path', '/')}?{query_string}"
+
+    def respond(self, scope: Scope, cached_response: CachedResponse) -> BaseResponse:
+        """
+        Returns cached response or `304 Not Modified` if client has same ETag.
+        """
+        etag = get_raw_header(cached_response.http_headers, b"etag")
+        if_none_match = get_raw_header(scope.get("headers", []), b"if-none-match")
+        if etag is not None and if_none_match is not None:
+            if etag_matches(etag, if_none_match):
+                not_modified_headers = [(b"etag", etag)]
+                if self._cache_control_header is not None:
+                    not_modified_headers.append(self._cache_control_header)
+                return CachedResponse(
+                    status_code=304, headers=not_modified_headers, body=b""
+                )
+        return cached_response
+
+    def build_cached_response(self, response: BaseResponse) -> Optional[CachedResponse]:
+        """
+        Returns response to store (with ETag and Cache-Control) or None if response is not cacheable.
+        """
+        if response.http_status_code != 200 or not response.http_has_fixed_body:
+            return None
+        headers = list(response.http_headers)
+        if get_raw_header(headers, b"set-cookie") is not None:
+            return None
+        if get_raw_header(headers, b"etag") is None:
+            etag_hash = hashlib.blake2b(response.http_body, digest_size=16).hexdigest()
+            headers.append((b"etag", f'"{etag_hash}"'.encode("latin-1")))
+        if (
+            self._cache_control_header is not None
+            and get_raw_header(headers, b"cache-control") is None
+        ):
+            headers.append(self._cache_control_header)
+        return CachedResponse(
+            status_code=response.http_status_code, headers=headers, body=response.http_body
+        )
+
+
+def cached(
+    ttl: Optional[float] = 60,
+    backend: Optional[CacheBackend] = None,
+    cache_control: Optional[str] = None,
+) -> Callable:
+    """
+    Route cache decorator, must be placed under route decorator.
+
+    Use example:
+    @app.route("/items")
+    @cached(ttl=30)
+    async def items():
+        return {"items": []}
+    """
+
+    def wrapper(endpoint_func: Callable) -> Callable:
+        endpoint_func.__smile_response_cache__ = ResponseCache(
+            ttl=ttl, backend=backend, cache_control=cache_control
+        )
+        return endpoint_func
+
+    return wrapper
+
+
+def get_response_cache(endpoint_func: Callable) -> Optional[ResponseCache]:
+    return getattr(endpoint_func, "__smile_response_cache__", None)
+
+
+def etag_matches(etag: bytes, if_none_match: bytes) -> bool:
+    """
+    Weak comparison of ETag with `If-None-Match` list, as required for conditional GET.
+    """
+    if if_none_match.strip() == b"*":
+        return True
+    etag = etag.removeprefix(b"W/")
+    return any(
+        candidate.strip().removeprefix(b"W/") == etag
+        for candidate in if_none_match.split(b",")
+    )
@@ -0,0 +1,94 @@
+"""
+    Offloading of synchronous endpoints to executors.
+"""
+import os
+import asyncio
+import contextvars
+from functools import partial
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Where synchronous endpoint is called.
+EXECUTOR_THREAD = "thread"  # Bounded thread pool (default).
+EXECUTOR_INLINE = "inline"  # Directly on the event loop, for trivially cheap endpoints.
+EXECUTOR_PROCESS = "process"  # Process pool, for CPU-heavy endpoints.
+
+EXECUTORS = (EXECUTOR_THREAD, EXECUTOR_INLINE, EXECUTOR_PROCESS)
+
+
+class ExecutorPool:
+    """
+    Lazily created executor with queue depth metrics.
+
+    All counters are updated from the event loop thread only.
+    """
+
+    def __init__(self, kind: str, max_workers: Optional[int] = None) -> None:
+        """
+        :param kind: `thread` or `process`.
+        :param max_workers: Max count of workers (executor default if None).
+        """
+        self.kind = kind
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            cpu_count = os.cpu_count() or 1
+            if self.kind == EXECUTOR_THREAD:
+                if self.max_workers is None:
+                    # Same default as `ThreadPoolExecutor` uses.
+                    self.max_workers = min(32, cpu_count + 4)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="smile"
+                )
+            else:
+                if self.max_workers is None:
+                    self.max_workers = cpu_count
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Count of calls waiting for free worker.
+        """
+        if self.max_workers is None:
+            return 0
+        return max(self.in_flight - self.max_workers, 0)
+
+    async def run(self, func: Callable, kwargs: Dict[str, Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        if self.kind == EXECUTOR_THREAD:
+            # Context variables are propagated to the thread as for coroutines.
+            call = partial(contextvars.copy_context().run, partial(func, **kwargs))
+        else:
+            call = partial(func, **kwargs)
+        future = loop.run_in_executor(self.executor, call)
+        self.in_flight += 1
+        queue_depth = self.queue_depth
+        if queue_depth > self.max_queue_depth:
+            self.max_queue_depth = queue_depth
+        try:
+            return await future
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "max_workers": self.max_workers or 0,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
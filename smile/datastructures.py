@@ -0,0 +1,198 @@
+"""
+    Data structures.
+"""
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NoReturn,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+
+def get_raw_header(
+    headers: Iterable[Tuple[bytes, bytes]], name: bytes
+) -> Optional[bytes]:
+    """
+    Returns first value of raw ASGI header by lowercase name (None if not present).
+    """
+    for header_name, header_value in headers:
+        if header_name.lower() == name:
+            return header_value
+    return None
+
+
+def parse_accept_encoding(accept_encoding: bytes) -> Dict[str, float]:
+    """
+    Returns content codings of `Accept-Encoding` header (lowercase) with their q-values.
+    """
+    codings: Dict[str, float] = {}
+    for item in accept_encoding.decode("latin-1").split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            param_name, _, param_value = param.partition("=")
+            if param_name.strip().lower() == "q":
+                try:
+                    quality = float(param_value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+def select_encoding(
+    codings: Mapping[str, float], encodings: Sequence[str]
+) -> Optional[str]:
+    """
+    Returns accepted content coding with the highest q-value (None if there is no accepted one).
+
+    :param codings: Parsed `Accept-Encoding` (`q=0` means refused, `*` matches any not listed coding).
+    :param encodings: Supported content codings in order of preference, used to break ties.
+    Explicitly listed `identity` with higher q-value than any of them means no encoding.
+    """
+    selected_encoding, selected_quality = None, 0.0
+    for encoding in encodings:
+        quality = codings.get(encoding)
+        if quality is None:
+            quality = codings.get("*", 0.0)
+        if quality > selected_quality:
+            selected_encoding, selected_quality = encoding, quality
+    if codings.get("identity", 0.0) > selected_quality:
+        return None
+    return selected_encoding
+
+
+class Headers(Mapping[str, str]):
+    """
+    Immutable case-insensitive multi-value view over raw ASGI headers.
+
+    Nothing is decoded until accessed, item access returns first value
+    of the repeated header, all values are returned by `getlist`.
+    """
+
+    __slots__ = ("_raw",)
+
+    def __init__(self, raw: Sequence[Tuple[bytes, bytes]] = ()) -> None:
+        """
+        :param raw: ASGI headers list (`scope["headers"]`), not copied.
+        """
+        self._raw = raw
+
+    @property
+    def raw(self) -> Sequence[Tuple[bytes, bytes]]:
+        return self._raw
+
+    def get_raw(self, key: str) -> Optional[bytes]:
+        return get_raw_header(self._raw, key.lower().encode("latin-1"))
+
+    def __getitem__(self, key: str) -> str:
+        header_value = self.get_raw(key)
+        if header_value is None:
+            raise KeyError(key)
+        return header_value.decode("latin-1")
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.get_raw(key) is not None
+
+    def getlist(self, key: str) -> List[str]:
+        raw_key = key.lower().encode("latin-1")
+        return [
+            header_value.decode("latin-1")
+            for header_name, header_value in self._raw
+            if header_name.lower() == raw_key
+        ]
+
+    def multi_items(self) -> List[Tuple[str, str]]:
+        return [
+            (header_name.lower().decode("latin-1"), header_value.decode("latin-1"))
+            for header_name, header_value in self._raw
+        ]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(
+            dict.fromkeys(
+                header_name.lower().decode("latin-1") for header_name, _ in self._raw
+            )
+        )
+
+    def __len__(self) -> int:
+        return len({header_name.lower() for header_name, _ in self._raw})
+
+    def __repr__(self) -> str:
+        return f"Headers({self.multi_items()!r})"
+
+
+class State:
+    """
+    Application-scoped state with attribute access (e.g `state.db_pool`).
+    """
+
+    _state: Dict[str, Any]
+
+    def __init__(self) -> None:
+        object.__setattr__(self, "_state", dict())
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self._state[name] = value
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._state[name]
+        except KeyError:
+            raise AttributeError(f"State has no attribute `{name}`!")
+
+    def __delattr__(self, name: str) -> None:
+        try:
+            del self._state[name]
+        except KeyError:
+            raise AttributeError(f"State has no attribute `{name}`!")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._state
+
+    def __repr__(self) -> str:
+        return f"State({self._state!r})"
+
+
+class QueryArgs(dict):
+    """
+    Immutable multi-dict of query args.
+
+    Item access returns last value of the repeated key, all values are returned by `getlist`.
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: Sequence[Tuple[str, str]] = ()) -> None:
+        super().__init__(items)
+        self._items = items
+
+    def getlist(self, key: str) -> List[str]:
+        return [item_value for item_key, item_value in self._items if item_key == key]
+
+    def multi_items(self) -> List[Tuple[str, str]]:
+        return list(self._items)
+
+    def _immutable(self, *args: Any, **kwargs: Any) -> NoReturn:
+        raise TypeError("Query args are immutable!")
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __ior__ = _immutable
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    update = _immutable
+
+    def __repr__(self) -> str:
+        return f"QueryArgs({list(self._items)!r})"
@@ -0,0 +1,184 @@
+"""
+    Endpoint call plans (compiled once at route registration).
+"""
+from typing import Any, Callable, Collection, Dict, List, Mapping, Optional, Tuple
+from typing import get_type_hints
+
+from smile.concurrency import EXECUTORS, EXECUTOR_INLINE, EXECUTOR_PROCESS, EXECUTOR_THREAD
+from smile.validation import compile_converter, is_body_model, unwrap_list_annotation
+from inspect import signature, iscoroutinefunction
+from inspect import Parameter as SignatureParameter
+
+# Parameter sources.
+SOURCE_ARGS = "args"  # Query string.
+SOURCE_PATH = "path"
+SOURCE_REQUEST = "request"
+SOURCE_APP = "app"
+SOURCE_STATE = "state"
+SOURCE_BODY = "body"
+SOURCE_JSON = "json"
+SOURCE_FORM = "form"
+SOURCE_WEBSOCKET = "websocket"
+SOURCE_BACKGROUND = "background"
+
+# Marker for parameters without default value.
+REQUIRED = SignatureParameter.empty
+
+
+class EndpointParam:
+    """
+    Single endpoint parameter with its source, converter and default.
+
+    Multi params (`list[int]`) receive all values of repeated query arg,
+    converter is applied to each value. Injected params have no converter.
+    """
+
+    __slots__ = ("name", "source", "converter", "default", "is_multi")
+
+    def __init__(
+        self,
+        name: str,
+        source: str,
+        converter: Optional[Callable[[Any], Any]],
+        default: Any,
+        is_multi: bool = False,
+    ) -> None:
+        self.name = name
+        self.source = source
+        self.converter = converter
+        self.default = default
+        self.is_multi = is_multi
+
+    def __repr__(self) -> str:
+        return f"EndpointParam(name={self.name!r}, source={self.source!r})"
+
+
+class EndpointPlan:
+    """
+    Call plan for endpoint, built from its signature once.
+    """
+
+    __slots__ = (
+        "endpoint_func",
+        "params",
+        "is_coroutine",
+        "uses_query_args",
+        "executor",
+    )
+
+    def __init__(
+        self,
+        endpoint_func: Callable,
+        params: Tuple[EndpointParam, ...],
+        is_coroutine: bool,
+        executor: str = EXECUTOR_INLINE,
+    ) -> None:
+        self.endpoint_func = endpoint_func
+        self.params = params
+        self.is_coroutine = is_coroutine
+        # Executor for synchronous endpoint (coroutines are always awaited inline).
+        self.executor = executor
+        # Query string is not parsed at all for endpoints without query params.
+        self.uses_query_args = any(param.source == SOURCE_ARGS for param in params)
+
+    def __repr__(self) -> str:
+        return f"EndpointPlan(endpoint_func={self.endpoint_func!r}, params={self.params!r})"
+
+
+def compile_endpoint(
+    endpoint_func: Callable,
+    injectables: Mapping[Any, str],
+    path_param_names: Collection[str] = (),
+    executor: str = EXECUTOR_THREAD,
+    typed_path_param_names: Collection[str] = (),
+) -> EndpointPlan:
+    """
+    Compiles endpoint signature in to the call plan.
+
+    :param injectables: Mapping of annotation type to the source for internal params.
+    :param path_param_names: Names of the params declared in route path.
+    :param typed_path_param_names: Names of the path params already converted from string by route (`{id:int}`).
+    :param executor: Where synchronous endpoint is called (thread, inline or process).
+    :raises TypeError: When signature is not supported by framework.
+    """
+    endpoint_name = getattr(endpoint_func, "__qualname__", repr(endpoint_func))
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor `{executor}` of {endpoint_name}!")
+    is_coroutine = iscoroutinefunction(endpoint_func)
+    type_hints = _get_type_hints(endpoint_func)
+    params: List[EndpointParam] = []
+    for param in signature(endpoint_func).parameters.values():
+        param_type = type_hints.get(param.name, param.annotation)
+        param_kind = param.kind
+        if param_kind == SignatureParameter.POSITIONAL_ONLY:
+            raise TypeError(
+                f"{param.name} of {endpoint_name} is positional only, which is not supported currently by framework!"
+            )
+        if param_kind in (
+            SignatureParameter.VAR_POSITIONAL,
+            SignatureParameter.VAR_KEYWORD,
+        ):
+            raise TypeError(
+                f"{endpoint_name} has *args or **kwargs params, currently (or forever) is not supported by framework!"
+            )
+        if param_type == SignatureParameter.empty:
+            raise TypeError(
+                f"{param.name} of {endpoint_name} has unknown-type to parse!"
+            )
+        if param.name in path_param_names:
+            source = SOURCE_PATH
+        else:
+            source = injectables.get(param_type, SOURCE_ARGS)
+            if source == SOURCE_ARGS and is_body_model(param_type):
+                source = SOURCE_JSON
+        converter, is_multi = None, False
+        try:
+            if source == SOURCE_ARGS:
+                item_type = unwrap_list_annotation(param_type)
+                if item_type is not None:
+                    converter = compile_converter(item_type, from_string=True)
+                    is_multi = True
+                else:
+                    converter = compile_converter(param_type, from_string=True)
+            elif source == SOURCE_PATH:
+                # Typed path param is not string anymore (`int` for `{id:int}`).
+                converter = compile_converter(
+                    param_type, from_string=param.name not in typed_path_param_names
+                )
+            elif source == SOURCE_JSON and is_body_model(param_type):
+                converter = compile_converter(param_type)
+        except TypeError as exception:
+            raise TypeError(f"{param.name} of {endpoint_name}: {exception}")
+        params.append(
+            EndpointParam(
+                name=param.name,
+                source=source,
+                converter=converter,
+                default=param.default,
+                is_multi=is_multi,
+            )
+        )
+    if is_coroutine:
+        executor = EXECUTOR_INLINE
+    elif executor == EXECUTOR_PROCESS:
+        for param in params:
+            if param.source not in (SOURCE_ARGS, SOURCE_PATH):
+                raise TypeError(
+                    f"{param.name} of {endpoint_name} can not be passed to process pool, only query and path params are allowed!"
+                )
+    return EndpointPlan(
+        endpoint_func=endpoint_func,
+        params=tuple(params),
+        is_coroutine=is_coroutine,
+        executor=executor,
+    )
+
+
+def _get_type_hints(endpoint_func: Callable) -> Dict[str, Any]:
+    """
+    Returns resolved annotations (`from __future__ import annotations`), empty if can not be resolved.
+    """
+    try:
+        return get_type_hints(endpoint_func)
+    except Exception:
+        return {}
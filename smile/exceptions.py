@@ -0,0 +1,35 @@
+"""
+    Framework exceptions.
+"""
+from http import HTTPStatus
+from typing import Optional
+
+
+class HTTPException(Exception):
+    """
+    Exception that is converted in to the response with given status code.
+    """
+
+    def __init__(self, status_code: int, detail: Optional[str] = None) -> None:
+        if detail is None:
+            detail = HTTPStatus(status_code).phrase
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(status_code, detail)
+
+
+class ClientDisconnect(Exception):
+    """
+    Client disconnected while request body was received.
+    """
+
+
+class WebSocketDisconnect(Exception):
+    """
+    WebSocket connection is closed by client (or can not be used anymore).
+    """
+
+    def __init__(self, code: int = 1000, reason: Optional[str] = None) -> None:
+        self.code = code
+        self.reason = reason or ""
+        super().__init__(code, self.reason)
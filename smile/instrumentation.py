@@ -0,0 +1,255 @@
+"""
+    Request lifecycle instrumentation hooks and per-route metrics collector.
+
+    Hook is called as `hook(scope, timestamp)` (`time.perf_counter()` timestamp)
+    on the event loop, so it must be cheap and must not block.
+"""
+import logging
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from smile.types import Scope
+
+logger = logging.getLogger("smile")
+
+# Request lifecycle events, in order of emitting.
+EVENT_REQUEST_START = "request_start"
+EVENT_ROUTE_MATCHED = "route_matched"  # Not emitted for not found and not allowed method.
+EVENT_ARGS_BOUND = "args_bound"  # Not emitted for response cache hits.
+EVENT_HANDLER_DONE = "handler_done"  # Not emitted for response cache hits.
+EVENT_RESPONSE_RENDERED = "response_rendered"
+EVENT_RESPONSE_SENT = "response_sent"
+
+EVENTS = (
+    EVENT_REQUEST_START,
+    EVENT_ROUTE_MATCHED,
+    EVENT_ARGS_BOUND,
+    EVENT_HANDLER_DONE,
+    EVENT_RESPONSE_RENDERED,
+    EVENT_RESPONSE_SENT,
+)
+
+# Scope keys set only while instrumentation is enabled.
+ROUTE_SCOPE_KEY = "smile.route"  # Matched route path (`/users/{user_id:int}`).
+STATUS_CODE_SCOPE_KEY = "smile.status_code"  # Set on response rendered.
+_STARTED_AT_SCOPE_KEY = "smile.metrics.started_at"
+
+# Route label for requests that were not matched to any route.
+UNMATCHED_ROUTE = "<unmatched>"
+# Labels of series above `max_series` limit.
+OVERFLOW_METHOD = "OTHER"
+OVERFLOW_ROUTE = "<overflow>"
+
+# Latency histogram buckets upper bounds in seconds.
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+InstrumentationHook = Callable[[Scope, float], None]
+
+
+class Instrumentation:
+    """
+    Registry of request lifecycle hooks.
+
+    `enabled` is checked by application before emitting any event,
+    so there is no overhead when there is no hooks.
+    """
+
+    def __init__(self) -> None:
+        self.hooks: Dict[str, List[InstrumentationHook]] = {event: [] for event in EVENTS}
+        self.enabled = False
+
+    def add_hook(self, event: str, hook: InstrumentationHook) -> None:
+        if event not in self.hooks:
+            raise ValueError(
+                f"Unknown instrumentation event {event!r}! Expected one of: {', '.join(EVENTS)}."
+            )
+        self.hooks[event].append(hook)
+        self.enabled = True
+
+    def emit(self, event: str, scope: Scope) -> None:
+        hooks = self.hooks[event]
+        if not hooks:
+            return
+        timestamp = perf_counter()
+        for hook in hooks:
+            try:
+                hook(scope, timestamp)
+            except Exception:
+                # Broken hook should never break request.
+                logger.exception("Exception in instrumentation hook for %s!", event)
+
+
+class LatencyHistogram:
+    """
+    Fixed buckets latency histogram (fixed memory whatever count of observations).
+    """
+
+    __slots__ = ("buckets", "bucket_counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        # Last count is for observations above last bucket (`+Inf`).
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def percentile(self, percent: float) -> float:
+        """
+        Returns estimated percentile in seconds (linear interpolation within bucket).
+        """
+        if self.count == 0:
+            return 0.0
+        rank = self.count * percent / 100
+        cumulative_count = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            if bucket_count and cumulative_count + bucket_count >= rank:
+                if index == len(self.buckets):
+                    # Above last bucket, nothing better than its bound.
+                    return self.buckets[-1]
+                lower_bound = self.buckets[index - 1] if index > 0 else 0.0
+                upper_bound = self.buckets[index]
+                fraction = (rank - cumulative_count) / bucket_count
+                return lower_bound + (upper_bound - lower_bound) * fraction
+            cumulative_count += bucket_count
+        return self.buckets[-1]
+
+
+class MetricsCollector:
+    """
+    Per-route latency histograms and response counters, installed as instrumentation hooks.
+
+    Memory is bounded by `max_series` (method and route pairs), requests
+    above that are accounted under overflow labels.
+    """
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        max_series: int = 1000,
+        namespace: str = "smile",
+    ) -> None:
+        """
+        :param buckets: Latency histogram buckets upper bounds in seconds.
+        :param max_series: Max count of (method, route) pairs.
+        :param namespace: Prometheus metrics names prefix.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.max_series = max_series
+        self.namespace = namespace
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.responses: Dict[Tuple[str, str, int], int] = {}
+        self.in_flight = 0
+
+    def install(self, instrumentation: Instrumentation) -> None:
+        instrumentation.add_hook(EVENT_REQUEST_START, self._on_request_start)
+        instrumentation.add_hook(EVENT_RESPONSE_SENT, self._on_response_sent)
+
+    def _on_request_start(self, scope: Scope, timestamp: float) -> None:
+        scope[_STARTED_AT_SCOPE_KEY] = timestamp
+        self.in_flight += 1
+
+    def _on_response_sent(self, scope: Scope, timestamp: float) -> None:
+        started_at = scope.get(_STARTED_AT_SCOPE_KEY)
+        if started_at is None:
+            return
+        self.in_flight -= 1
+        self.observe(
+            method=scope.get("method", "GET"),
+            route=scope.get(ROUTE_SCOPE_KEY, UNMATCHED_ROUTE),
+            status_code=scope.get(STATUS_CODE_SCOPE_KEY, 0),
+            seconds=timestamp - started_at,
+        )
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float) -> None:
+        series_key = (method, route)
+        histogram = self.histograms.get(series_key)
+        if histogram is None:
+            if len(self.histograms) >= self.max_series:
+                series_key = (OVERFLOW_METHOD, OVERFLOW_ROUTE)
+                histogram = self.histograms.get(series_key)
+            if histogram is None:
+                histogram = self.histograms[series_key] = LatencyHistogram(self.buckets)
+        histogram.observe(seconds)
+        responses_key = (*series_key, status_code)
+        self.responses[responses_key] = self.responses.get(responses_key, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """
+        Returns per-route summary (`"GET /users/{user_id:int}"` keys) with count, p50 and p99 in seconds.
+        """
+        statuses: Dict[Tuple[str, str], Dict[int, int]] = {}
+        for (method, route, status_code), count in self.responses.items():
+            statuses.setdefault((method, route), {})[status_code] = count
+        return {
+            f"{method} {route}": {
+                "count": histogram.count,
+                "sum": histogram.sum,
+                "p50": histogram.percentile(50),
+                "p99": histogram.percentile(99),
+                "statuses": statuses.get((method, route), {}),
+            }
+            for (method, route), histogram in self.histograms.items()
+        }
+
+    def render_prometheus(self) -> str:
+        """
+        Returns metrics in Prometheus text exposition format.
+        """
+        duration_name = f"{self.namespace}_request_duration_seconds"
+        responses_name = f"{self.namespace}_responses_total"
+        in_flight_name = f"{self.namespace}_requests_in_flight"
+        lines = [
+            f"# HELP {duration_name} Request handling duration until response is sent.",
+            f"# TYPE {duration_name} histogram",
+        ]
+        bucket_labels = [_format_float(bucket) for bucket in self.buckets] + ["+Inf"]
+        for (method, route), histogram in sorted(self.histograms.items()):
+            labels = f'method="{_escape_label(method)}",route="{_escape_label(route)}"'
+            cumulative_count = 0
+            for bucket_label, bucket_count in zip(bucket_labels, histogram.bucket_counts):
+                cumulative_count += bucket_count
+                lines.append(
+                    f'{duration_name}_bucket{{{labels},le="{bucket_label}"}} {cumulative_count}'
+                )
+            lines.append(f"{duration_name}_sum{{{labels}}} {_format_float(histogram.sum)}")
+            lines.append(f"{duration_name}_count{{{labels}}} {histogram.count}")
+        lines.append(f"# HELP {responses_name} Count of sent responses.")
+        lines.append(f"# TYPE {responses_name} counter")
+        for (method, route, status_code), count in sorted(self.responses.items()):
+            lines.append(
+                f'{responses_name}{{method="{_escape_label(method)}",'
+                f'route="{_escape_label(route)}",status="{status_code}"}} {count}'
+            )
+        lines.append(f"# HELP {in_flight_name} Count of requests being handled.")
+        lines.append(f"# TYPE {in_flight_name} gauge")
+        lines.append(f"{in_flight_name} {self.in_flight}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
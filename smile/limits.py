@@ -0,0 +1,114 @@
+"""
+    Limiting of concurrently handled requests (with bounded wait queue and load shedding).
+"""
+import asyncio
+from collections import deque
+from time import perf_counter
+from typing import Deque, Dict, Optional, Union
+
+from smile.responses import PlainResponse, StaticResponse
+
+
+class ConcurrencyLimiter:
+    """
+    Max count of requests handled at once, with bounded FIFO queue of waiting requests.
+
+    Request that does not fit in to the queue is shed at once (503 with `Retry-After`),
+    so under overload latency stays bounded instead of growing with backlog.
+    All counters are updated from the event loop thread only.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: Optional[int] = None,
+        retry_after: int = 1,
+    ) -> None:
+        """
+        :param max_concurrency: Max count of requests handled at once.
+        :param max_queue: Max count of requests waiting for slot (same as `max_concurrency` if None, 0 to shed at once).
+        :param retry_after: Seconds sent in `Retry-After` header of shed response.
+        """
+        if max_concurrency < 1:
+            raise ValueError("Max concurrency should be at least 1!")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue if max_queue is not None else max_concurrency
+        self.retry_after = retry_after
+        self.shed_response = StaticResponse(
+            PlainResponse(
+                "Service Unavailable!",
+                status_code=503,
+                headers={"retry-after": str(retry_after)},
+            )
+        )
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        self.in_flight = 0
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+        self.max_queue_depth = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """
+        Takes slot (waits in queue if there is no free slot), returns False if request is shed.
+        """
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.shed += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        if len(self._waiters) > self.max_queue_depth:
+            self.max_queue_depth = len(self._waiters)
+        queued_at = perf_counter()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over right before cancellation, pass it on.
+                self.release()
+            elif waiter in self._waiters:
+                # Cancelled waiter may be already popped (and skipped) by `release`.
+                self._waiters.remove(waiter)
+            raise
+        queue_time = perf_counter() - queued_at
+        self.queue_time_total += queue_time
+        if queue_time > self.queue_time_max:
+            self.queue_time_max = queue_time
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        """
+        Frees slot, handing it over to the first waiting request if any.
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def metrics(self) -> Dict[str, Union[int, float]]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": self.shed,
+            "queue_time_total": self.queue_time_total,
+            "queue_time_max": self.queue_time_max,
+        }
@@ -0,0 +1,388 @@
+"""
+    Built-in ASGI middlewares.
+
+    ASGI middleware is class that is constructed as `middleware(app, **options)`
+    and called as ASGI app, registered by `Smile.add_middleware`.
+"""
+import zlib
+from time import perf_counter
+from typing import Any, Callable, Collection, List, Optional, Tuple
+
+from smile.types import Scope, Receive, Send, Message
+from smile.responses import HEAD_WITH_BODY_SCOPE_KEY
+from smile.datastructures import (
+    get_raw_header,
+    parse_accept_encoding,
+    select_encoding,
+)
+
+try:
+    import brotli
+
+    brotli_is_installed = True
+except ImportError:
+    brotli_is_installed = False
+
+ASGIApp = Callable[[Scope, Receive, Send], Any]
+
+# Content codings of compression middleware, in order of preference (used on equal q-values).
+COMPRESSION_ENCODINGS = ("br", "gzip") if brotli_is_installed else ("gzip",)
+
+# Media types that are already compressed (compressing them again only costs CPU).
+# Top level type with `/*` (`video/*`) matches all its subtypes.
+DEFAULT_UNCOMPRESSIBLE_MEDIA_TYPES = frozenset(
+    (
+        "image/png",
+        "image/jpeg",
+        "image/gif",
+        "image/webp",
+        "image/avif",
+        "video/*",
+        "audio/*",
+        "font/woff",
+        "font/woff2",
+        "application/zip",
+        "application/gzip",
+        "application/x-gzip",
+        "application/x-bzip2",
+        "application/x-xz",
+        "application/x-7z-compressed",
+        "application/x-rar-compressed",
+        "application/zstd",
+    )
+)
+
+
+class CompressionMiddleware:
+    """
+    Compresses response body with brotli (if installed) or gzip, by client `Accept-Encoding`.
+
+    Works with streamed bodies (compressed chunk by chunk), bodies
+    smaller than `minimum_size`, partial (206) responses and
+    already compressed media types are sent as is.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        uncompressible_media_types: Collection[str] = DEFAULT_UNCOMPRESSIBLE_MEDIA_TYPES,
+    ) -> None:
+        """
+        :param uncompressible_media_types: Media types sent as is (`type/subtype` or `type/*`).
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.uncompressible_media_types = frozenset(
+            media_type.lower() for media_type in uncompressible_media_types
+        )
+
+    def is_compressible(self, content_type: Optional[bytes]) -> bool:
+        """
+        Returns False if response media type is in uncompressible media types.
+        """
+        if content_type is None:
+            return True
+        media_type = content_type.decode("latin-1").partition(";")[0].strip().lower()
+        if media_type in self.uncompressible_media_types:
+            return False
+        return f"{media_type.partition('/')[0]}/*" not in self.uncompressible_media_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = get_raw_header(scope.get("headers", []), b"accept-encoding")
+        encoding = None
+        if accept_encoding is not None:
+            encoding = select_encoding(
+                parse_accept_encoding(accept_encoding), COMPRESSION_ENCODINGS
+            )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        if scope.get("method") == "HEAD":
+            # Body is rendered and compressed (then dropped), so headers are same as for GET.
+            scope[HEAD_WITH_BODY_SCOPE_KEY] = True
+            send = _without_body(send)
+        await self.app(scope, receive, _CompressingSend(self, encoding, send))
+
+
+def _without_body(send: Send) -> Send:
+    """
+    Send wrapper that drops response body (for HEAD request), sending single empty body message.
+    """
+
+    async def send_without_body(message: Message) -> None:
+        if message["type"] != "http.response.start":
+            if message.get("more_body", False):
+                return
+            message = {"type": "http.response.body", "body": b""}
+        await send(message)
+
+    return send_without_body
+
+
+class _CompressingSend:
+    """
+    Send wrapper that delays response start until first body chunk to decide on compression.
+    """
+
+    __slots__ = ("middleware", "encoding", "send", "start_message", "compressor")
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Any = None
+
+    def _create_compressor(self) -> Any:
+        if self.encoding == "br":
+            return brotli.Compressor(quality=self.middleware.brotli_quality)
+        return zlib.compressobj(self.middleware.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def _compress(self, chunk: bytes, more_body: bool) -> bytes:
+        if self.encoding == "br":
+            compressed = self.compressor.process(chunk)
+            if more_body:
+                return compressed + self.compressor.flush()
+            return compressed + self.compressor.finish()
+        compressed = self.compressor.compress(chunk)
+        if more_body:
+            return compressed + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        return compressed + self.compressor.flush()
+
+    async def __call__(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+        if message_type != "http.response.body":
+            # E.g zero copy send, that can not be compressed.
+            if self.start_message is not None:
+                await self.send(self.start_message)
+                self.start_message = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start_message is not None:
+            start_message, self.start_message = self.start_message, None
+            headers = list(start_message.get("headers", []))
+            already_encoded = get_raw_header(headers, b"content-encoding") is not None
+            if (
+                already_encoded
+                # Range of body is not compressed (its offsets are of uncompressed body).
+                or start_message.get("status") == 206
+                or not self.middleware.is_compressible(
+                    get_raw_header(headers, b"content-type")
+                )
+                or (not more_body and len(body) < self.middleware.minimum_size)
+            ):
+                await self.send(start_message)
+                await self.send(message)
+                return
+            headers = [
+                (header_name, header_value)
+                for header_name, header_value in headers
+                if header_name.lower() != b"content-length"
+            ]
+            headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+            headers.append((b"vary", b"Accept-Encoding"))
+            self.compressor = self._create_compressor()
+            compressed_body = self._compress(body, more_body)
+            if not more_body:
+                headers.append(
+                    (b"content-length", str(len(compressed_body)).encode("latin-1"))
+                )
+            await self.send({**start_message, "headers": headers})
+            await self.send(
+                {"type": "http.response.body", "body": compressed_body, "more_body": more_body}
+            )
+            return
+        if self.compressor is None:
+            await self.send(message)
+            return
+        await self.send(
+            {
+                "type": "http.response.body",
+                "body": self._compress(body, more_body),
+                "more_body": more_body,
+            }
+        )
+
+
+class TimingMiddleware:
+    """
+    Measures request processing time.
+
+    Adds `Server-Timing` header (time until response start) and calls
+    optional `callback(scope, seconds)` when response is fully sent.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        callback: Optional[Callable[[Scope, float], Any]] = None,
+        metric_name: str = "app",
+    ) -> None:
+        self.app = app
+        self.callback = callback
+        self.metric_name = metric_name
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started_at = perf_counter()
+
+        async def timing_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                duration_ms = (perf_counter() - started_at) * 1000
+                server_timing = f"{self.metric_name};dur={duration_ms:.3f}"
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"server-timing", server_timing.encode("latin-1")),
+                    ],
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timing_send)
+        finally:
+            if self.callback is not None:
+                self.callback(scope, perf_counter() - started_at)
+
+
+class CORSMiddleware:
+    """
+    Cross-Origin Resource Sharing, answers preflight requests and adds CORS headers.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        allow_origins: Collection[str] = (),
+        allow_methods: Collection[str] = ("GET",),
+        allow_headers: Collection[str] = (),
+        allow_credentials: bool = False,
+        expose_headers: Collection[str] = (),
+        max_age: int = 600,
+    ) -> None:
+        """
+        :param allow_origins: Allowed origins, `*` allows any origin.
+        :param allow_methods: Allowed methods, `*` allows any method.
+        :param allow_headers: Allowed request headers, `*` allows any header.
+        """
+        self.app = app
+        self.allow_any_origin = "*" in allow_origins
+        self.allow_origins = frozenset(origin.encode("latin-1") for origin in allow_origins)
+        self.allow_any_method = "*" in allow_methods
+        self.allow_methods = frozenset(method.upper().encode("latin-1") for method in allow_methods)
+        self.allow_any_header = "*" in allow_headers
+        self.allow_headers = frozenset(header.lower() for header in allow_headers)
+        self.allow_credentials = allow_credentials
+
+        # Headers are encoded once here, not on every request.
+        self._simple_headers: List[Tuple[bytes, bytes]] = []
+        if allow_credentials:
+            self._simple_headers.append((b"access-control-allow-credentials", b"true"))
+        if expose_headers:
+            self._simple_headers.append(
+                (b"access-control-expose-headers", ", ".join(expose_headers).encode("latin-1"))
+            )
+        self._preflight_headers: List[Tuple[bytes, bytes]] = [
+            (
+                b"access-control-allow-methods",
+                ", ".join(sorted(method.upper() for method in allow_methods)).encode("latin-1"),
+            ),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+        ]
+        if allow_credentials:
+            self._preflight_headers.append((b"access-control-allow-credentials", b"true"))
+        if allow_headers and not self.allow_any_header:
+            self._preflight_headers.append(
+                (b"access-control-allow-headers", ", ".join(allow_headers).encode("latin-1"))
+            )
+
+    def _is_origin_allowed(self, origin: bytes) -> bool:
+        return self.allow_any_origin or origin in self.allow_origins
+
+    def _allow_origin_header(self, origin: bytes) -> Tuple[bytes, bytes]:
+        if self.allow_any_origin and not self.allow_credentials:
+            return b"access-control-allow-origin", b"*"
+        return b"access-control-allow-origin", origin
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = scope.get("headers", [])
+        origin = get_raw_header(headers, b"origin")
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+        requested_method = get_raw_header(headers, b"access-control-request-method")
+        if scope["method"] == "OPTIONS" and requested_method is not None:
+            await self._preflight(origin, requested_method, headers, send)
+            return
+        if not self._is_origin_allowed(origin):
+            await self.app(scope, receive, send)
+            return
+
+        cors_headers = [self._allow_origin_header(origin), *self._simple_headers]
+        if not self.allow_any_origin or self.allow_credentials:
+            cors_headers.append((b"vary", b"Origin"))
+
+        async def cors_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), *cors_headers],
+                }
+            await send(message)
+
+        await self.app(scope, receive, cors_send)
+
+    async def _preflight(
+        self,
+        origin: bytes,
+        requested_method: bytes,
+        headers: List[Tuple[bytes, bytes]],
+        send: Send,
+    ) -> None:
+        is_allowed = self._is_origin_allowed(origin) and (
+            self.allow_any_method or requested_method.upper() in self.allow_methods
+        )
+        requested_headers = get_raw_header(headers, b"access-control-request-headers")
+        response_headers = [self._allow_origin_header(origin), *self._preflight_headers]
+        if requested_headers is not None and is_allowed:
+            if self.allow_any_header:
+                response_headers.append((b"access-control-allow-headers", requested_headers))
+            else:
+                is_allowed = all(
+                    header.strip().lower() in self.allow_headers
+                    for header in requested_headers.decode("latin-1").split(",")
+                    if header.strip()
+                )
+        if not is_allowed:
+            response_headers = [(b"content-length", b"0")]
+        else:
+            response_headers.append((b"content-length", b"0"))
+            response_headers.append((b"vary", b"Origin"))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200 if is_allowed else 400,
+                "headers": response_headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": b""})
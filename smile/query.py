@@ -0,0 +1,48 @@
+"""
+    Query string parser.
+"""
+from urllib.parse import unquote_plus
+
+from smile.datastructures import QueryArgs
+from smile.exceptions import HTTPException
+
+# Default limits, hostile query strings are rejected before parsing.
+DEFAULT_MAX_QUERY_PARAMS = 1000
+DEFAULT_MAX_QUERY_LENGTH = 8 * 1024
+
+# Query args are immutable, so requests without query string share single instance.
+_EMPTY_QUERY_ARGS = QueryArgs()
+
+
+def parse_query_string(
+    query_string: bytes,
+    max_params: int = DEFAULT_MAX_QUERY_PARAMS,
+    max_length: int = DEFAULT_MAX_QUERY_LENGTH,
+) -> QueryArgs:
+    """
+    Parses raw query string in to the query args.
+
+    Supports percent-decoding (`+` is space), repeated keys, values with `=`
+    and bare flags (`?debug` is parsed as `debug` with empty value).
+
+    :raises HTTPException: When query string exceeds limits.
+    """
+    if not query_string:
+        return _EMPTY_QUERY_ARGS
+    if len(query_string) > max_length:
+        raise HTTPException(414, "Query string is too long!")
+    if query_string.count(b"&") >= max_params:
+        raise HTTPException(400, "Query string has too many params!")
+
+    decoded_query_string = query_string.decode("utf-8", "replace")
+    needs_unquote = b"%" in query_string or b"+" in query_string
+    items = []
+    for query_arg in decoded_query_string.split("&"):
+        if not query_arg:
+            continue
+        query_arg_name, _, query_arg_value = query_arg.partition("=")
+        if needs_unquote:
+            query_arg_name = unquote_plus(query_arg_name)
+            query_arg_value = unquote_plus(query_arg_value)
+        items.append((query_arg_name, query_arg_value))
+    return QueryArgs(items)
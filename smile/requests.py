@@ -1,15 +1,42 @@
-from typing import Dict, Any, List, Union
-from smile.types import Scope
-from smile.routing import parse_args_from_scope
+import json
+from typing import Dict, Any, List, Optional, AsyncIterator
+from urllib.parse import parse_qsl
+
+from smile.types import Scope, Receive
+from smile.routing import get_query_args
+from smile.exceptions import HTTPException, ClientDisconnect
+from smile.datastructures import Headers
 
 
 class URL:
+    __slots__ = ("path", "_scope")
+
     path: str
-    query_args: Dict[str, Any]
 
     def __init__(self, scope: Scope) -> None:
         self.path = scope.get("root_path", "") + scope["path"]
-        self.query_args = parse_args_from_scope(scope=scope)
+        self._scope = scope
+
+    @property
+    def query_args(self) -> Dict[str, Any]:
+        # Shared with endpoint args binding, parsed at most once per request.
+        return get_query_args(scope=self._scope)
+
+
+class FormData(dict):
+    """
+    Parsed form (`application/x-www-form-urlencoded`) body.
+    """
+
+
+class JSONBody:
+    """
+    Annotation for endpoint param that receives parsed JSON body.
+    """
+
+
+# Sentinel for JSON body that is not parsed yet (`None` is valid JSON).
+_NOT_PARSED = object()
 
 
 class Request:
@@ -17,11 +44,40 @@ class Request:
     Request information for endpoint.
     """
 
-    url: URL
-    headers: Dict[str, Any]
+    __slots__ = (
+        "scope",
+        "_receive",
+        "_max_body_size",
+        "_stream_consumed",
+        "_url",
+        "_headers",
+        "_cookies",
+        "_body",
+        "_json",
+        "_form",
+    )
 
-    def __init__(self, scope: Scope):
+    def __init__(
+        self,
+        scope: Scope,
+        receive: Optional[Receive] = None,
+        max_body_size: Optional[int] = None,
+    ):
+        """
+        :param scope: ASGI scope.
+        :param receive: ASGI receive callable, required for reading body.
+        :param max_body_size: Max allowed body size in bytes (None for unlimited).
+        """
         self.scope = scope
+        self._receive = receive
+        self._max_body_size = max_body_size
+        self._stream_consumed = False
+        self._url: Optional[URL] = None
+        self._headers: Optional[Headers] = None
+        self._cookies: Optional[Dict[str, str]] = None
+        self._body: Optional[bytes] = None
+        self._json: Any = _NOT_PARSED
+        self._form: Optional[FormData] = None
 
     @property
     def method(self) -> str:
@@ -31,33 +87,121 @@ class Request:
     def app(self) -> Any:
         return self.scope["app"]
 
+    @property
+    def receive(self) -> Optional[Receive]:
+        return self._receive
+
     @property
     def cookies(self) -> Dict[str, str]:
-        if not hasattr(self, "_cookies"):
-            self._cookies = self.headers.get("cookie").split("; ")
+        """
+        Cookies from `Cookie` header(s), parsed on first access.
+        """
+        if self._cookies is None:
+            self._cookies = _parse_cookies(self.headers.getlist("cookie"))
         return self._cookies
 
     @property
     def state(self) -> Dict[str, Any]:
-        if not hasattr(self, "_state"):
-            self._state = self.scope["state"]
-        return self._state
+        # Created lazily, so requests that never use state allocate nothing.
+        state = self.scope.get("state")
+        if state is None:
+            state = self.scope["state"] = dict()
+        return state
 
     @property
     def url(self) -> URL:
-        if not hasattr(self, "_url"):
+        if self._url is None:
             self._url = URL(scope=self.scope)
         return self._url
 
     @property
-    def headers(self) -> URL:
-        if not hasattr(self, "_headers"):
-            self._headers = _build_headers_dict(raw_headers=self.scope["headers"])
+    def headers(self) -> Headers:
+        """
+        Case-insensitive headers, values are decoded only when accessed.
+        """
+        if self._headers is None:
+            self._headers = Headers(self.scope.get("headers", []))
         return self._headers
 
+    async def stream(self) -> AsyncIterator[bytes]:
+        """
+        Iterates over body chunks as they are received, without buffering them.
+        """
+        if self._body is not None:
+            yield self._body
+            return
+        if self._stream_consumed:
+            raise RuntimeError("Request body stream is already consumed!")
+        if self._receive is None:
+            raise RuntimeError("Request has no receive channel to read body from!")
+        self._stream_consumed = True
+
+        max_body_size = self._max_body_size
+        if max_body_size is not None:
+            content_length = self.headers.get("content-length")
+            if content_length is not None and content_length.isdigit():
+                if int(content_length) > max_body_size:
+                    raise HTTPException(413)
+        received_size = 0
+        while True:
+            message = await self._receive()
+            message_type = message["type"]
+            if message_type == "http.disconnect":
+                raise ClientDisconnect()
+            if message_type != "http.request":
+                continue
+            chunk = message.get("body", b"")
+            if chunk:
+                received_size += len(chunk)
+                if max_body_size is not None and received_size > max_body_size:
+                    raise HTTPException(413)
+                yield chunk
+            if not message.get("more_body", False):
+                break
+
+    async def body(self) -> bytes:
+        """
+        Reads whole body in to the memory (cached for next calls).
+        """
+        if self._body is None:
+            self._body = b"".join([chunk async for chunk in self.stream()])
+        return self._body
 
-def _build_headers_dict(raw_headers: List[Union[bytes, bytes]]) -> Dict[str, Any]:
-    headers_dict = dict()
-    for header_name, header_value in raw_headers:
-        headers_dict[header_name.decode("utf-8")] = header_value.decode("utf-8")
-    return headers_dict
+    async def json(self) -> Any:
+        if self._json is _NOT_PARSED:
+            try:
+                self._json = json.loads(await self.body())
+            except ValueError:
+                raise HTTPException(400, "Request body is not valid JSON!")
+        return self._json
+
+    async def form(self) -> FormData:
+        """
+        Parses `application/x-www-form-urlencoded` body.
+        """
+        if self._form is None:
+            content_type = self.headers.get("content-type", "")
+            media_type = content_type.partition(";")[0].strip().lower()
+            if media_type != "application/x-www-form-urlencoded":
+                raise HTTPException(415, f"Form of type `{media_type}` is not supported!")
+            body = await self.body()
+            self._form = FormData(parse_qsl(body.decode("utf-8")))
+        return self._form
+
+
+def _parse_cookies(cookie_headers: List[str]) -> Dict[str, str]:
+    """
+    Parses `Cookie` headers values (`name=value; name2=value2`), first cookie with same name wins.
+    """
+    cookies: Dict[str, str] = {}
+    for cookie_header in cookie_headers:
+        for cookie in cookie_header.split(";"):
+            name, separator, value = cookie.partition("=")
+            name = name.strip()
+            if not separator or not name:
+                continue
+            value = value.strip()
+            if len(value) > 1 and value[0] == value[-1] == '"':
+                value = value[1:-1]
+            cookies.setdefault(name, value)
+    return cookies
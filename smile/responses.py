@@ -1,9 +1,25 @@
 """
     Response class types.
 """
-import json
-from typing import Any, Optional, Mapping, List, Tuple
+import os
+import asyncio
+from email.utils import formatdate
+from mimetypes import guess_type
+from functools import lru_cache
+from typing import (
+    Any,
+    Optional,
+    Mapping,
+    List,
+    Tuple,
+    Union,
+    Iterable,
+    AsyncIterable,
+    AsyncIterator,
+)
 from smile.types import Scope, Receive, Send
+from smile.serialization import JSONSerializer, default_json_serializer
+from smile.datastructures import get_raw_header
 
 
 class BaseResponse:
@@ -12,6 +28,17 @@ class BaseResponse:
     http_body: bytes = b""
     http_body_encoding_charset = "utf-8"
     http_media_type: Optional[str] = None
+    # Body is fully known (`http_body`), so `content-length` is set automatically.
+    http_has_fixed_body: bool = True
+
+    # Pre-encoded `content-type` header of the class media type.
+    _content_type_header: Optional[Tuple[bytes, bytes]] = None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._content_type_header = _encode_content_type_header(
+            cls.http_media_type, cls.http_body_encoding_charset
+        )
 
     def __init__(
         self,
@@ -23,11 +50,14 @@ class BaseResponse:
         """
         :param content: Response body data.
         :param status_code: HTTP status code.
-        :param headers: Headers mapping.
+        :param headers: Headers mapping (not modified).
         :param media_type: By default should not overriden as declared by response classes.
         """
         if media_type is not None:
             self.http_media_type = media_type
+            self._content_type_header = _encode_content_type_header(
+                media_type, self.http_body_encoding_charset
+            )
         self.http_status_code = status_code
 
         self.http_body = self._render_body_to_content(content=content)
@@ -37,22 +67,24 @@ class BaseResponse:
         self, headers: Optional[Mapping[str, str]] = None
     ) -> List[Tuple[bytes, bytes]]:
         """
-        Convert headers in to the bytes.
+        Convert headers in to the bytes, adds `content-type` and `content-length` if not specified.
         """
-        if headers is None:
-            return []
-
-        # Add required content type header if not specified.
-        if self.http_media_type is not None and "content-type" not in headers:
-            content_type_header = self.http_media_type
-            if content_type_header.startswith("text/"):
-                content_type_header += f"; charset={self.http_body_encoding_charset}"
-            headers["content-type"] = content_type_header
-
-        return [
-            (k.lower().encode("latin-1"), v.encode("latin-1"))
-            for k, v in headers.items()
-        ]
+        content_type_header = self._content_type_header
+        add_content_length = self.http_has_fixed_body
+        raw_headers = []
+        if headers:
+            for header_name, header_value in headers.items():
+                raw_header_name = header_name.lower().encode("latin-1")
+                if raw_header_name == b"content-type":
+                    content_type_header = None
+                elif raw_header_name == b"content-length":
+                    add_content_length = False
+                raw_headers.append((raw_header_name, header_value.encode("latin-1")))
+        if content_type_header is not None:
+            raw_headers.append(content_type_header)
+        if add_content_length:
+            raw_headers.append((b"content-length", b"%d" % len(self.http_body)))
+        return raw_headers
 
     def _render_body_to_content(
         self, content: Any, *, _override_body_encoding_charset: Optional[str] = None
@@ -84,6 +116,73 @@ class BaseResponse:
         )
         await send({"type": "http.response.body", "body": self.http_body})
 
+    async def send_head(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handles response to HEAD request, same status and headers (with `content-length`) without body.
+
+        Body is not sent (streaming response iterator is not even consumed).
+        """
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.http_status_code,
+                "headers": self.http_headers,
+            }
+        )
+        await send(_EMPTY_BODY_MESSAGE)
+
+
+# Scope key set (e.g by compression middleware) when response to HEAD request should
+# be sent with body (which is dropped by whoever set it), so headers are same as for GET.
+HEAD_WITH_BODY_SCOPE_KEY = "smile.head_with_body"
+
+# Body message of responses to HEAD requests (never modified).
+_EMPTY_BODY_MESSAGE = {"type": "http.response.body", "body": b""}
+
+
+@lru_cache(maxsize=None)
+def _encode_content_type_header(
+    media_type: Optional[str], charset: str
+) -> Optional[Tuple[bytes, bytes]]:
+    if media_type is None:
+        return None
+    if media_type.startswith("text/"):
+        media_type += f"; charset={charset}"
+    return b"content-type", media_type.encode("latin-1")
+
+
+class StaticResponse(BaseResponse):
+    """
+    Immutable response, encoded once and replayed as the same ASGI messages.
+
+    Use for constant responses (health checks, not found pages, constant JSON).
+    """
+
+    def __init__(self, response: BaseResponse) -> None:
+        """
+        :param response: Response with fixed body to freeze.
+        """
+        if not response.http_has_fixed_body:
+            raise TypeError("Only responses with fixed body can be static!")
+        self.http_status_code = response.http_status_code
+        self.http_media_type = response.http_media_type
+        self.http_body = response.http_body
+        self.http_headers = tuple(response.http_headers)
+        self._start_message = {
+            "type": "http.response.start",
+            "status": self.http_status_code,
+            "headers": self.http_headers,
+        }
+        self._body_message = {"type": "http.response.body", "body": self.http_body}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(self._start_message)
+        await send(self._body_message)
+
+    async def send_head(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(self._start_message)
+        await send(_EMPTY_BODY_MESSAGE)
+
 
 class PlainResponse(BaseResponse):
     """
@@ -108,18 +207,253 @@ class JSONResponse(BaseResponse):
 
     http_media_type = "application/json"
 
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        serializer: Optional[JSONSerializer] = None,
+    ):
+        """
+        :param content: Response body data.
+        :param status_code: HTTP status code.
+        :param headers: Headers mapping.
+        :param media_type: By default should not overriden as declared by response classes.
+        :param serializer: JSON serializer (content to bytes), fastest installed by default.
+        """
+        self.json_serializer = (
+            serializer if serializer is not None else default_json_serializer
+        )
+        super().__init__(
+            content=content, status_code=status_code, headers=headers, media_type=media_type
+        )
+
     def _render_body_to_content(
         self, content: Any, *, _override_body_encoding_charset: Optional[str] = None
     ) -> bytes:
-        encoding_charset = (
-            _override_body_encoding_charset
-            if _override_body_encoding_charset is not None
-            else self.http_body_encoding_charset
+        return self.json_serializer(content)
+
+
+class StreamingResponse(BaseResponse):
+    """
+    Response with body sent by chunks from sync or async iterator.
+    """
+
+    http_has_fixed_body = False
+
+    def __init__(
+        self,
+        content: Union[Iterable[Union[str, bytes]], AsyncIterable[Union[str, bytes]]],
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+    ):
+        """
+        :param content: Iterator (sync or async) that yields body chunks.
+        :param status_code: HTTP status code.
+        :param headers: Headers mapping.
+        :param media_type: Media type of the streamed content.
+        """
+        self.body_iterator = content
+        super().__init__(
+            content=None,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+        )
+
+    async def _iterate_body(self) -> AsyncIterator[Union[str, bytes]]:
+        if hasattr(self.body_iterator, "__aiter__"):
+            async for chunk in self.body_iterator:
+                yield chunk
+            return
+        # Sync iterators may block (e.g reading files), so advance them off the event loop.
+        iterator = iter(self.body_iterator)
+        while True:
+            chunk = await asyncio.to_thread(next, iterator, _ITERATOR_END)
+            if chunk is _ITERATOR_END:
+                return
+            yield chunk
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.http_status_code,
+                "headers": self.http_headers,
+            }
+        )
+        async for chunk in self._iterate_body():
+            if not isinstance(chunk, bytes):
+                chunk = chunk.encode(self.http_body_encoding_charset)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class FileResponse(BaseResponse):
+    """
+    Response with file contents, read by chunks off the event loop.
+
+    Supports single `Range` requests and uses `http.response.zerocopysend`
+    ASGI extension when server supports it.
+    """
+
+    http_has_fixed_body = False
+
+    chunk_size: int = 64 * 1024
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        filename: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+    ):
+        """
+        :param path: Path to the file.
+        :param status_code: HTTP status code.
+        :param headers: Headers mapping.
+        :param media_type: Media type, guessed from file name if not specified.
+        :param filename: If specified, file is sent as attachment with that name.
+        :param chunk_size: Size of the chunks file is read by.
+        """
+        if media_type is None:
+            media_type = (
+                guess_type(filename or os.fspath(path))[0] or "application/octet-stream"
+            )
+        if chunk_size is not None:
+            self.chunk_size = chunk_size
+        self.path = path
+        headers = dict(headers or {})
+        if filename is not None:
+            headers.setdefault(
+                "content-disposition", f'attachment; filename="{filename}"'
+            )
+        super().__init__(
+            content=None, status_code=status_code, headers=headers, media_type=media_type
         )
-        return json.dumps(
-            content,
-            ensure_ascii=False,
-            allow_nan=False,
-            indent=None,
-            separators=(",", ":"),
-        ).encode(encoding_charset)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            stat_result = await asyncio.to_thread(os.stat, self.path)
+        except FileNotFoundError:
+            await PlainResponse("Not Found!", status_code=404)(scope, receive, send)
+            return
+
+        file_size = stat_result.st_size
+        status_code = self.http_status_code
+        offset, count = 0, file_size
+        headers = self.http_headers + [
+            (b"accept-ranges", b"bytes"),
+            (
+                b"last-modified",
+                formatdate(stat_result.st_mtime, usegmt=True).encode("latin-1"),
+            ),
+        ]
+        range_header = get_raw_header(scope.get("headers", []), b"range")
+        if range_header is not None and status_code == 200:
+            byte_range = _parse_range_header(range_header, file_size)
+            if byte_range is _RANGE_NOT_SATISFIABLE:
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": 416,
+                        "headers": [
+                            (b"content-range", f"bytes */{file_size}".encode("latin-1")),
+                            (b"content-length", b"0"),
+                        ],
+                    }
+                )
+                await send({"type": "http.response.body", "body": b""})
+                return
+            if byte_range is not None:
+                offset, last_byte = byte_range
+                count = last_byte - offset + 1
+                status_code = 206
+                headers.append(
+                    (
+                        b"content-range",
+                        f"bytes {offset}-{last_byte}/{file_size}".encode("latin-1"),
+                    )
+                )
+        headers.append((b"content-length", str(count).encode("latin-1")))
+
+        await send(
+            {"type": "http.response.start", "status": status_code, "headers": headers}
+        )
+        if scope.get("method") == "HEAD" and HEAD_WITH_BODY_SCOPE_KEY not in scope:
+            await send(_EMPTY_BODY_MESSAGE)
+            return
+        file = await asyncio.to_thread(open, self.path, "rb")
+        try:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": file,
+                        "offset": offset,
+                        "count": count,
+                        "more_body": False,
+                    }
+                )
+                return
+            if offset:
+                await asyncio.to_thread(file.seek, offset)
+            remaining = count
+            more_body = True
+            while more_body:
+                chunk = await asyncio.to_thread(
+                    file.read, min(self.chunk_size, remaining)
+                )
+                remaining -= len(chunk)
+                more_body = bool(chunk) and remaining > 0
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": more_body}
+                )
+        finally:
+            await asyncio.to_thread(file.close)
+
+    async def send_head(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handles response to HEAD request, file is stat-ed (for headers) but not opened.
+        """
+        await self.__call__(scope, receive, send)
+
+
+# Sentinel for end of the sync iterator.
+_ITERATOR_END = object()
+
+# Sentinel for `Range` header that can not be satisfied.
+_RANGE_NOT_SATISFIABLE = object()
+
+
+def _parse_range_header(range_header: bytes, file_size: int) -> Any:
+    """
+    Parses single `bytes=` range in to the (first byte, last byte) tuple.
+
+    Returns None when range should be ignored (invalid or multiple ranges),
+    so full content is sent.
+    """
+    unit, _, ranges = range_header.decode("latin-1").partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    first_byte, _, last_byte = ranges.strip().partition("-")
+    try:
+        if not first_byte:
+            # Suffix range (`bytes=-500` is last 500 bytes).
+            suffix_length = int(last_byte)
+            if suffix_length <= 0:
+                return _RANGE_NOT_SATISFIABLE
+            return max(file_size - suffix_length, 0), file_size - 1
+        first_byte = int(first_byte)
+        last_byte = int(last_byte) if last_byte else file_size - 1
+    except ValueError:
+        return None
+    if first_byte >= file_size:
+        return _RANGE_NOT_SATISFIABLE
+    if first_byte > last_byte:
+        return None
+    return first_byte, min(last_byte, file_size - 1)
@@ -1,6 +1,272 @@
-from typing import Dict, Callable
+from types import MappingProxyType
+from typing import Dict, Callable, Any, List, Mapping, Optional, Tuple
 
 from smile.types import Scope
+from smile.datastructures import QueryArgs
+from smile.query import (
+    parse_query_string,
+    DEFAULT_MAX_QUERY_PARAMS,
+    DEFAULT_MAX_QUERY_LENGTH,
+)
+
+# Converters for typed path parameters (`/users/{id:int}`).
+# Converter should raise `ValueError` when segment is not valid for that type.
+PATH_PARAM_CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "path": str,
+}
+
+# Method table key that allows any HTTP method.
+ANY_METHOD = "*"
+# Pseudo method of websocket routes, that is not valid HTTP method token (never matched by HTTP request).
+WEBSOCKET_METHOD = "<websocket>"
+
+# Scope key for query args parsed once per request.
+QUERY_ARGS_SCOPE_KEY = "smile.query_args"
+
+# Shared path params of static routes (no allocation per request).
+_NO_PATH_PARAMS: Mapping[str, Any] = MappingProxyType(dict())
+
+
+class Route:
+    """
+    Single registered route (path, endpoint and allowed methods).
+    """
+
+    __slots__ = (
+        "path",
+        "endpoint_func",
+        "methods",
+        "plan",
+        "response_cache",
+        "limiter",
+        "timeout",
+        "is_limited",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        endpoint_func: Callable,
+        methods: List[str],
+        plan: Any = None,
+        response_cache: Any = None,
+        limiter: Any = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.path = path
+        self.endpoint_func = endpoint_func
+        self.methods = methods
+        # Endpoint call plan, compiled by application.
+        self.plan = plan
+        # Response cache of the route (if endpoint is decorated with `cached`).
+        self.response_cache = response_cache
+        # Concurrency limiter of the route (if route has own max concurrency).
+        self.limiter = limiter
+        # Seconds endpoint may run before it is cancelled with 504 response.
+        self.timeout = timeout
+        # Unlimited route is called directly, without limiter and timeout wrapper.
+        self.is_limited = limiter is not None or timeout is not None
+
+    def __repr__(self) -> str:
+        return f"Route(path={self.path!r}, methods={self.methods!r})"
+
+
+class _RouteNode:
+    """
+    Node of the routes prefix tree (one path segment).
+    """
+
+    __slots__ = ("static_children", "param_children", "methods")
+
+    def __init__(self) -> None:
+        self.static_children: Dict[str, "_RouteNode"] = dict()
+        # (param name, converter name, converter, child node), in registration order.
+        self.param_children: List[Tuple[str, str, Callable[[str], Any], "_RouteNode"]] = []
+        # Precomputed method table, HTTP method -> route.
+        self.methods: Dict[str, Route] = dict()
+
+
+class RouteTree:
+    """
+    Compiled routes table.
+
+    Static paths are resolved with single dict lookup, paths with parameters
+    are resolved by walking prefix tree, so lookup cost depends on path depth
+    and not on routes count.
+    """
+
+    def __init__(self) -> None:
+        self._static_routes: Dict[str, Dict[str, Route]] = dict()
+        self._root = _RouteNode()
+
+    def insert(self, route: Route) -> None:
+        """
+        Compiles route in to the tree.
+        """
+        segments = _split_path(route.path)
+        if not any(_parse_param_segment(segment) for segment in segments):
+            method_table = self._static_routes.setdefault(route.path, dict())
+        else:
+            method_table = self._insert_segments(segments, route.path).methods
+        for method in route.methods:
+            method_table[method] = route
+        head_route = method_table.get("HEAD")
+        if "GET" in route.methods and (
+            head_route is None or "HEAD" not in head_route.methods
+        ):
+            # HEAD is answered by GET route (without body), unless it has own route.
+            method_table["HEAD"] = route
+
+    def _insert_segments(self, segments: List[str], path: str) -> _RouteNode:
+        node = self._root
+        for index, segment in enumerate(segments):
+            param = _parse_param_segment(segment)
+            if param is None:
+                node = node.static_children.setdefault(segment, _RouteNode())
+                continue
+            param_name, converter_name = param
+            if converter_name == "path" and index != len(segments) - 1:
+                raise ValueError(
+                    f"Path parameter `{param_name}` of type `path` must be last in {path}!"
+                )
+            for child_name, child_converter_name, _, child in node.param_children:
+                if (child_name, child_converter_name) == param:
+                    node = child
+                    break
+            else:
+                child = _RouteNode()
+                node.param_children.append(
+                    (
+                        param_name,
+                        converter_name,
+                        PATH_PARAM_CONVERTERS[converter_name],
+                        child,
+                    )
+                )
+                node = child
+        return node
+
+    def match(
+        self, path: str
+    ) -> Tuple[Optional[Dict[str, Route]], Mapping[str, Any]]:
+        """
+        Returns method table of the matched path (or None if not found) and path params.
+        """
+        method_table = self._static_routes.get(path)
+        if method_table is not None:
+            return method_table, _NO_PATH_PARAMS
+        path_params: Dict[str, Any] = dict()
+        node = _match_node(self._root, _split_path(path), 0, path_params)
+        if node is None:
+            return None, path_params
+        return node.methods, path_params
+
+    def routes(self) -> List[Route]:
+        """
+        Returns registered routes (each once), static routes first.
+        """
+        method_tables = list(self._static_routes.values())
+        nodes = [self._root]
+        while nodes:
+            node = nodes.pop()
+            if node.methods:
+                method_tables.append(node.methods)
+            nodes.extend(node.static_children.values())
+            nodes.extend(child for *_, child in node.param_children)
+        routes: Dict[int, Route] = dict()
+        for method_table in method_tables:
+            for route in method_table.values():
+                routes.setdefault(id(route), route)
+        return list(routes.values())
+
+
+def _match_node(
+    node: _RouteNode, segments: List[str], index: int, path_params: Dict[str, Any]
+) -> Optional[_RouteNode]:
+    """
+    Walks tree from node, static segments have priority over parameters.
+    """
+    if index == len(segments):
+        return node if node.methods else None
+    segment = segments[index]
+    static_child = node.static_children.get(segment)
+    if static_child is not None:
+        matched = _match_node(static_child, segments, index + 1, path_params)
+        if matched is not None:
+            return matched
+    for param_name, converter_name, converter, child in node.param_children:
+        if converter_name == "path":
+            if not child.methods:
+                continue
+            path_params[param_name] = "/".join(segments[index:])
+            return child
+        if not segment:
+            continue
+        try:
+            path_params[param_name] = converter(segment)
+        except ValueError:
+            continue
+        matched = _match_node(child, segments, index + 1, path_params)
+        if matched is not None:
+            return matched
+        del path_params[param_name]
+    return None
+
+
+def _split_path(path: str) -> List[str]:
+    return path.split("/")[1:]
+
+
+def get_path_param_names(path: str) -> List[str]:
+    """
+    Returns names of the path parameters declared in route path.
+    """
+    path_param_names = []
+    for segment in _split_path(path):
+        param = _parse_param_segment(segment)
+        if param is not None:
+            path_param_names.append(param[0])
+    return path_param_names
+
+
+def get_typed_path_param_names(path: str) -> List[str]:
+    """
+    Returns names of the path parameters converted from string by route tree (`{id:int}`).
+    """
+    typed_path_param_names = []
+    for segment in _split_path(path):
+        param = _parse_param_segment(segment)
+        if param is not None and PATH_PARAM_CONVERTERS[param[1]] is not str:
+            typed_path_param_names.append(param[0])
+    return typed_path_param_names
+
+
+def get_path_pattern(path: str) -> str:
+    """
+    Returns route path without parameter names (`/users/{:int}`), same for paths that match same requests.
+    """
+    segments = []
+    for segment in _split_path(path):
+        param = _parse_param_segment(segment)
+        segments.append(segment if param is None else f"{{:{param[1]}}}")
+    return "/" + "/".join(segments)
+
+
+def _parse_param_segment(segment: str) -> Optional[Tuple[str, str]]:
+    """
+    Returns (name, converter name) for `{name}` or `{name:type}` segment, or None if static.
+    """
+    if not (segment.startswith("{") and segment.endswith("}")):
+        return None
+    param_name, _, converter_name = segment[1:-1].partition(":")
+    if not converter_name:
+        converter_name = "str"
+    if converter_name not in PATH_PARAM_CONVERTERS:
+        raise ValueError(f"Unknown path parameter type `{converter_name}`!")
+    return param_name, converter_name
 
 
 class Router:
@@ -9,17 +275,30 @@ class Router:
     """
 
     def __init__(self):
-        self.routes = dict()  # TODO: Rework routes system.
+        # Registrations in order (same path may be registered for different methods),
+        # conflicts are reported when application is compiled.
+        self.routes: List[Tuple[str, Callable, List[str], Dict[str, Any]]] = []
+        self.websocket_routes: List[Tuple[str, Callable]] = []
 
     def add_route(
-        self, path: str, endpoint_func: Callable, methods: list[str] | None = None
+        self,
+        path: str,
+        endpoint_func: Callable,
+        methods: list[str] | None = None,
+        **route_options: Any,
     ) -> None:
-        # TODO: Rework routes system.
+        """
+        :param route_options: Passed to the `Smile.add_route` when router is included.
+        """
         if methods is None:
             methods = ["GET"]
-        self.routes[path] = endpoint_func, methods
+        self.routes.append(
+            (path, endpoint_func, [method.upper() for method in methods], route_options)
+        )
 
-    def route(self, path: str, methods: list[str] | None = None) -> Callable:
+    def route(
+        self, path: str, methods: list[str] | None = None, **route_options: Any
+    ) -> Callable:
         """
         Route decorator for endpoing function.
 
@@ -30,18 +309,44 @@ class Router:
         """
 
         def wrapper(route_func: Callable) -> Callable:
-            self.add_route(path=path, endpoint_func=route_func, methods=methods)
+            self.add_route(
+                path=path, endpoint_func=route_func, methods=methods, **route_options
+            )
             return route_func
 
         return wrapper
 
+    def add_websocket_route(self, path: str, endpoint_func: Callable) -> None:
+        self.websocket_routes.append((path, endpoint_func))
 
-def parse_args_from_scope(scope: Scope) -> Dict[str, str]:
-    query_args = scope.get("query_string", b"").decode("utf-8").split("&")
-    parsed_args = dict()
-    for query_arg in query_args:
-        if not query_arg:
-            continue
-        query_args_name, query_arg_value = query_arg.split("=")
-        parsed_args[query_args_name] = query_arg_value
-    return parsed_args
+    def websocket(self, path: str) -> Callable:
+        """
+        Websocket route decorator for endpoint coroutine function.
+        """
+
+        def wrapper(route_func: Callable) -> Callable:
+            self.add_websocket_route(path=path, endpoint_func=route_func)
+            return route_func
+
+        return wrapper
+
+
+def get_query_args(scope: Scope) -> QueryArgs:
+    """
+    Returns query args of request, parsed at most once per request.
+
+    Limits are taken from application (`max_query_params`, `max_query_length`).
+    """
+    query_args = scope.get(QUERY_ARGS_SCOPE_KEY)
+    if query_args is None:
+        app = scope.get("app")
+        query_args = scope[QUERY_ARGS_SCOPE_KEY] = parse_query_string(
+            scope.get("query_string", b""),
+            max_params=getattr(app, "max_query_params", DEFAULT_MAX_QUERY_PARAMS),
+            max_length=getattr(app, "max_query_length", DEFAULT_MAX_QUERY_LENGTH),
+        )
+    return query_args
+
+
+# Previous name, kept for compatibility (same cached parse with application limits).
+parse_args_from_scope = get_query_args
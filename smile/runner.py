@@ -0,0 +1,327 @@
+"""
+    Pre-fork multi-process runner.
+
+    Application is imported and compiled once in the supervisor process,
+    then workers are forked and share it copy-on-write. Workers share one
+    listening socket (inherited fd), or each binds own socket with
+    `SO_REUSEPORT` and kernel balances connections between them.
+
+    Run: python -m smile examples.example:app --workers 4 --port 8000
+
+    Signals to supervisor: SIGTERM / SIGINT to stop gracefully,
+    SIGHUP to gracefully replace all workers.
+"""
+import os
+import gc
+import sys
+import json
+import time
+import random
+import signal
+import socket
+import logging
+import argparse
+import importlib
+from typing import Any, Callable, Dict, Optional, Sequence, Set
+
+from smile.app import Smile
+
+try:
+    import uvicorn
+
+    uvicorn_is_installed = True
+except ImportError:
+    uvicorn_is_installed = False
+
+logger = logging.getLogger("smile")
+
+# Worker serve function, called in worker as `serve(app, sock, max_requests)`
+# and blocking until worker should exit.
+WorkerServe = Callable[[Smile, socket.socket, Optional[int]], Any]
+
+# Worker that exits faster than that after spawn is considered crashing, respawn is delayed.
+_CRASH_LOOP_SECONDS = 1.0
+
+
+def import_app(app_path: str) -> Smile:
+    """
+    Imports application by `module:attribute` path (`app` attribute by default).
+    """
+    module_name, _, attribute = app_path.partition(":")
+    module = importlib.import_module(module_name)
+    try:
+        app = getattr(module, attribute or "app")
+    except AttributeError:
+        raise ImportError(f"Module `{module_name}` has no application `{attribute or 'app'}`!")
+    if not isinstance(app, Smile):
+        raise TypeError(f"Expected `{app_path}` to be Smile application, not {type(app).__name__}!")
+    return app
+
+
+def create_listening_socket(
+    host: str, port: int, reuse_port: bool = False, backlog: int = 2048
+) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT is not supported by this platform!")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def serve_with_uvicorn(
+    app: Smile, sock: socket.socket, max_requests: Optional[int], **options: Any
+) -> None:
+    """
+    Serves application in worker with Uvicorn (handles lifespan and graceful SIGTERM itself).
+    """
+    if not uvicorn_is_installed:
+        raise ImportError("Uvicorn is not installed, install by `pip install uvicorn`!")
+    config = uvicorn.Config(
+        app, lifespan="on", limit_max_requests=max_requests, **options
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    """
+    Forks workers, respawns exited (recycled or crashed) workers and replaces them on SIGHUP.
+    """
+
+    def __init__(
+        self,
+        app: Smile,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: Optional[int] = None,
+        reuse_port: bool = False,
+        fd: Optional[int] = None,
+        max_requests: Optional[int] = None,
+        max_requests_jitter: int = 0,
+        graceful_timeout: float = 30.0,
+        serve: Optional[WorkerServe] = None,
+    ) -> None:
+        """
+        :param workers: Count of worker processes, CPU count by default.
+        :param reuse_port: Each worker binds own socket with `SO_REUSEPORT` instead of sharing one
+            (connections queued on socket of exiting worker are reset, prefer shared socket with recycling).
+        :param fd: Already listening socket file descriptor to share (e.g from systemd), overrides host and port.
+        :param max_requests: Worker is recycled after that count of requests (None for never).
+        :param max_requests_jitter: Max random addition to `max_requests`, so workers are not recycled at once.
+        :param graceful_timeout: Seconds to wait for stopping workers before they are killed.
+        :param serve: Worker serve function, Uvicorn by default.
+        """
+        if reuse_port and fd is not None:
+            raise ValueError("Can not use both `reuse_port` and inherited `fd`!")
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.reuse_port = reuse_port
+        self.fd = fd
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.serve = serve if serve is not None else serve_with_uvicorn
+        self.socket: Optional[socket.socket] = None
+        # Worker pid to its spawn time.
+        self.worker_pids: Dict[int, float] = {}
+        # Workers that are asked to stop and must not be respawned.
+        self._retiring_pids: Set[int] = set()
+        self._should_stop = False
+        self._should_restart = False
+
+    def run(self) -> int:
+        """
+        Runs supervisor until SIGTERM / SIGINT, returns exit code.
+        """
+        self.app.compile()
+        if self.fd is not None:
+            self.socket = socket.socket(fileno=self.fd)
+        elif self.reuse_port:
+            # Only checked here, so address errors are raised once, not in every worker.
+            # Listening socket would be balanced connections that are never accepted.
+            create_listening_socket(self.host, self.port, reuse_port=True).close()
+        else:
+            self.socket = create_listening_socket(self.host, self.port)
+        # Objects created so far (application, routes, templates) are never collected,
+        # so collector does not touch (and copy) their memory pages in workers.
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._on_stop_signal)
+        signal.signal(signal.SIGINT, self._on_stop_signal)
+        signal.signal(signal.SIGHUP, self._on_restart_signal)
+        logger.info(
+            "Supervisor %d starting %d workers on %s.",
+            os.getpid(),
+            self.workers,
+            self.socket.getsockname() if self.socket is not None else (self.host, self.port),
+        )
+        for _ in range(self.workers):
+            self._spawn_worker()
+        try:
+            while not self._should_stop:
+                if self._should_restart:
+                    self._should_restart = False
+                    self._restart_workers()
+                self._reap_workers(respawn=True)
+                time.sleep(0.1)
+        finally:
+            self._stop_workers()
+            if self.socket is not None:
+                self.socket.close()
+        return 0
+
+    def _on_stop_signal(self, signum: int, frame: Any) -> None:
+        self._should_stop = True
+
+    def _on_restart_signal(self, signum: int, frame: Any) -> None:
+        self._should_restart = True
+
+    def _worker_max_requests(self) -> Optional[int]:
+        if self.max_requests is None:
+            return None
+        return self.max_requests + random.randint(0, max(self.max_requests_jitter, 0))
+
+    def _spawn_worker(self) -> int:
+        max_requests = self._worker_max_requests()
+        pid = os.fork()
+        if pid != 0:
+            self.worker_pids[pid] = time.monotonic()
+            return pid
+        # Worker process.
+        exit_code = 0
+        try:
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+                signal.signal(signum, signal.SIG_DFL)
+            if self.reuse_port:
+                sock = create_listening_socket(self.host, self.port, reuse_port=True)
+            else:
+                sock = self.socket
+            self.serve(self.app, sock, max_requests)
+        except BaseException:
+            logger.exception("Worker %d exited with exception!", os.getpid())
+            exit_code = 1
+        finally:
+            # Never return in to the supervisor code.
+            os._exit(exit_code)
+
+    def _reap_workers(self, respawn: bool) -> None:
+        while self.worker_pids:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.worker_pids.clear()
+                return
+            if pid == 0:
+                return
+            spawned_at = self.worker_pids.pop(pid, None)
+            if spawned_at is None:
+                continue
+            if pid in self._retiring_pids:
+                self._retiring_pids.discard(pid)
+                continue
+            exit_code = os.waitstatus_to_exitcode(status)
+            if not respawn or self._should_stop:
+                continue
+            if exit_code != 0:
+                logger.warning("Worker %d exited with code %d, respawning.", pid, exit_code)
+                if time.monotonic() - spawned_at < _CRASH_LOOP_SECONDS:
+                    # Do not fork in a busy loop when worker crashes at start.
+                    time.sleep(_CRASH_LOOP_SECONDS)
+            self._spawn_worker()
+
+    def _restart_workers(self) -> None:
+        """
+        Spawns new workers first, then gracefully stops old ones (socket is never left without workers).
+        """
+        logger.info("Supervisor %d replacing workers.", os.getpid())
+        old_pids = [pid for pid in self.worker_pids if pid not in self._retiring_pids]
+        for _ in range(self.workers):
+            self._spawn_worker()
+        for pid in old_pids:
+            self._signal_worker(pid, signal.SIGTERM)
+            self._retiring_pids.add(pid)
+
+    def _stop_workers(self) -> None:
+        for pid in list(self.worker_pids):
+            self._signal_worker(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.worker_pids and time.monotonic() < deadline:
+            self._reap_workers(respawn=False)
+            time.sleep(0.05)
+        for pid in list(self.worker_pids):
+            logger.warning("Worker %d did not stop in time, killing.", pid)
+            self._signal_worker(pid, signal.SIGKILL)
+        while self.worker_pids:
+            try:
+                pid, _ = os.waitpid(-1, 0)
+            except ChildProcessError:
+                break
+            self.worker_pids.pop(pid, None)
+        self._retiring_pids.clear()
+
+    def _signal_worker(self, pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m smile",
+        description="Runs Smile application with pre-forked workers.",
+    )
+    parser.add_argument("app", help="Application path as `module:attribute`.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--fd", type=int, default=None, help="Inherited listening socket fd.")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("--reuse-port", action="store_true")
+    parser.add_argument("--max-requests", type=int, default=None)
+    parser.add_argument("--max-requests-jitter", type=int, default=0)
+    parser.add_argument("--graceful-timeout", type=float, default=30.0)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument(
+        "--routes", action="store_true", help="Print routes table as JSON and exit."
+    )
+    options = parser.parse_args(argv)
+
+    if options.routes:
+        print(json.dumps(import_app(options.app).routes_table(), indent=2))
+        return 0
+
+    logging.basicConfig(
+        level=options.log_level.upper(),
+        format="[%(process)d] %(levelname)s %(message)s",
+    )
+    if not uvicorn_is_installed:
+        parser.error("Uvicorn is not installed, install by `pip install uvicorn`!")
+    app = import_app(options.app)
+
+    def serve(app: Smile, sock: socket.socket, max_requests: Optional[int]) -> None:
+        serve_with_uvicorn(app, sock, max_requests, log_level=options.log_level)
+
+    supervisor = Supervisor(
+        app,
+        host=options.host,
+        port=options.port,
+        workers=options.workers,
+        reuse_port=options.reuse_port,
+        fd=options.fd,
+        max_requests=options.max_requests,
+        max_requests_jitter=options.max_requests_jitter,
+        graceful_timeout=options.graceful_timeout,
+        serve=serve,
+    )
+    return supervisor.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
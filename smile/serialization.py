@@ -0,0 +1,89 @@
+"""
+    JSON serialization backends.
+
+    Serializer is callable that takes content and returns JSON bytes,
+    fastest installed backend (orjson, msgspec) is used by default with
+    fallback to standard library `json`.
+"""
+import json
+import enum
+import dataclasses
+from uuid import UUID
+from datetime import date, datetime, time
+from typing import Any, Callable, Mapping
+
+try:
+    import orjson
+
+    orjson_is_installed = True
+except ImportError:
+    orjson_is_installed = False
+
+try:
+    import msgspec
+
+    msgspec_is_installed = True
+except ImportError:
+    msgspec_is_installed = False
+
+JSONSerializer = Callable[[Any], bytes]
+
+
+def _json_default(content: Any) -> Any:
+    """
+    Converts types that are not supported by standard library `json`.
+    """
+    if dataclasses.is_dataclass(content) and not isinstance(content, type):
+        return dataclasses.asdict(content)
+    if isinstance(content, (datetime, date, time)):
+        return content.isoformat()
+    if isinstance(content, UUID):
+        return str(content)
+    if isinstance(content, enum.Enum):
+        return content.value
+    if isinstance(content, Mapping):
+        # E.g request headers.
+        return dict(content)
+    raise TypeError(f"Object of type {type(content).__name__} is not JSON serializable!")
+
+
+def stdlib_json_serializer(content: Any) -> bytes:
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=_json_default,
+    ).encode("utf-8")
+
+
+def orjson_serializer(content: Any) -> bytes:
+    # Non string dict keys (`{1: "a"}`) are accepted as by standard library `json`.
+    return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def msgspec_serializer(content: Any) -> bytes:
+    try:
+        return _msgspec_encoder.encode(content)
+    except TypeError:
+        # E.g dict keys msgspec does not support (`None`, `bool`), accepted by standard library `json`.
+        return stdlib_json_serializer(content)
+
+
+if msgspec_is_installed:
+    _msgspec_encoder = msgspec.json.Encoder(enc_hook=_json_default)
+
+
+def get_default_json_serializer() -> JSONSerializer:
+    """
+    Returns fastest installed JSON serializer.
+    """
+    if orjson_is_installed:
+        return orjson_serializer
+    if msgspec_is_installed:
+        return msgspec_serializer
+    return stdlib_json_serializer
+
+
+default_json_serializer = get_default_json_serializer()
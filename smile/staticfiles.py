@@ -0,0 +1,216 @@
+"""
+    Static files, served from index built once (no filesystem walk per request).
+"""
+import os
+import asyncio
+from email.utils import formatdate
+from mimetypes import guess_type
+from typing import Dict, List, Optional, Tuple, Union
+
+from smile.types import Scope
+from smile.cache import LRUCache, CachedResponse, etag_matches
+from smile.responses import BaseResponse, FileResponse, PlainResponse, StaticResponse
+from smile.datastructures import (
+    get_raw_header,
+    parse_accept_encoding,
+    select_encoding,
+)
+
+# Precompressed siblings (`app.js.br`, `app.js.gz`) by content encoding, in order of preference.
+PRECOMPRESSED_SUFFIXES = (("br", ".br"), ("gzip", ".gz"))
+
+_NOT_FOUND_RESPONSE = StaticResponse(PlainResponse("Not Found!", status_code=404))
+
+
+class StaticFile:
+    """
+    Indexed file with its metadata and precompressed variants.
+    """
+
+    __slots__ = ("path", "size", "media_type", "etag", "last_modified", "variants")
+
+    def __init__(self, path: str, stat_result: os.stat_result) -> None:
+        self.path = path
+        self.size = stat_result.st_size
+        self.media_type = guess_type(path)[0] or "application/octet-stream"
+        self.etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+        self.last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+        # Content encoding to (path, size) of precompressed file.
+        self.variants: Dict[str, Tuple[str, int]] = {}
+
+
+class StaticFiles:
+    """
+    Static files of directory.
+
+    Index (metadata, ETags, media types and precompressed variants) is built
+    once at application warmup, so files added after that are not served until
+    `build_index` is called again. Small files are kept in bounded memory cache,
+    large files are streamed by chunks (with `Range` support).
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        index_file: Optional[str] = "index.html",
+        cache_control: Optional[str] = None,
+        memory_cache_max_file_size: int = 64 * 1024,
+        memory_cache_max_size: int = 32 * 1024 * 1024,
+        chunk_size: int = 64 * 1024,
+        follow_symlinks: bool = False,
+    ) -> None:
+        """
+        :param directory: Directory with files.
+        :param index_file: File served for directory path (None to disable).
+        :param cache_control: `Cache-Control` header of responses.
+        :param memory_cache_max_file_size: Max size of file kept in memory, larger files are streamed.
+        :param memory_cache_max_size: Max total size of files kept in memory.
+        :param chunk_size: Size of chunks large files are streamed by.
+        :param follow_symlinks: Serve files that are symlinks to outside of the directory.
+        """
+        self.directory = os.path.realpath(directory)
+        self.index_file = index_file
+        self.cache_control = cache_control
+        self.memory_cache_max_file_size = memory_cache_max_file_size
+        self.chunk_size = chunk_size
+        self.follow_symlinks = follow_symlinks
+        self.index: Optional[Dict[str, StaticFile]] = None
+        self._memory_cache = LRUCache(
+            max_entries=65536,
+            max_size=memory_cache_max_size,
+            sizeof=CachedResponse.size,
+        )
+
+    def build_index(self) -> int:
+        """
+        Walks directory and (re)builds files index, returns count of indexed files.
+        """
+        if not os.path.isdir(self.directory):
+            raise RuntimeError(f"Static files directory `{self.directory}` does not exist!")
+        index: Dict[str, StaticFile] = {}
+        precompressed: List[Tuple[str, str, str, os.stat_result]] = []
+        for root, _, file_names in os.walk(self.directory, followlinks=self.follow_symlinks):
+            for file_name in file_names:
+                file_path = os.path.join(root, file_name)
+                if not self.follow_symlinks and not _is_inside(
+                    os.path.realpath(file_path), self.directory
+                ):
+                    continue
+                try:
+                    stat_result = os.stat(file_path)
+                except OSError:
+                    continue
+                relative_path = os.path.relpath(file_path, self.directory).replace(os.sep, "/")
+                for encoding, suffix in PRECOMPRESSED_SUFFIXES:
+                    if relative_path.endswith(suffix):
+                        precompressed.append(
+                            (relative_path[: -len(suffix)], encoding, file_path, stat_result)
+                        )
+                index[relative_path] = StaticFile(file_path, stat_result)
+        for original_path, encoding, file_path, stat_result in precompressed:
+            static_file = index.get(original_path)
+            if static_file is not None:
+                static_file.variants[encoding] = (file_path, stat_result.st_size)
+        if self.index_file is not None:
+            for relative_path, static_file in list(index.items()):
+                directory_path, _, file_name = relative_path.rpartition("/")
+                if file_name == self.index_file:
+                    index.setdefault(directory_path, static_file)
+                    index.setdefault(f"{directory_path}/" if directory_path else "/", static_file)
+        self.index = index
+        self._memory_cache.clear()
+        return len(index)
+
+    async def respond(self, scope: Scope, path: str) -> BaseResponse:
+        """
+        Returns response for file by path relative to the directory.
+        """
+        if self.index is None:
+            self.build_index()
+        static_file = self.index.get(path.lstrip("/") or "/")
+        if static_file is None:
+            return _NOT_FOUND_RESPONSE
+
+        request_headers = scope.get("headers", [])
+        encoding = None
+        if static_file.variants:
+            accept_encoding = get_raw_header(request_headers, b"accept-encoding")
+            if accept_encoding is not None:
+                encoding = select_encoding(
+                    parse_accept_encoding(accept_encoding),
+                    [
+                        variant_encoding
+                        for variant_encoding, _ in PRECOMPRESSED_SUFFIXES
+                        if variant_encoding in static_file.variants
+                    ],
+                )
+        etag = static_file.etag if encoding is None else f'{static_file.etag[:-1]}-{encoding}"'
+
+        if_none_match = get_raw_header(request_headers, b"if-none-match")
+        if if_none_match is not None and etag_matches(etag.encode("latin-1"), if_none_match):
+            not_modified_headers = [(b"etag", etag.encode("latin-1"))]
+            if static_file.variants:
+                not_modified_headers.append((b"vary", b"Accept-Encoding"))
+            if self.cache_control is not None:
+                not_modified_headers.append(
+                    (b"cache-control", self.cache_control.encode("latin-1"))
+                )
+            return CachedResponse(status_code=304, headers=not_modified_headers, body=b"")
+
+        if encoding is None:
+            file_path, file_size = static_file.path, static_file.size
+        else:
+            file_path, file_size = static_file.variants[encoding]
+        headers = {"etag": etag, "last-modified": static_file.last_modified}
+        if encoding is not None:
+            headers["content-encoding"] = encoding
+        if static_file.variants:
+            headers["vary"] = "Accept-Encoding"
+        if self.cache_control is not None:
+            headers["cache-control"] = self.cache_control
+
+        if file_size > self.memory_cache_max_file_size:
+            # `last-modified` is added by file response itself.
+            del headers["last-modified"]
+            return FileResponse(
+                file_path,
+                headers=headers,
+                media_type=static_file.media_type,
+                chunk_size=self.chunk_size,
+            )
+        cache_key = (file_path, etag)
+        cached_response = self._memory_cache.get(cache_key)
+        if cached_response is None:
+            try:
+                body = await asyncio.to_thread(_read_file, file_path)
+            except FileNotFoundError:
+                return _NOT_FOUND_RESPONSE
+            cached_response = _build_memory_response(static_file, headers, body)
+            self._memory_cache.set(cache_key, cached_response)
+        return cached_response
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def _build_memory_response(
+    static_file: StaticFile, headers: Dict[str, str], body: bytes
+) -> CachedResponse:
+    media_type = static_file.media_type
+    if media_type.startswith("text/"):
+        media_type += "; charset=utf-8"
+    raw_headers = [
+        (b"content-type", media_type.encode("latin-1")),
+        (b"content-length", b"%d" % len(body)),
+    ]
+    raw_headers.extend(
+        (header_name.encode("latin-1"), header_value.encode("latin-1"))
+        for header_name, header_value in headers.items()
+    )
+    return CachedResponse(status_code=200, headers=raw_headers, body=body)
+
+
+def _is_inside(path: str, directory: str) -> bool:
+    return path == directory or path.startswith(directory + os.sep)
@@ -0,0 +1,125 @@
+"""
+    Jinja templates subsystem (warmup, render cache and streaming render).
+"""
+from typing import Any, AsyncIterator, Dict, Hashable, Optional
+
+from smile.cache import LRUCache
+
+
+class TemplateContent:
+    """
+    Template to be rendered with context, returned by `Smile.jinja_template`.
+    """
+
+    __slots__ = ("name", "parent", "context", "cache_key")
+
+    def __init__(
+        self,
+        name: str,
+        parent: Optional[str],
+        context: Dict[str, Any],
+        cache_key: Optional[Hashable] = None,
+    ) -> None:
+        self.name = name
+        self.parent = parent
+        self.context = context
+        # Render cache key given by caller (for context that is not made of primitive values).
+        self.cache_key = cache_key
+
+
+class Templates:
+    """
+    Templates subsystem over Jinja environment.
+    """
+
+    def __init__(
+        self,
+        env: Any,
+        render_cache_size: int = 0,
+        render_cache_ttl: Optional[float] = None,
+        stream: bool = False,
+    ) -> None:
+        """
+        :param env: Jinja environment (with `enable_async=True`).
+        :param render_cache_size: Max count of cached rendered templates (0 disables cache).
+        :param render_cache_ttl: Time to live of rendered template in seconds.
+        :param stream: Send rendered template by chunks as they are produced.
+        """
+        self.env = env
+        self.stream = stream
+        self.render_cache = (
+            LRUCache(max_entries=render_cache_size, ttl=render_cache_ttl)
+            if render_cache_size > 0
+            else None
+        )
+
+    def warmup(self) -> int:
+        """
+        Precompiles all templates under loader, returns count of compiled templates.
+        """
+        try:
+            template_names = self.env.list_templates()
+        except TypeError:
+            # Loader does not support listing templates.
+            return 0
+        for template_name in template_names:
+            self.env.get_template(template_name)
+        return len(template_names)
+
+    def get_template(self, template: TemplateContent) -> Any:
+        return self.env.get_template(template.name, parent=template.parent)
+
+    async def render(self, template: TemplateContent) -> bytes:
+        """
+        Renders template to bytes, cached if render cache is enabled.
+        """
+        if self.render_cache is None:
+            return await self._render(template)
+        cache_key = _build_cache_key(template)
+        if cache_key is None:
+            return await self._render(template)
+        rendered = self.render_cache.get(cache_key)
+        if rendered is None:
+            rendered = await self._render(template)
+            self.render_cache.set(cache_key, rendered)
+        return rendered
+
+    async def generate(self, template: TemplateContent) -> AsyncIterator[str]:
+        """
+        Renders template by chunks as they are produced.
+        """
+        async for chunk in self.get_template(template).generate_async(
+            template.context
+        ):
+            yield chunk
+
+    async def _render(self, template: TemplateContent) -> bytes:
+        rendered = await self.get_template(template).render_async(template.context)
+        return rendered.encode("utf-8")
+
+
+# Context values of these (exact) types are immutable and render as they compare.
+_CACHEABLE_VALUE_TYPES = frozenset((str, int, float, bool, bytes, type(None)))
+
+
+def _build_cache_key(template: TemplateContent) -> Optional[Hashable]:
+    """
+    Returns render cache key of template (or None if template should not be cached).
+
+    Key is explicit `cache_key` of template if given, otherwise it is built from context
+    only if all context values are of primitive types, with value type in the key
+    (as `True == 1 == 1.0`, while they are rendered differently).
+    """
+    if template.cache_key is not None:
+        return template.name, template.parent, template.cache_key
+    context_items = []
+    for name in sorted(template.context):
+        value = template.context[name]
+        value_type = type(value)
+        if value_type not in _CACHEABLE_VALUE_TYPES:
+            return None
+        if value_type is float:
+            # `-0.0 == 0.0`, but they are rendered differently.
+            value = repr(value)
+        context_items.append((name, value_type, value))
+    return template.name, template.parent, tuple(context_items)
@@ -0,0 +1,494 @@
+"""
+    Validators compiled from annotations (once, at route registration).
+
+    Converter is called with raw value and returns converted value,
+    it raises `ValueError` (or `TypeError`) for invalid value and
+    `ValidationError` with located errors for models.
+"""
+import enum
+import types
+import dataclasses
+from uuid import UUID
+from decimal import Decimal, InvalidOperation
+from datetime import date, datetime, time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+    is_typeddict,
+)
+
+try:
+    import msgspec
+
+    msgspec_is_installed = True
+except ImportError:
+    msgspec_is_installed = False
+
+try:
+    import pydantic
+
+    pydantic_is_installed = True
+except ImportError:
+    pydantic_is_installed = False
+
+Converter = Callable[[Any], Any]
+
+# Values of boolean query / path params.
+_TRUE_STRINGS = frozenset(("true", "1", "yes", "on"))
+_FALSE_STRINGS = frozenset(("false", "0", "no", "off"))
+
+
+class ValidationError(ValueError):
+    """
+    Invalid request data, with list of errors (`loc`, `msg`, `type`) responded as 422 JSON.
+    """
+
+    def __init__(self, errors: List[Dict[str, Any]]) -> None:
+        self.errors = errors
+        super().__init__(errors)
+
+
+def build_error(loc: Sequence[Any], msg: str, error_type: str) -> Dict[str, Any]:
+    return {"loc": list(loc), "msg": msg, "type": error_type}
+
+
+def convert_with_errors(
+    converter: Converter, value: Any, loc: Tuple[Any, ...]
+) -> Tuple[Any, Optional[List[Dict[str, Any]]]]:
+    """
+    Returns converted value and None, or None and list of errors located under `loc`.
+    """
+    try:
+        return converter(value), None
+    except ValidationError as exception:
+        return None, [
+            {**error, "loc": [*loc, *error["loc"]]} for error in exception.errors
+        ]
+    except (ValueError, TypeError) as exception:
+        return None, [build_error(loc, _error_message(exception), "invalid")]
+
+
+def is_body_model(annotation: Any) -> bool:
+    """
+    Returns True if annotation is model received as JSON body (dataclass, TypedDict, msgspec or pydantic model).
+    """
+    if not isinstance(annotation, type):
+        return False
+    if dataclasses.is_dataclass(annotation) or is_typeddict(annotation):
+        return True
+    if msgspec_is_installed and issubclass(annotation, msgspec.Struct):
+        return True
+    if pydantic_is_installed and issubclass(annotation, pydantic.BaseModel):
+        return True
+    return False
+
+
+def unwrap_list_annotation(annotation: Any) -> Optional[Any]:
+    """
+    Returns item annotation of `list[X]` (or `Optional[list[X]]`), None if annotation is not list.
+    """
+    origin = get_origin(annotation)
+    if origin is list:
+        return (get_args(annotation) or (str,))[0]
+    if origin is Union or origin is types.UnionType:
+        members = [member for member in get_args(annotation) if member is not type(None)]
+        if len(members) == 1:
+            return unwrap_list_annotation(members[0])
+    if annotation is list:
+        return str
+    return None
+
+
+def compile_converter(annotation: Any, from_string: bool = False) -> Converter:
+    """
+    Compiles annotation in to the converter.
+
+    :param from_string: Values are always strings (query and path params),
+    so builtins are used as is and strings are parsed for bool, None, enums and literals.
+    :raises TypeError: When annotation is not supported.
+    """
+    if annotation is Any or annotation is object:
+        return _identity
+    if annotation is str:
+        return str if from_string else _convert_str
+    if annotation is bool:
+        return _convert_bool_string if from_string else _convert_bool
+    if annotation is int:
+        return int if from_string else _convert_int
+    if annotation is float:
+        return float if from_string else _convert_float
+    if annotation in _SCALAR_CONVERTERS:
+        return _SCALAR_CONVERTERS[annotation]
+
+    origin = get_origin(annotation)
+    if origin is Union or origin is types.UnionType:
+        return _compile_union(get_args(annotation), from_string)
+    if origin is Literal:
+        return _compile_literal(get_args(annotation), from_string)
+    if origin is list or annotation is list:
+        if from_string:
+            raise TypeError(f"List annotation {annotation!r} is only supported for query params and body!")
+        return _compile_list(get_args(annotation))
+    if origin is dict or annotation is dict:
+        if from_string:
+            raise TypeError(f"Dict annotation {annotation!r} is only supported for body!")
+        return _compile_dict(get_args(annotation))
+
+    if isinstance(annotation, type):
+        if issubclass(annotation, enum.Enum):
+            return _compile_enum(annotation, from_string)
+        if not from_string:
+            if dataclasses.is_dataclass(annotation):
+                return _compile_dataclass(annotation)
+            if is_typeddict(annotation):
+                return _compile_typeddict(annotation)
+            if msgspec_is_installed and issubclass(annotation, msgspec.Struct):
+                return _compile_msgspec_struct(annotation)
+            if pydantic_is_installed and issubclass(annotation, pydantic.BaseModel):
+                return _compile_pydantic_model(annotation)
+        # Any other class is constructed from raw value.
+        return annotation
+    if callable(annotation):
+        return annotation
+    raise TypeError(f"Annotation {annotation!r} is not supported!")
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _error_message(exception: Exception) -> str:
+    message = str(exception)
+    return message if message else "Invalid value"
+
+
+def _convert_str(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    raise ValueError("Expected string")
+
+
+def _convert_bool_string(value: str) -> bool:
+    lowered = value.lower()
+    if lowered in _TRUE_STRINGS:
+        return True
+    if lowered in _FALSE_STRINGS:
+        return False
+    raise ValueError("Expected boolean")
+
+
+def _convert_bool(value: Any) -> bool:
+    if value is True or value is False:
+        return value
+    if isinstance(value, str):
+        return _convert_bool_string(value)
+    raise ValueError("Expected boolean")
+
+
+def _convert_int(value: Any) -> int:
+    if value.__class__ is int:
+        return value
+    if isinstance(value, str):
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise ValueError("Expected integer")
+
+
+def _convert_float(value: Any) -> float:
+    if value.__class__ is float:
+        return value
+    if isinstance(value, (int, str)) and not isinstance(value, bool):
+        return float(value)
+    raise ValueError("Expected number")
+
+
+def _build_parser(target: type, parse: Callable[[str], Any], message: str) -> Converter:
+    def convert(value: Any) -> Any:
+        if isinstance(value, target):
+            return value
+        if not isinstance(value, str):
+            raise ValueError(message)
+        return parse(value)
+
+    return convert
+
+
+def _parse_datetime(value: str) -> datetime:
+    # `Z` suffix is not parsed by `fromisoformat` before Python 3.11.
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+def _parse_date(value: str) -> date:
+    return date.fromisoformat(value)
+
+
+def _parse_decimal(value: str) -> Decimal:
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError("Expected decimal")
+
+
+def _convert_decimal(value: Any) -> Decimal:
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return Decimal(str(value))
+    if isinstance(value, str):
+        return _parse_decimal(value)
+    raise ValueError("Expected decimal")
+
+
+_SCALAR_CONVERTERS: Dict[Any, Converter] = {
+    # `datetime` is `date` subclass, so it is checked by exact type.
+    datetime: _build_parser(datetime, _parse_datetime, "Expected datetime"),
+    date: lambda value: (
+        value
+        if value.__class__ is date
+        else _parse_date(value)
+        if isinstance(value, str)
+        else _raise_value_error("Expected date")
+    ),
+    time: _build_parser(time, time.fromisoformat, "Expected time"),
+    UUID: _build_parser(UUID, UUID, "Expected UUID"),
+    Decimal: _convert_decimal,
+    bytes: lambda value: value if isinstance(value, bytes) else _convert_str(value).encode("utf-8"),
+}
+
+
+def _raise_value_error(message: str) -> Any:
+    raise ValueError(message)
+
+
+def _compile_union(members: Sequence[Any], from_string: bool) -> Converter:
+    is_optional = type(None) in members
+    converters = [
+        compile_converter(member, from_string)
+        for member in members
+        if member is not type(None)
+    ]
+    if len(converters) == 1:
+        member_converter = converters[0]
+        if from_string:
+            # `Optional[X]` query param with empty value (`?x=`) is None.
+            def convert_optional_string(value: str) -> Any:
+                if value == "":
+                    return None
+                return member_converter(value)
+
+            return convert_optional_string
+
+        def convert_optional(value: Any) -> Any:
+            if value is None:
+                return None
+            return member_converter(value)
+
+        return convert_optional
+
+    def convert_union(value: Any) -> Any:
+        if is_optional and (value is None or (from_string and value == "")):
+            return None
+        for converter in converters:
+            try:
+                return converter(value)
+            except (ValueError, TypeError):
+                continue
+        raise ValueError("Value does not match any of union types")
+
+    return convert_union
+
+
+def _compile_literal(values: Sequence[Any], from_string: bool) -> Converter:
+    allowed = ", ".join(repr(value) for value in values)
+    if from_string:
+        by_string = {
+            (str(value).lower() if isinstance(value, bool) else str(value)): value
+            for value in values
+        }
+
+        def convert_literal_string(value: str) -> Any:
+            try:
+                return by_string[value]
+            except KeyError:
+                raise ValueError(f"Expected one of: {allowed}")
+
+        return convert_literal_string
+
+    allowed_values = [(type(value), value) for value in values]
+
+    def convert_literal(value: Any) -> Any:
+        if (type(value), value) in allowed_values:
+            return value
+        raise ValueError(f"Expected one of: {allowed}")
+
+    return convert_literal
+
+
+def _compile_enum(enum_class: type, from_string: bool) -> Converter:
+    by_string = {str(member.value): member for member in enum_class}
+
+    def convert_enum(value: Any) -> Any:
+        if isinstance(value, enum_class):
+            return value
+        if from_string or isinstance(value, str):
+            member = by_string.get(value)
+            if member is not None:
+                return member
+        try:
+            return enum_class(value)
+        except ValueError:
+            raise ValueError(
+                f"Expected one of: {', '.join(repr(member.value) for member in enum_class)}"
+            )
+
+    return convert_enum
+
+
+def _compile_list(args: Sequence[Any]) -> Converter:
+    item_converter = compile_converter(args[0]) if args else _identity
+
+    def convert_list(value: Any) -> List[Any]:
+        if not isinstance(value, list):
+            raise ValueError("Expected list")
+        if item_converter is _identity:
+            return value
+        converted = []
+        errors: List[Dict[str, Any]] = []
+        for index, item in enumerate(value):
+            converted_item, item_errors = convert_with_errors(item_converter, item, (index,))
+            if item_errors:
+                errors.extend(item_errors)
+            else:
+                converted.append(converted_item)
+        if errors:
+            raise ValidationError(errors)
+        return converted
+
+    return convert_list
+
+
+def _compile_dict(args: Sequence[Any]) -> Converter:
+    value_converter = compile_converter(args[1]) if len(args) == 2 else _identity
+
+    def convert_dict(value: Any) -> Dict[Any, Any]:
+        if not isinstance(value, Mapping):
+            raise ValueError("Expected object")
+        if value_converter is _identity:
+            return dict(value)
+        converted = {}
+        errors: List[Dict[str, Any]] = []
+        for key, item in value.items():
+            converted_item, item_errors = convert_with_errors(value_converter, item, (key,))
+            if item_errors:
+                errors.extend(item_errors)
+            else:
+                converted[key] = converted_item
+        if errors:
+            raise ValidationError(errors)
+        return converted
+
+    return convert_dict
+
+
+def _compile_fields(
+    model: type, required_names: Optional[Sequence[str]] = None
+) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Compiles converter of mapping in to the validated fields of dataclass or TypedDict.
+    """
+    type_hints = get_type_hints(model)
+    if dataclasses.is_dataclass(model):
+        field_specs = [
+            (
+                field.name,
+                compile_converter(type_hints.get(field.name, Any)),
+                field.default is dataclasses.MISSING
+                and field.default_factory is dataclasses.MISSING,
+            )
+            for field in dataclasses.fields(model)
+            if field.init
+        ]
+    else:
+        field_specs = [
+            (name, compile_converter(annotation), name in (required_names or ()))
+            for name, annotation in type_hints.items()
+        ]
+
+    def convert_fields(value: Any) -> Dict[str, Any]:
+        if not isinstance(value, Mapping):
+            raise ValueError("Expected object")
+        fields: Dict[str, Any] = {}
+        errors: List[Dict[str, Any]] = []
+        for name, converter, is_required in field_specs:
+            try:
+                raw_value = value[name]
+            except KeyError:
+                if is_required:
+                    errors.append(build_error((name,), "Field required", "missing"))
+                continue
+            converted_value, value_errors = convert_with_errors(converter, raw_value, (name,))
+            if value_errors:
+                errors.extend(value_errors)
+            else:
+                fields[name] = converted_value
+        if errors:
+            raise ValidationError(errors)
+        return fields
+
+    return convert_fields
+
+
+def _compile_dataclass(model: type) -> Converter:
+    convert_fields = _compile_fields(model)
+
+    def convert_dataclass(value: Any) -> Any:
+        if isinstance(value, model):
+            return value
+        return model(**convert_fields(value))
+
+    return convert_dataclass
+
+
+def _compile_typeddict(model: type) -> Converter:
+    return _compile_fields(model, required_names=tuple(model.__required_keys__))
+
+
+def _compile_msgspec_struct(model: type) -> Converter:
+    def convert_struct(value: Any) -> Any:
+        try:
+            return msgspec.convert(value, model)
+        except msgspec.ValidationError as exception:
+            raise ValueError(str(exception))
+
+    return convert_struct
+
+
+def _compile_pydantic_model(model: type) -> Converter:
+    validate = getattr(model, "model_validate", None) or model.parse_obj
+
+    def convert_pydantic_model(value: Any) -> Any:
+        try:
+            return validate(value)
+        except pydantic.ValidationError as exception:
+            raise ValidationError(
+                [
+                    build_error(error["loc"], error["msg"], error["type"])
+                    for error in exception.errors()
+                ]
+            )
+
+    return convert_pydantic_model
@@ -0,0 +1,200 @@
+"""
+    WebSocket connections.
+"""
+import json
+from typing import Any, AsyncIterator, Dict, Mapping, Optional
+
+from smile.types import Scope, Receive, Send, Message
+from smile.routing import get_query_args
+from smile.datastructures import Headers, QueryArgs
+from smile.exceptions import WebSocketDisconnect
+from smile.serialization import JSONSerializer, default_json_serializer
+
+# Connection states (of both client and application sides).
+WEBSOCKET_CONNECTING = "connecting"
+WEBSOCKET_CONNECTED = "connected"
+WEBSOCKET_DISCONNECTED = "disconnected"
+
+# Close codes.
+WEBSOCKET_CLOSE_NORMAL = 1000
+WEBSOCKET_CLOSE_ABNORMAL = 1006
+WEBSOCKET_CLOSE_POLICY_VIOLATION = 1008
+WEBSOCKET_CLOSE_INTERNAL_ERROR = 1011
+WEBSOCKET_CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class WebSocket:
+    """
+    WebSocket connection for websocket endpoint.
+    """
+
+    __slots__ = (
+        "scope",
+        "_receive",
+        "_send",
+        "_json_serializer",
+        "_headers",
+        "client_state",
+        "application_state",
+    )
+
+    def __init__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        json_serializer: Optional[JSONSerializer] = None,
+    ) -> None:
+        self.scope = scope
+        self._receive = receive
+        self._send = send
+        self._json_serializer = (
+            json_serializer if json_serializer is not None else default_json_serializer
+        )
+        self._headers: Optional[Headers] = None
+        self.client_state = WEBSOCKET_CONNECTING
+        self.application_state = WEBSOCKET_CONNECTING
+
+    @property
+    def app(self) -> Any:
+        return self.scope["app"]
+
+    @property
+    def path(self) -> str:
+        return self.scope.get("root_path", "") + self.scope["path"]
+
+    @property
+    def path_params(self) -> Mapping[str, Any]:
+        return self.scope.get("path_params", {})
+
+    @property
+    def query_args(self) -> QueryArgs:
+        return get_query_args(scope=self.scope)
+
+    @property
+    def headers(self) -> Headers:
+        if self._headers is None:
+            self._headers = Headers(self.scope.get("headers", []))
+        return self._headers
+
+    async def receive(self) -> Message:
+        """
+        Receives raw ASGI message.
+        """
+        if self.client_state == WEBSOCKET_DISCONNECTED:
+            raise RuntimeError("Can not receive from disconnected websocket!")
+        message = await self._receive()
+        message_type = message["type"]
+        if message_type == "websocket.connect":
+            self.client_state = WEBSOCKET_CONNECTED
+        elif message_type == "websocket.disconnect":
+            self.client_state = WEBSOCKET_DISCONNECTED
+        return message
+
+    async def send(self, message: Message) -> None:
+        """
+        Sends raw ASGI message.
+        """
+        if self.application_state == WEBSOCKET_DISCONNECTED:
+            raise RuntimeError("Can not send to closed websocket!")
+        if message["type"] == "websocket.close":
+            self.application_state = WEBSOCKET_DISCONNECTED
+        elif message["type"] == "websocket.accept":
+            self.application_state = WEBSOCKET_CONNECTED
+        try:
+            await self._send(message)
+        except OSError:
+            # Server can not write to the connection anymore.
+            self.application_state = WEBSOCKET_DISCONNECTED
+            raise WebSocketDisconnect(WEBSOCKET_CLOSE_ABNORMAL)
+
+    async def accept(
+        self, subprotocol: Optional[str] = None, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        if self.client_state == WEBSOCKET_CONNECTING:
+            # Handshake request is received before accepting.
+            await self.receive()
+        message: Message = {"type": "websocket.accept", "subprotocol": subprotocol}
+        if headers:
+            message["headers"] = [
+                (header_name.lower().encode("latin-1"), header_value.encode("latin-1"))
+                for header_name, header_value in headers.items()
+            ]
+        await self.send(message)
+
+    async def close(
+        self, code: int = WEBSOCKET_CLOSE_NORMAL, reason: Optional[str] = None
+    ) -> None:
+        """
+        Closes connection (or rejects it with 403 if not accepted yet).
+        """
+        await self.send({"type": "websocket.close", "code": code, "reason": reason or ""})
+
+    async def _receive_data(self) -> Message:
+        if self.application_state != WEBSOCKET_CONNECTED:
+            raise RuntimeError("Websocket is not accepted, call `accept()` first!")
+        message = await self.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(
+                message.get("code", WEBSOCKET_CLOSE_NORMAL), message.get("reason")
+            )
+        return message
+
+    async def receive_text(self) -> str:
+        message = await self._receive_data()
+        text = message.get("text")
+        if text is None:
+            return message["bytes"].decode("utf-8")
+        return text
+
+    async def receive_bytes(self) -> bytes:
+        message = await self._receive_data()
+        data = message.get("bytes")
+        if data is None:
+            return message["text"].encode("utf-8")
+        return data
+
+    async def receive_json(self) -> Any:
+        message = await self._receive_data()
+        text = message.get("text")
+        return json.loads(text if text is not None else message["bytes"])
+
+    async def send_text(self, data: str) -> None:
+        await self.send({"type": "websocket.send", "text": data})
+
+    async def send_bytes(self, data: bytes) -> None:
+        await self.send({"type": "websocket.send", "bytes": data})
+
+    async def send_json(self, data: Any, binary: bool = False) -> None:
+        """
+        :param binary: Send as binary frame instead of text frame.
+        """
+        serialized = self._json_serializer(data)
+        if binary:
+            await self.send_bytes(serialized)
+        else:
+            await self.send_text(serialized.decode("utf-8"))
+
+    async def iter_text(self) -> AsyncIterator[str]:
+        """
+        Iterates over received text messages until client disconnects.
+        """
+        try:
+            while True:
+                yield await self.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                yield await self.receive_bytes()
+        except WebSocketDisconnect:
+            pass
+
+    async def iter_json(self) -> AsyncIterator[Any]:
+        try:
+            while True:
+                yield await self.receive_json()
+        except WebSocketDisconnect:
+            pass
@@ -0,0 +1,61 @@
+"""
+    Helpers to call ASGI app in-process from tests.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class Result:
+    """
+    Sent response (status, headers by lowercase name, joined body).
+    """
+
+    def __init__(self, messages: List[Dict[str, Any]]) -> None:
+        start_message = messages[0]
+        self.messages = messages
+        self.status: int = start_message["status"]
+        self.raw_headers: List[Tuple[bytes, bytes]] = list(start_message.get("headers", []))
+        self.headers: Dict[str, str] = {
+            name.decode("latin-1").lower(): value.decode("latin-1")
+            for name, value in self.raw_headers
+        }
+        self.body = b"".join(
+            message.get("body", b"")
+            for message in messages[1:]
+            if message["type"] == "http.response.body"
+        )
+
+
+async def call_async(
+    app: Any,
+    path: str = "/",
+    method: str = "GET",
+    headers: Optional[Dict[str, str]] = None,
+    query_string: bytes = b"",
+    body: bytes = b"",
+) -> Result:
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "root_path": "",
+        "query_string": query_string,
+        "headers": [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in (headers or {}).items()
+        ],
+    }
+    messages: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return Result(messages)
+
+
+def call(app: Any, path: str = "/", method: str = "GET", **options: Any) -> Result:
+    return asyncio.run(call_async(app, path, method, **options))
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from smile.cache import CachedResponse, LRUCache, RedisCacheBackend
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.expire = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, px=None):
+        if px is not None and px <= 0:
+            raise ValueError("invalid expire time in 'set' command")
+        self.data[key] = value
+        self.expire[key] = px
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.mark.parametrize(
+    "ttl, expected_px", [(None, None), (0.25, 250), (0.0001, 1), (0, 1), (30, 30_000)]
+)
+def test_redis_backend_expire_time(ttl, expected_px):
+    client = FakeRedis()
+    backend = RedisCacheBackend(client)
+    response = CachedResponse(200, [(b"content-type", b"text/plain")], b"body")
+
+    async def scenario():
+        await backend.set("key", response, ttl=ttl)
+        return await backend.get("key")
+
+    cached = asyncio.run(scenario())
+    assert client.expire["smile:key"] == expected_px
+    assert cached.http_status_code == 200
+    assert cached.http_headers == [(b"content-type", b"text/plain")]
+    assert cached.http_body == b"body"
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
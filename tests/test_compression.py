@@ -0,0 +1,83 @@
+import gzip
+
+import pytest
+
+from smile.datastructures import parse_accept_encoding, select_encoding
+from smile.middleware import CompressionMiddleware
+
+from tests.asgi import call
+
+BODY = b"compressible " * 100
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip", "gzip"),
+        ("br, gzip", "br"),
+        ("gzip;q=1, br;q=0.1", "gzip"),
+        ("br;q=0.5, gzip;q=0.5", "br"),
+        ("gzip;q=0, identity", None),
+        ("*;q=0", None),
+        ("*", "br"),
+        ("gzip;q=0.5, identity", None),
+        ("gzip, identity", "gzip"),
+        ("deflate", None),
+        ("GZIP;Q=0.3", "gzip"),
+        ("gzip;q=invalid", None),
+    ],
+)
+def test_select_encoding(accept_encoding, expected):
+    codings = parse_accept_encoding(accept_encoding.encode())
+    assert select_encoding(codings, ("br", "gzip")) == expected
+
+
+def _build_app(status=200, content_type=b"text/plain", body=BODY):
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", content_type),
+                    (b"content-length", b"%d" % len(body)),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    return app
+
+
+def _compressed(app, **options):
+    return call(
+        CompressionMiddleware(app, **options),
+        headers={"accept-encoding": "gzip;q=1, br;q=0.1"},
+    )
+
+
+def test_compresses_text():
+    result = _compressed(_build_app())
+    assert result.headers["content-encoding"] == "gzip"
+    assert result.headers["content-length"] == str(len(result.body))
+    assert gzip.decompress(result.body) == BODY
+
+
+def test_partial_response_is_not_compressed():
+    result = _compressed(_build_app(status=206))
+    assert "content-encoding" not in result.headers
+    assert result.body == BODY
+
+
+@pytest.mark.parametrize("content_type", [b"image/png", b"video/mp4", b"application/zip; x=1"])
+def test_uncompressible_media_type_is_not_compressed(content_type):
+    result = _compressed(_build_app(content_type=content_type))
+    assert "content-encoding" not in result.headers
+
+
+def test_uncompressible_media_types_are_configurable():
+    app = _build_app(content_type=b"image/png")
+    result = _compressed(app, uncompressible_media_types=())
+    assert result.headers["content-encoding"] == "gzip"
+    result = _compressed(_build_app(), uncompressible_media_types=("text/*",))
+    assert "content-encoding" not in result.headers
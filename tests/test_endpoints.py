@@ -0,0 +1,90 @@
+import pytest
+
+from smile.endpoints import SOURCE_ARGS, SOURCE_PATH, compile_endpoint
+from smile.routing import get_path_param_names, get_typed_path_param_names
+
+
+def _compile(endpoint_func, path="/"):
+    return compile_endpoint(
+        endpoint_func,
+        injectables={},
+        path_param_names=get_path_param_names(path),
+        typed_path_param_names=get_typed_path_param_names(path),
+    )
+
+
+def _params(plan):
+    return {param.name: param for param in plan.params}
+
+
+def test_typed_path_param_gets_converted_value():
+    def endpoint(item_id: int, ratio: float):
+        pass
+
+    params = _params(_compile(endpoint, "/items/{item_id:int}/{ratio:int}"))
+    assert params["item_id"].source == SOURCE_PATH
+    assert params["item_id"].converter(5) == 5
+    assert params["ratio"].converter(3) == 3.0
+
+
+def test_typed_path_param_with_mismatched_annotation_is_rejected_per_value():
+    def endpoint(flag: bool):
+        pass
+
+    converter = _params(_compile(endpoint, "/flags/{flag:int}"))["flag"].converter
+    with pytest.raises(ValueError):
+        converter(1)
+
+
+def test_string_path_param_is_parsed():
+    def endpoint(flag: bool, name: str):
+        pass
+
+    params = _params(_compile(endpoint, "/flags/{flag}/{name:path}"))
+    assert params["flag"].converter("true") is True
+    assert params["name"].converter("a/b") == "a/b"
+    with pytest.raises(ValueError):
+        params["flag"].converter("maybe")
+
+
+def test_query_params():
+    def endpoint(number: int, tags: list[int], name: str = "x"):
+        pass
+
+    params = _params(_compile(endpoint))
+    assert all(param.source == SOURCE_ARGS for param in params.values())
+    assert params["number"].converter("7") == 7
+    assert params["tags"].is_multi
+    assert params["tags"].converter("2") == 2
+    assert params["name"].default == "x"
+
+
+def test_unsupported_signature():
+    def positional(value: int, /):
+        pass
+
+    def untyped(value):
+        pass
+
+    with pytest.raises(TypeError):
+        _compile(positional)
+    with pytest.raises(TypeError):
+        _compile(untyped)
+
+
+def test_unknown_executor():
+    def endpoint():
+        pass
+
+    with pytest.raises(ValueError):
+        compile_endpoint(endpoint, injectables={}, executor="fiber")
+
+
+def test_executor_name_is_compared_by_value():
+    def endpoint():
+        pass
+
+    # Not interned string, equal to `EXECUTOR_INLINE`.
+    executor = "".join(["in", "line"])
+    plan = compile_endpoint(endpoint, injectables={}, executor=executor)
+    assert plan.executor == "inline"
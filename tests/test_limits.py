@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from smile.limits import ConcurrencyLimiter
+
+
+def test_acquire_sheds_when_queue_is_full():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=0)
+        assert await limiter.acquire()
+        assert not await limiter.acquire()
+        limiter.release()
+        assert await limiter.acquire()
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.admitted == 2
+    assert limiter.shed == 1
+
+
+def test_release_hands_slot_over_to_waiter():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_concurrency=1)
+        assert await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 1
+        limiter.release()
+        assert await waiting
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 1
+    assert limiter.queue_depth == 0
+
+
+def test_cancelled_waiter_released_in_same_tick():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_concurrency=1)
+        assert await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        # Release pops cancelled waiter before its task handles cancellation.
+        limiter.release()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 0
+    assert limiter.queue_depth == 0
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_concurrency=1)
+        assert await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert limiter.queue_depth == 0
+        limiter.release()
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 0
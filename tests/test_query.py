@@ -0,0 +1,22 @@
+import pytest
+
+from smile import Smile
+from smile.exceptions import HTTPException
+from smile.query import parse_query_string
+from smile.routing import get_query_args, parse_args_from_scope
+
+
+def test_parse_query_string():
+    query_args = parse_query_string(b"a=1&b=x%20y&a=2&empty=&flag")
+    assert query_args.getlist("a") == ["1", "2"]
+    assert query_args["b"] == "x y"
+    assert query_args["empty"] == ""
+
+
+def test_query_args_are_parsed_once_with_application_limits():
+    app = Smile(max_query_params=2)
+    scope = {"app": app, "query_string": b"a=1&b=2"}
+    query_args = get_query_args(scope)
+    assert parse_args_from_scope(scope) is query_args
+    with pytest.raises(HTTPException):
+        parse_args_from_scope({"app": app, "query_string": b"a=1&b=2&c=3"})
@@ -0,0 +1,63 @@
+import asyncio
+import logging
+
+from smile import Request, Smile
+
+from tests.asgi import call
+
+
+def _disconnecting_call(app, path):
+    messages = []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": path,
+        "query_string": b"",
+        "headers": [],
+    }
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def test_request_body():
+    app = Smile()
+
+    @app.route("/echo", methods=["POST"])
+    async def echo(request: Request):
+        return (await request.body()).decode()
+
+    assert call(app, "/echo", "POST", body=b"hello").body == b"hello"
+
+
+def test_client_disconnect_is_not_answered_nor_logged(caplog):
+    app = Smile()
+    tasks = []
+
+    @app.route("/upload", methods=["POST"])
+    async def upload(body: bytes):
+        tasks.append(body)
+        return "never"
+
+    with caplog.at_level(logging.DEBUG, logger="smile"):
+        assert _disconnecting_call(app, "/upload") == []
+    assert tasks == []
+    assert not [record for record in caplog.records if record.levelno >= logging.WARNING]
+
+
+def test_client_disconnect_closes_request_for_metrics():
+    app = Smile()
+    collector = app.setup_metrics(path=None)
+
+    @app.route("/upload", methods=["POST"])
+    async def upload(body: bytes):
+        return "never"
+
+    _disconnecting_call(app, "/upload")
+    assert collector.in_flight == 0
@@ -0,0 +1,119 @@
+from smile import FileResponse, Smile, cached
+from smile.middleware import CompressionMiddleware
+
+from tests.asgi import call
+
+TEXT = "x" * 2000
+
+
+def _without_date(headers):
+    return {name: value for name, value in headers.items() if name != "last-modified"}
+
+
+def _build_app(tmp_path):
+    app = Smile()
+    file_path = tmp_path / "data.txt"
+    file_path.write_bytes(bytes(range(256)) * 4)
+
+    @app.route("/text")
+    async def text():
+        return TEXT
+
+    @app.route("/file")
+    async def file():
+        return FileResponse(file_path)
+
+    calls = []
+
+    @app.route("/cached")
+    @cached(ttl=60)
+    async def cached_items():
+        calls.append(1)
+        return {"items": [1, 2]}
+
+    return app, calls
+
+
+def test_not_found_and_not_allowed(tmp_path):
+    app, _ = _build_app(tmp_path)
+    assert call(app, "/missing").status == 404
+    assert call(app, "/text", "POST").status == 405
+
+
+def test_head_has_get_headers_without_body(tmp_path):
+    app, _ = _build_app(tmp_path)
+    for path in ("/text", "/file", "/cached"):
+        get_result = call(app, path)
+        head_result = call(app, path, "HEAD")
+        assert head_result.status == get_result.status == 200
+        assert _without_date(head_result.headers) == _without_date(get_result.headers)
+        assert get_result.body
+        assert head_result.body == b""
+
+
+def test_head_has_get_headers_with_compression(tmp_path):
+    app, _ = _build_app(tmp_path)
+    app.add_middleware(CompressionMiddleware)
+    headers = {"accept-encoding": "gzip"}
+    get_result = call(app, "/text", headers=headers)
+    head_result = call(app, "/text", "HEAD", headers=headers)
+    assert get_result.headers["content-encoding"] == "gzip"
+    assert head_result.headers == get_result.headers
+    assert head_result.body == b""
+
+
+def test_file_range(tmp_path):
+    app, _ = _build_app(tmp_path)
+    full = call(app, "/file").body
+    assert len(full) == 1024
+
+    result = call(app, "/file", headers={"range": "bytes=10-19"})
+    assert result.status == 206
+    assert result.headers["content-range"] == "bytes 10-19/1024"
+    assert result.headers["content-length"] == "10"
+    assert result.body == full[10:20]
+
+    result = call(app, "/file", headers={"range": "bytes=-4"})
+    assert result.status == 206
+    assert result.body == full[-4:]
+
+    result = call(app, "/file", headers={"range": "bytes=2000-"})
+    assert result.status == 416
+    assert result.headers["content-range"] == "bytes */1024"
+
+    result = call(app, "/file", "HEAD", headers={"range": "bytes=10-19"})
+    assert result.status == 206
+    assert result.headers["content-length"] == "10"
+    assert result.body == b""
+
+
+def test_file_range_is_not_compressed(tmp_path):
+    app, _ = _build_app(tmp_path)
+    app.add_middleware(CompressionMiddleware, minimum_size=0)
+    result = call(app, "/file", headers={"range": "bytes=0-99", "accept-encoding": "gzip"})
+    assert result.status == 206
+    assert "content-encoding" not in result.headers
+    assert len(result.body) == 100
+
+
+def test_cached_route_etag(tmp_path):
+    app, calls = _build_app(tmp_path)
+    first = call(app, "/cached")
+    etag = first.headers["etag"]
+    assert first.status == 200
+    assert etag.startswith('"')
+
+    second = call(app, "/cached")
+    assert second.body == first.body
+    assert second.headers["etag"] == etag
+    assert len(calls) == 1
+
+    not_modified = call(app, "/cached", headers={"if-none-match": etag})
+    assert not_modified.status == 304
+    assert not_modified.body == b""
+
+    assert call(app, "/cached", headers={"if-none-match": '"other"'}).status == 200
+    head_result = call(app, "/cached", "HEAD")
+    assert head_result.headers["etag"] == etag
+    assert head_result.body == b""
+    assert len(calls) == 1
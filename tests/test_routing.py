@@ -0,0 +1,108 @@
+import pytest
+
+from smile.routing import (
+    ANY_METHOD,
+    Route,
+    RouteTree,
+    get_path_param_names,
+    get_path_pattern,
+    get_typed_path_param_names,
+)
+
+
+def _endpoint():
+    pass
+
+
+def _tree(*routes):
+    tree = RouteTree()
+    for path, methods in routes:
+        tree.insert(Route(path, _endpoint, methods))
+    return tree
+
+
+def _match(tree, path, method="GET"):
+    method_table, path_params = tree.match(path)
+    if method_table is None:
+        return None, dict(path_params)
+    route = method_table.get(method) or method_table.get(ANY_METHOD)
+    return (route.path if route else None), dict(path_params)
+
+
+def test_static_route():
+    tree = _tree(("/", ["GET"]), ("/users", ["GET"]))
+    assert _match(tree, "/") == ("/", {})
+    assert _match(tree, "/users") == ("/users", {})
+    assert _match(tree, "/users/") == (None, {})
+    assert _match(tree, "/missing") == (None, {})
+
+
+def test_typed_params_are_converted():
+    tree = _tree(
+        ("/items/{item_id:int}", ["GET"]),
+        ("/prices/{price:float}", ["GET"]),
+        ("/names/{name}", ["GET"]),
+    )
+    assert _match(tree, "/items/42") == ("/items/{item_id:int}", {"item_id": 42})
+    assert _match(tree, "/prices/1.5") == ("/prices/{price:float}", {"price": 1.5})
+    assert _match(tree, "/names/bob") == ("/names/{name}", {"name": "bob"})
+    assert _match(tree, "/items/abc")[0] is None
+    assert _match(tree, "/names/")[0] is None
+
+
+def test_static_segment_has_priority_over_param():
+    tree = _tree(
+        ("/users/{user_id:int}", ["GET"]),
+        ("/users/me", ["GET"]),
+        ("/users/{name}", ["GET"]),
+    )
+    assert _match(tree, "/users/me") == ("/users/me", {})
+    assert _match(tree, "/users/7") == ("/users/{user_id:int}", {"user_id": 7})
+    assert _match(tree, "/users/bob") == ("/users/{name}", {"name": "bob"})
+
+
+def test_param_branch_falls_back_when_deeper_segments_do_not_match():
+    tree = _tree(
+        ("/a/{x:int}/b", ["GET"]),
+        ("/a/{y}/c", ["GET"]),
+    )
+    assert _match(tree, "/a/1/b") == ("/a/{x:int}/b", {"x": 1})
+    assert _match(tree, "/a/1/c") == ("/a/{y}/c", {"y": "1"})
+
+
+def test_path_param_takes_rest_of_path():
+    tree = _tree(("/files/{file_path:path}", ["GET"]))
+    assert _match(tree, "/files/a/b/c.txt") == (
+        "/files/{file_path:path}",
+        {"file_path": "a/b/c.txt"},
+    )
+    with pytest.raises(ValueError):
+        _tree(("/files/{file_path:path}/raw", ["GET"]))
+
+
+def test_method_table():
+    tree = _tree(("/items", ["GET"]), ("/items", ["POST"]), ("/any", [ANY_METHOD]))
+    assert _match(tree, "/items", "POST")[0] == "/items"
+    assert _match(tree, "/items", "DELETE")[0] is None
+    assert _match(tree, "/any", "PATCH")[0] == "/any"
+
+
+def test_head_is_answered_by_get_route_unless_it_has_own_route():
+    tree = _tree(("/page", ["GET"]), ("/own", ["HEAD"]), ("/own", ["GET"]))
+    method_table, _ = tree.match("/page")
+    assert method_table["HEAD"] is method_table["GET"]
+    method_table, _ = tree.match("/own")
+    assert method_table["HEAD"] is not method_table["GET"]
+
+
+def test_unknown_param_type():
+    with pytest.raises(ValueError):
+        _tree(("/items/{item_id:uuid4}", ["GET"]))
+
+
+def test_path_helpers():
+    path = "/users/{user_id:int}/files/{name}"
+    assert get_path_param_names(path) == ["user_id", "name"]
+    assert get_typed_path_param_names(path) == ["user_id"]
+    assert get_path_pattern(path) == "/users/{:int}/files/{:str}"
+    assert get_path_pattern("/users/{id:int}/files/{n}") == get_path_pattern(path)
@@ -0,0 +1,79 @@
+import pytest
+
+from smile import Smile
+
+from tests.asgi import call
+
+
+@pytest.fixture
+def app(tmp_path):
+    (tmp_path / "index.html").write_bytes(b"<h1>index</h1>")
+    (tmp_path / "app.css").write_bytes(b"body{}")
+    (tmp_path / "app.css.gz").write_bytes(b"gzip variant")
+    (tmp_path / "app.css.br").write_bytes(b"br variant")
+    (tmp_path / "large.bin").write_bytes(b"a" * 4096)
+    app = Smile()
+    app.mount_static(
+        "/static",
+        tmp_path,
+        cache_control="public, max-age=60",
+        memory_cache_max_file_size=1024,
+    )
+    return app
+
+
+def test_file_and_index(app):
+    result = call(app, "/static/app.css")
+    assert result.status == 200
+    assert result.body == b"body{}"
+    assert result.headers["content-type"].startswith("text/css")
+    assert result.headers["cache-control"] == "public, max-age=60"
+    assert result.headers["vary"] == "Accept-Encoding"
+    assert call(app, "/static/").body == b"<h1>index</h1>"
+    assert call(app, "/static/missing.css").status == 404
+    assert call(app, "/static/../secret").status == 404
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected_encoding, expected_body",
+    [
+        ("gzip, br", "br", b"br variant"),
+        ("gzip;q=1, br;q=0.1", "gzip", b"gzip variant"),
+        ("gzip", "gzip", b"gzip variant"),
+        ("br;q=0, gzip;q=0", None, b"body{}"),
+        ("identity", None, b"body{}"),
+    ],
+)
+def test_precompressed_variant(app, accept_encoding, expected_encoding, expected_body):
+    result = call(app, "/static/app.css", headers={"accept-encoding": accept_encoding})
+    assert result.headers.get("content-encoding") == expected_encoding
+    assert result.body == expected_body
+
+
+def test_etag_is_per_variant(app):
+    plain_etag = call(app, "/static/app.css").headers["etag"]
+    br_etag = call(app, "/static/app.css", headers={"accept-encoding": "br"}).headers["etag"]
+    assert plain_etag != br_etag
+
+    result = call(app, "/static/app.css", headers={"if-none-match": plain_etag})
+    assert result.status == 304
+    assert result.body == b""
+    assert result.headers["etag"] == plain_etag
+    result = call(
+        app,
+        "/static/app.css",
+        headers={"if-none-match": plain_etag, "accept-encoding": "br"},
+    )
+    assert result.status == 200
+
+
+def test_head_and_range_of_large_file(app):
+    get_result = call(app, "/static/large.bin")
+    head_result = call(app, "/static/large.bin", "HEAD")
+    assert len(get_result.body) == 4096
+    assert head_result.headers == get_result.headers
+    assert head_result.body == b""
+
+    result = call(app, "/static/large.bin", headers={"range": "bytes=0-9"})
+    assert result.status == 206
+    assert result.body == b"a" * 10
@@ -0,0 +1,44 @@
+from smile.templating import TemplateContent, _build_cache_key
+
+
+def _key(context, cache_key=None):
+    return _build_cache_key(
+        TemplateContent("page.html", None, context, cache_key=cache_key)
+    )
+
+
+def test_equal_values_of_different_types_have_different_keys():
+    keys = {_key({"flag": True}), _key({"flag": 1}), _key({"flag": 1.0})}
+    assert len(keys) == 3
+
+
+def test_signed_zero_has_different_keys():
+    assert _key({"value": 0.0}) != _key({"value": -0.0})
+
+
+def test_same_primitive_context_has_same_key():
+    assert _key({"a": 1, "b": "x"}) == _key({"b": "x", "a": 1})
+    assert _key({"a": None, "b": b"x"}) is not None
+
+
+def test_context_with_objects_is_not_cached():
+    assert _key({"items": (1, 2)}) is None
+    assert _key({"items": [1, 2]}) is None
+    assert _key({"user": object()}) is None
+
+
+def test_explicit_cache_key():
+    assert _key({"user": object()}, cache_key=("user", 1)) == _key(
+        {"user": object()}, cache_key=("user", 1)
+    )
+    assert _key({"user": object()}, cache_key=1) != _key({}, cache_key=2)
+
+
+def test_key_includes_template_name_and_parent():
+    context = {"a": 1}
+    assert _build_cache_key(TemplateContent("a.html", None, context)) != (
+        _build_cache_key(TemplateContent("b.html", None, context))
+    )
+    assert _build_cache_key(TemplateContent("a.html", "base", context)) != (
+        _build_cache_key(TemplateContent("a.html", None, context))
+    )
@@ -0,0 +1,107 @@
+import dataclasses
+import enum
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Literal, Optional, TypedDict
+
+import pytest
+
+from smile.validation import ValidationError, compile_converter, convert_with_errors
+
+
+class Color(enum.Enum):
+    RED = "red"
+    GREEN = "green"
+
+
+@dataclasses.dataclass
+class Item:
+    name: str
+    price: float
+    tags: List[str] = dataclasses.field(default_factory=list)
+
+
+class Point(TypedDict):
+    x: int
+    y: int
+
+
+@pytest.mark.parametrize(
+    "annotation, raw, expected",
+    [
+        (int, "7", 7),
+        (float, "1.5", 1.5),
+        (str, "x", "x"),
+        (bool, "yes", True),
+        (bool, "off", False),
+        (Optional[int], "3", 3),
+        (Color, "red", Color.RED),
+        (Literal["a", "b"], "b", "b"),
+        (date, "2024-02-29", date(2024, 2, 29)),
+        (Decimal, "1.10", Decimal("1.10")),
+    ],
+)
+def test_string_converters(annotation, raw, expected):
+    assert compile_converter(annotation, from_string=True)(raw) == expected
+
+
+@pytest.mark.parametrize(
+    "annotation, raw",
+    [
+        (int, "x"),
+        (bool, "maybe"),
+        (Color, "blue"),
+        (Literal["a", "b"], "c"),
+        (date, "yesterday"),
+    ],
+)
+def test_invalid_string_values(annotation, raw):
+    with pytest.raises(ValueError):
+        compile_converter(annotation, from_string=True)(raw)
+
+
+@pytest.mark.parametrize(
+    "annotation, raw",
+    [(int, True), (int, 1.5), (str, 1), (bool, 1), (float, True)],
+)
+def test_json_converters_are_strict(annotation, raw):
+    with pytest.raises(ValueError):
+        compile_converter(annotation)(raw)
+
+
+def test_json_converters():
+    assert compile_converter(int)(2.0) == 2
+    assert compile_converter(float)(2) == 2.0
+    assert compile_converter(List[int])([1, 2]) == [1, 2]
+    assert compile_converter(Dict[str, int])({"a": 1}) == {"a": 1}
+
+
+def test_list_and_dict_are_not_supported_from_string():
+    with pytest.raises(TypeError):
+        compile_converter(List[int], from_string=True)
+    with pytest.raises(TypeError):
+        compile_converter(Dict[str, int], from_string=True)
+
+
+def test_dataclass_body():
+    converter = compile_converter(Item)
+    assert converter({"name": "a", "price": 1}) == Item("a", 1.0)
+    value, errors = convert_with_errors(converter, {"price": [1]}, ("body",))
+    assert value is None
+    assert errors == [
+        {"loc": ["body", "name"], "msg": "Field required", "type": "missing"},
+        {"loc": ["body", "price"], "msg": "Expected number", "type": "invalid"},
+    ]
+
+
+def test_typeddict_body():
+    converter = compile_converter(Point)
+    assert converter({"x": 1, "y": 2}) == {"x": 1, "y": 2}
+    with pytest.raises(ValidationError):
+        converter({"x": 1})
+
+
+def test_nested_errors_are_located():
+    value, errors = convert_with_errors(compile_converter(List[int]), [1, "a"], ("body",))
+    assert value is None
+    assert errors[0]["loc"][:2] == ["body", 1]